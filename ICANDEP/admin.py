@@ -1,5 +1,113 @@
+from datetime import date
+
 from django.contrib import admin
-from .models import Transaction, Category
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.utils import formats
+
+from . import catalog
+from .models import Transaction, Category, Job
+from .pagination import EstimatedCountPaginator
+
+
+class InputFilter(admin.SimpleListFilter):
+    """ตัวกรองแบบช่องพิมพ์ (ไม่โหลดตัวเลือกทั้งหมดมาแสดงในแถบด้านข้าง)"""
+    template = 'admin/ICANDEP/input_filter.html'
+    placeholder = ''
+
+    def lookups(self, request, model_admin):
+        # SimpleListFilter ซ่อนตัวกรองที่ไม่มีตัวเลือก
+        return ((None, None),)
+
+    def choices(self, changelist):
+        yield {
+            'parameter_name': self.parameter_name,
+            'value': self.value(),
+            'placeholder': self.placeholder,
+            'query_string': changelist.get_query_string(remove=[self.parameter_name]),
+            'query_parts': [
+                (key, value) for key, value in changelist.get_filters_params().items()
+                if key != self.parameter_name
+                for value in (value if isinstance(value, list) else [value])
+            ],
+        }
+
+
+class UserFilter(InputFilter):
+    title = 'ผู้ใช้'
+    parameter_name = 'username'
+    placeholder = 'ชื่อผู้ใช้'
+
+    def queryset(self, request, queryset):
+        if self.value():
+            # auth_user.username มี unique index จึงหาได้ทันที แล้วใช้ index ของ user_id ต่อ
+            return queryset.filter(user__username=self.value().strip())
+
+
+class CategoryFilter(admin.SimpleListFilter):
+    """ตัวเลือกหมวดหมู่จาก catalog ในหน่วยความจำ (ไม่ SELECT DISTINCT จากตารางธุรกรรม)"""
+    title = 'หมวดหมู่'
+    parameter_name = 'category'
+
+    def lookups(self, request, model_admin):
+        return [
+            (category.pk, f'{category.name} ({category.get_transaction_type_display()})'
+                          f'{"" if category.is_active else " - ปิดใช้งาน"}')
+            for category in catalog.get_catalog().all
+        ]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            try:
+                return queryset.filter(category_id=int(self.value()))
+            except ValueError:
+                raise IncorrectLookupParameters(self.value())
+
+
+class PeriodFilter(admin.SimpleListFilter):
+    """
+    แทน date_hierarchy: ปีจากวันที่แรก/ล่าสุด (2 query อ่านปลาย index txn_recent_idx)
+    แทน SELECT DISTINCT ปี/เดือนทั้งตาราง เลือกปีแล้วจึงแสดง 12 เดือนของปีนั้น
+    กรองด้วยช่วง date >= ต้นช่วง AND date < ต้นช่วงถัดไป ซึ่งใช้ index ได้
+    """
+    title = 'ช่วงเวลา'
+    parameter_name = 'period'
+
+    def lookups(self, request, model_admin):
+        dates = Transaction.objects.values_list('date', flat=True)
+        first = dates.order_by('date').first()
+        last = dates.order_by('-date').first()
+        if first is None:
+            return []
+        selected = self._range(self.value()) if self.value() else None
+        choices = []
+        for year in range(last.year, first.year - 1, -1):
+            choices.append((str(year), str(year)))
+            if selected and selected[0].year == year:
+                choices.extend(
+                    (f'{year}-{month:02d}', f'— {formats.date_format(date(year, month, 1), "YEAR_MONTH_FORMAT")}')
+                    for month in range(1, 13)
+                )
+        return choices
+
+    def queryset(self, request, queryset):
+        if self.value():
+            start, end = self._range(self.value())
+            return queryset.filter(date__gte=start, date__lt=end)
+
+    @staticmethod
+    def _range(value):
+        """'YYYY' หรือ 'YYYY-MM' -> (วันแรกของช่วง, วันแรกของช่วงถัดไป)"""
+        try:
+            if len(value) == 4:
+                year = int(value)
+                return date(year, 1, 1), date(year + 1, 1, 1)
+            year, month = (int(part) for part in value.split('-'))
+            start = date(year, month, 1)
+        except ValueError:
+            raise IncorrectLookupParameters(value)
+        return start, date(year + month // 12, month % 12 + 1, 1)
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -12,10 +120,20 @@ class CategoryAdmin(admin.ModelAdmin):
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
     list_display = ['user', 'title', 'amount', 'transaction_type', 'category', 'date', 'created_at']
-    list_filter = ['user', 'transaction_type', 'category', 'date']
-    search_fields = ['title', 'description', 'user__username']
-    date_hierarchy = 'date'
+    # ตัวกรองทุกตัวไม่อ่านตารางธุรกรรมทั้งตาราง (ดู InputFilter, CategoryFilter, PeriodFilter)
+    list_filter = [UserFilter, 'transaction_type', CategoryFilter, PeriodFilter]
+    # ^ = ขึ้นต้นด้วย (index txn_title_prefix_idx), = = ชื่อผู้ใช้ตรงทั้งคำ (ค้นหาจริงดู get_search_results)
+    # ไม่ค้นใน description แล้ว: contains กลางข้อความใช้ index ไม่ได้ (ค้นเนื้อหาใช้หน้ารายการ ดู search.py)
+    search_fields = ['^title', '=user__username']
+    search_help_text = 'หัวข้อที่ขึ้นต้นด้วยคำค้น หรือชื่อผู้ใช้แบบตรงทั้งคำ (ตัวพิมพ์เล็ก/ใหญ่ต้องตรง) ไม่ค้นในรายละเอียด'
+    autocomplete_fields = ['user', 'category']
     list_per_page = 20
+    # เรียงได้เฉพาะคอลัมน์ที่มี index (ค่าเริ่มต้น -date, -created_at, -id ใช้ txn_recent_idx)
+    sortable_by = ['date']
+    # ไม่นับทั้งตารางซ้ำ และหน้าแรกใช้จำนวนแถวโดยประมาณ
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    show_facets = admin.ShowFacets.NEVER
     
     fieldsets = (
         ('ข้อมูลผู้ใช้', {
@@ -32,3 +150,32 @@ class TransactionAdmin(admin.ModelAdmin):
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('user', 'category')
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        ความหมายเดียวกับ search_fields แต่หา id ของผู้ใช้ก่อน (unique index ของ username)
+        เงื่อนไข OR จึงอยู่ในตารางธุรกรรมตารางเดียว และแต่ละฝั่งใช้ index ของตัวเองได้
+        (OR ข้าม JOIN กับ auth_user ทำให้ต้องอ่านทั้งตาราง)
+        """
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        condition = Q(title__istartswith=term)
+        # ตรงตัวพิมพ์: iexact บน PostgreSQL กลายเป็น UPPER(username) LIKE ... ซึ่งใช้ unique index ไม่ได้
+        user_id = User.objects.filter(username=term).values_list('pk', flat=True).first()
+        if user_id is not None:
+            condition |= Q(user_id=user_id)
+        return queryset.filter(condition), False
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'user', 'status', 'attempts', 'worker', 'result_size', 'created_at', 'finished_at']
+    list_filter = ['status', 'kind']
+    readonly_fields = ['result_name', 'result_content_type', 'result_size', 'started_at', 'finished_at', 'worker', 'error']
+    exclude = ['result']
+    list_per_page = 20
+
+    def get_queryset(self, request):
+        # ไม่อ่านไฟล์ผลลัพธ์ในหน้ารายการ
+        return super().get_queryset(request).select_related('user').defer('result')
@@ -0,0 +1,141 @@
+"""
+JSON API แบบอ่านอย่างเดียว (v1) สำหรับแท็บเล็ต POS และสคริปต์รายงาน
+
+- ใช้ session เดียวกับหน้าเว็บ (ล็อกอินแล้วเรียกได้เลย) ถ้ายังไม่ล็อกอินตอบ 401
+- ข้อมูลมาจาก values() ไม่มีการสร้าง model instance
+- ทุก response มี ETag ที่อิงเวอร์ชันข้อมูลของผู้ใช้ ถ้า client ส่ง If-None-Match ที่ตรงกัน
+  จะได้ 304 ทันทีหลังอ่าน DataVersion (1 query) โดยไม่รัน query รวมยอดใดๆ
+"""
+from datetime import timedelta
+from functools import wraps
+
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+
+from . import caching, reporting
+from .pagination import PAGE_SIZE, paginate_keyset
+from .views import _filtered_transactions, _report_period
+
+API_VERSION = 'v1'
+
+MAX_PAGE_SIZE = 100
+
+TRANSACTION_FIELDS = (
+    'id', 'date', 'created_at', 'title', 'description', 'amount',
+    'transaction_type', 'category_id', 'category__name',
+)
+
+
+def api_login_required(view_func):
+    """เหมือน login_required แต่ตอบ 401 เป็น JSON แทนการ redirect ไปหน้า login"""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'ต้องเข้าสู่ระบบก่อน'}, status=401)
+        return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def _data_etag(request, *args, **kwargs):
+    return caching.request_etag(request, caching.request_data_version(request).version, API_VERSION)
+
+
+def api_view(view_func):
+    """ชุด decorator ของทุก endpoint: ล็อกอิน, GET เท่านั้น, ETag/304, ให้ client ตรวจซ้ำทุกครั้ง"""
+    return api_login_required(
+        require_GET(
+            cache_control(private=True, no_cache=True)(
+                condition(etag_func=_data_etag)(view_func)
+            )
+        )
+    )
+
+
+def _page_size(request):
+    try:
+        size = int(request.GET.get('limit', PAGE_SIZE))
+    except ValueError:
+        return PAGE_SIZE
+    return min(max(size, 1), MAX_PAGE_SIZE)
+
+
+@api_view
+def transactions(request):
+    """
+    รายการธุรกรรมแบบ keyset (ตัวกรองเดียวกับหน้ารายการ: type, category, date_from, date_to)
+    เลื่อนหน้าด้วย ?after=<next> หรือ ?before=<previous> และกำหนดขนาดหน้าด้วย ?limit= (สูงสุด 100)
+    """
+    rows = _filtered_transactions(request).values(*TRANSACTION_FIELDS)
+    page = paginate_keyset(
+        rows,
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+        per_page=_page_size(request),
+    )
+    return JsonResponse({
+        'results': page.object_list,
+        'next': page.next_cursor,
+        'previous': page.previous_cursor,
+    })
+
+
+@api_view
+def dashboard(request):
+    """ยอดรวมเดือนนี้, รายการล่าสุด 10 รายการ และหมวดหมู่ 5 อันดับแรก (ข้อมูลชุดเดียวกับหน้า dashboard)"""
+    today = timezone.localdate()
+    month_start = today.replace(day=1)
+    month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    version = caching.request_data_version(request).version
+    payload = caching.dashboard_payload(request.user, month_start, month_end, version=version)
+    return JsonResponse({
+        'month': {'start': month_start, 'end': month_end},
+        'income': payload['monthly_income'],
+        'expense': payload['monthly_expense'],
+        'balance': payload['monthly_balance'],
+        'recent_transactions': payload['recent_transactions'],
+        'top_categories': payload['category_stats'],
+    })
+
+
+@api_view
+def reports(request):
+    """
+    สรุปช่วงเวลา (preset / date_from / date_to เหมือนหน้ารายงาน) พร้อมยอดแยกหมวดหมู่
+    และยอดย้อนหลังจนถึงวันสิ้นสุดของช่วง ตาม ?granularity=day|week|month|quarter|year
+    (ค่าเริ่มต้น month) จำนวน ?periods= ช่วง
+    """
+    today = timezone.localdate()
+    preset, period_start, period_end = _report_period(request, today)
+
+    granularity = request.GET.get('granularity', 'month')
+    if granularity not in reporting.GRANULARITIES:
+        return JsonResponse({'error': f'granularity ต้องเป็นหนึ่งใน {", ".join(reporting.GRANULARITIES)}'}, status=400)
+    try:
+        periods = min(max(int(request.GET.get('periods', 6)), 1), 60)
+    except ValueError:
+        periods = 6
+
+    summary = reporting.summarize(request.user, period_start, period_end)
+    series = reporting.period_series(request.user, granularity=granularity, periods=periods, end=period_end)
+    return JsonResponse({
+        'period': {'preset': preset, 'start': period_start, 'end': period_end},
+        'income': summary.income,
+        'expense': summary.expense,
+        'balance': summary.balance,
+        'categories': summary.categories,
+        'series': {
+            'granularity': granularity,
+            'periods': [
+                {
+                    'start': period.start,
+                    'label': period.label,
+                    'income': period.income,
+                    'expense': period.expense,
+                    'balance': period.balance,
+                }
+                for period in series
+            ],
+        },
+    })
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class IcandepConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'ICANDEP'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_migrate
+
+        from . import instrumentation, signals
+
+        post_migrate.connect(signals.seed_default_categories, sender=self)
+        # ติดตั้งตัววัดเวลา query กับทุก connection ตั้งแต่ connection แรก
+        connection_created.connect(instrumentation.install_on_connect, dispatch_uid='icandep_instrumentation')
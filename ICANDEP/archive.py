@@ -0,0 +1,163 @@
+"""
+ปิดบัญชีและเก็บถาวรธุรกรรมตามช่วงเวลา (คำสั่ง close_period)
+
+ข้อมูลแบ่งเป็นสองส่วนที่ขอบเขต boundary() (วันแรกหลังช่วงที่ปิดล่าสุด):
+- ข้อมูลร้อน: ตาราง Transaction มีเฉพาะรายการตั้งแต่ boundary ขึ้นไป (หน้ารายการ, ค้นหา, keyset ไม่ต้องข้ามปีเก่า)
+- ข้อมูลเย็น: ArchivedTransaction (PostgreSQL: partition ละหนึ่งช่วง, SQLite: ตารางเดียว) อ่านอย่างเดียว
+  พร้อม PeriodSummary ยอดรวมของแต่ละช่วงที่แช่แข็งไว้ ยอดรวมตั้งแต่เริ่มใช้ระบบ (reporting.summarize)
+  อ่านจาก PeriodSummary ไม่กี่แถวต่อช่วง บวก DailySummary เฉพาะช่วงร้อน
+
+ช่วงต้องปิดเรียงตามเวลา (ไม่มีรายการร้อนก่อนวันแรกของช่วง) และต้องสิ้นสุดก่อนเดือนปัจจุบัน
+DailySummary ของช่วงที่ปิดยังเก็บไว้ (กราฟรายเดือน/รายงานช่วงเก่ายังใช้ได้) แต่ rollups.rebuild()
+จะไม่คำนวณช่วงนั้นใหม่อีก ธุรกรรมที่ลงวันที่ก่อน boundary เพิ่ม/แก้/นำเข้าไม่ได้
+"""
+import re
+from datetime import date
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from .models import ArchivedPeriod, ArchivedTransaction, DataVersion, PeriodSummary, Transaction
+
+BOUNDARY_KEY = 'icandep:archive:boundary'
+
+COLUMNS = (
+    'id', 'user_id', 'title', 'amount', 'transaction_type', 'category_id',
+    'description', 'date', 'created_at', 'updated_at', 'fingerprint',
+)
+
+_PERIOD = re.compile(r'^(\d{4})(?:-(\d{1,2}))?$')
+
+
+class PeriodError(ValueError):
+    """ปิดช่วงนี้ไม่ได้ (ข้อความอธิบายเหตุผลเป็นภาษาไทย)"""
+
+
+def boundary():
+    """วันแรกของข้อมูลร้อน (None = ยังไม่เคยปิดช่วงใด)"""
+    value = cache.get(BOUNDARY_KEY)
+    if value is None:
+        last = ArchivedPeriod.objects.order_by('-end').values_list('end', flat=True).first()
+        value = last.isoformat() if last else ''
+        # process อื่นเห็นช่วงที่ปิดใหม่ภายใน 60 วินาทีแม้ใช้ locmem (ระหว่างนั้นยอดรวมยังถูกต้อง
+        # เพราะ DailySummary ของช่วงที่ปิดยังอยู่ครบ)
+        cache.set(BOUNDARY_KEY, value, timeout=60)
+    return date.fromisoformat(value) if value else None
+
+
+def invalidate():
+    cache.delete(BOUNDARY_KEY)
+
+
+def is_closed(day):
+    """วันที่นี้อยู่ในช่วงที่ปิดบัญชีแล้วหรือไม่"""
+    limit = boundary()
+    return limit is not None and day is not None and day < limit
+
+
+def range_querysets(user, date_from=None, date_to=None):
+    """
+    ธุรกรรมของผู้ใช้ในช่วงวันที่ (รวมวันสุดท้าย ไม่ระบุ = ไม่จำกัด) เรียงตาม date, created_at
+    คืนค่า list ของ queryset ที่ต่อกันตามลำดับ: ส่วนที่เก็บถาวรก่อน (ทุกแถวเก่ากว่าข้อมูลร้อน) แล้วตามด้วยข้อมูลร้อน
+    """
+    filters = {'user': user}
+    if date_from is not None:
+        filters['date__gte'] = date_from
+    if date_to is not None:
+        filters['date__lte'] = date_to
+    hot = Transaction.objects.filter(**filters).order_by('date', 'created_at')
+    limit = boundary()
+    if limit is None or (date_from is not None and date_from >= limit):
+        return [hot]
+    cold = ArchivedTransaction.objects.filter(**filters).order_by('date', 'created_at')
+    if date_to is not None and date_to < limit:
+        return [cold]
+    return [cold, hot]
+
+
+def parse_period(value):
+    """'YYYY' -> ทั้งปี, 'YYYY-MM' -> ทั้งเดือน คืนค่า (วันแรก, วันแรกของช่วงถัดไป)"""
+    match = _PERIOD.match((value or '').strip())
+    if not match:
+        raise PeriodError(f'รูปแบบช่วงไม่ถูกต้อง: {value!r} (ใช้ YYYY หรือ YYYY-MM)')
+    year, month = int(match.group(1)), match.group(2)
+    if month is None:
+        return date(year, 1, 1), date(year + 1, 1, 1)
+    month = int(month)
+    if not 1 <= month <= 12:
+        raise PeriodError(f'เดือนไม่ถูกต้อง: {value!r}')
+    return date(year, month, 1), date(year + month // 12, month % 12 + 1, 1)
+
+
+def _partition_name(start):
+    return f'ICANDEP_transaction_archive_{start:%Y%m%d}'
+
+
+def close_period(start, end):
+    """
+    ปิดช่วง [start, end): แช่แข็งยอดรวม ย้ายธุรกรรมไปตารางเก็บถาวร แล้วลบออกจากตารางร้อน
+    ทั้งหมดอยู่ใน transaction เดียว คืนค่า ArchivedPeriod
+    """
+    if end <= start:
+        raise PeriodError('วันสิ้นสุดต้องหลังวันเริ่มต้น')
+    if end > timezone.localdate().replace(day=1):
+        raise PeriodError(f'ช่วง {start} - {end} ยังไม่สิ้นสุด (ปิดได้เฉพาะช่วงก่อนเดือนปัจจุบัน)')
+
+    with transaction.atomic():
+        last_end = ArchivedPeriod.objects.select_for_update().order_by('-end').values_list('end', flat=True).first()
+        if last_end and start < last_end:
+            raise PeriodError(f'ช่วงนี้ทับกับช่วงที่ปิดไปแล้ว (ปิดถึง {last_end})')
+        earlier = Transaction.objects.filter(date__lt=start).order_by('date').values_list('date', flat=True).first()
+        if earlier:
+            raise PeriodError(f'ยังมีธุรกรรมก่อนช่วงนี้ (ตั้งแต่ {earlier}) ต้องปิดช่วงก่อนหน้าก่อน')
+
+        period = ArchivedPeriod.objects.create(start=start, end=end)
+        rows = Transaction.objects.filter(date__gte=start, date__lt=end)
+
+        # ยอดรวมจากตารางธุรกรรมโดยตรง (ไม่พึ่ง DailySummary ที่อาจคลาดเคลื่อน)
+        frozen = [
+            PeriodSummary(period=period, **row)
+            for row in rows.order_by().values('user_id', 'transaction_type', 'category_id')
+            .annotate(total=Sum('amount'), count=Count('id'))
+        ]
+        PeriodSummary.objects.bulk_create(frozen, batch_size=1000)
+
+        table = connection.ops.quote_name(Transaction._meta.db_table)
+        archive = connection.ops.quote_name(ArchivedTransaction._meta.db_table)
+        columns = ', '.join(connection.ops.quote_name(column) for column in COLUMNS)
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    f'CREATE TABLE {connection.ops.quote_name(_partition_name(start))} '
+                    f'PARTITION OF {archive} FOR VALUES FROM (%s) TO (%s)',
+                    [start, end],
+                )
+            # INSERT ... SELECT และ DELETE ด้วย SQL ตรง: ไม่ส่ง signal ทีละแถว (DailySummary ของช่วงนี้คงเดิม)
+            # บน SQLite trigger ของ FTS ลบแถวออกจากดัชนีค้นหาให้เอง
+            cursor.execute(
+                f'INSERT INTO {archive} ({columns}) SELECT {columns} FROM {table} '
+                f'WHERE "date" >= %s AND "date" < %s',
+                [start, end],
+            )
+            cursor.execute(f'DELETE FROM {table} WHERE "date" >= %s AND "date" < %s', [start, end])
+            period.transactions = cursor.rowcount
+
+        period.save(update_fields=['transactions'])
+        # รายการของผู้ใช้เหล่านี้ย้ายออกจากหน้ารายการ: cache/ETag เดิมใช้ไม่ได้
+        DataVersion.objects.filter(user_id__in={summary.user_id for summary in frozen}).update(
+            version=F('version') + 1, changed_at=timezone.now(),
+        )
+        transaction.on_commit(invalidate)
+    return period
+
+
+def frozen_totals(user):
+    """ยอดรวมของทุกช่วงที่ปิดแล้ว ในรูปแบบเดียวกับ reporting.summarize (GROUP BY ประเภท, หมวดหมู่)"""
+    return (
+        PeriodSummary.objects.filter(user=user)
+        .order_by()
+        .values('transaction_type', 'category__id', 'category__name')
+        .annotate(total=Sum('total'), count=Sum('count'))
+    )
@@ -0,0 +1,67 @@
+"""
+หน้า dashboard และรายงานแบบ async (เปิดด้วย ASYNC_VIEWS=True ภายใต้ ASGI server)
+
+หน้ารายงานต้องรัน query รวมยอด 4 ชุดที่ไม่ขึ้นต่อกัน (กราฟ 6 เดือน, สรุปช่วงที่เลือก,
+สรุปทั้งหมด, ตารางธุรกรรม) view แบบ sync รันทีละชุด เวลารวมจึงเท่ากับผลรวมของทุก query
+ที่นี่รันทั้งหมดพร้อมกันคนละ connection (ดู concurrency.py) เวลารวมจึงใกล้กับ query ที่ช้าที่สุด
+ผลลัพธ์และ template เหมือน view แบบ sync ทุกอย่าง (ใช้ context builder ชุดเดียวกันใน views.py)
+"""
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render
+from django.utils import timezone
+
+from . import caching, concurrency, reporting
+from .views import (
+    _dashboard_error_context, _month_range, _range_transactions, _report_period,
+    _reports_context, conditional_page,
+)
+
+
+async def _data_version(request):
+    # conditional_page อ่านไว้ให้แล้วเกือบทุกครั้ง (ยกเว้นตอนที่มีข้อความ flash รอแสดง)
+    if hasattr(request, '_data_version'):
+        return request._data_version
+    return await sync_to_async(caching.request_data_version)(request)
+
+
+@login_required
+@conditional_page
+async def dashboard(request):
+    """หน้าแดชบอร์ดหลัก"""
+    user = await request.auser()
+    this_month, month_end = _month_range(timezone.now().date())
+    try:
+        data_version = await _data_version(request)
+        context = await caching.adashboard_payload(user, this_month, month_end, data_version.version)
+    except Exception as e:
+        context = await sync_to_async(_dashboard_error_context)(request, e)
+    context['current_month'] = this_month.strftime('%B %Y')
+    return await sync_to_async(render)(request, 'ICANDEP/dashboard.html', context)
+
+
+@login_required
+@conditional_page
+async def reports(request):
+    """หน้ารายงานภาพรวม และสรุปกำไร/ขาดทุน (ข้อมูลชุดเดียวกับ views.reports)"""
+    user = await request.auser()
+    today = timezone.now().date()
+    preset, period_start, period_end = _report_period(request, today)
+
+    monthly_series, range_summary, all_time, range_transactions = await concurrency.gather_queries(
+        partial(reporting.period_series, user, granularity='month', periods=6, end=today),
+        partial(reporting.summarize, user, period_start, period_end),
+        partial(reporting.summarize, user),
+        # archive.boundary() อาจ query ตอน cache หมดอายุ: ต้องเรียกทั้งหมดใน thread ของ worker ไม่ใช่ใน event loop
+        lambda: list(_range_transactions(user, period_start, period_end)),
+    )
+    context = _reports_context(
+        preset, period_start, period_end,
+        monthly_series=monthly_series,
+        range_summary=range_summary,
+        all_time=all_time,
+        range_transactions=range_transactions,
+    )
+    return await sync_to_async(render)(request, 'ICANDEP/reports.html', context)
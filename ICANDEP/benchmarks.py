@@ -0,0 +1,218 @@
+"""
+ชุดวัดประสิทธิภาพของหน้าหลักที่ขนาดข้อมูลต่างๆ (คำสั่ง run_benchmarks)
+
+แต่ละขนาดข้อมูลใช้ผู้ใช้ของตัวเอง (bench_<ขนาด>) ที่สร้างด้วย ICANDEP/synthetic.py ครั้งแรกครั้งเดียว
+แล้วใช้ซ้ำในรอบถัดไป ทุก scenario ถูกเรียกผ่าน django.test.Client (middleware, session, template ครบ
+เหมือน request จริง) อุ่นเครื่อง 1 รอบ นับจำนวน query 1 รอบ จากนั้นจับเวลา repeat รอบ
+ผลลัพธ์เป็น dict ที่เขียนเป็น JSON ได้ เก็บไว้เทียบกันระหว่าง commit
+
+สร้างผู้ใช้และธุรกรรมจำนวนมากในฐานข้อมูลที่ตั้งค่าไว้ จึงรันได้เฉพาะเมื่อตั้ง BENCHMARKS_ENABLED=True
+(ฐานข้อมูลสำหรับวัดผลโดยเฉพาะ ห้ามตั้งบน production)
+"""
+import platform
+import statistics
+import subprocess
+import time
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.contrib.auth.models import Permission, User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Min
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import catalog
+from .models import Transaction
+from .synthetic import RestaurantGenerator, daily_sales_for, date_range
+
+BENCH_USER_PREFIX = 'bench'
+
+ADDED_TITLE = 'ซื้อน้ำแข็ง (benchmark)'
+
+# สิทธิ์ของผู้ใช้ benchmark ในหน้า admin (ดูได้อย่างเดียว ไม่ใช่ superuser)
+ADMIN_PERMISSIONS = ('view_transaction', 'view_category')
+
+
+class BenchmarksDisabled(RuntimeError):
+    pass
+
+
+def ensure_enabled():
+    """raise BenchmarksDisabled ถ้าฐานข้อมูลนี้ไม่ได้ตั้งไว้สำหรับวัดผล"""
+    if not settings.BENCHMARKS_ENABLED:
+        raise BenchmarksDisabled(
+            'run_benchmarks สร้างผู้ใช้และธุรกรรมจำนวนมากในฐานข้อมูล '
+            f'({connection.settings_dict["NAME"]}) ตั้ง BENCHMARKS_ENABLED=True เฉพาะฐานข้อมูลสำหรับวัดผล'
+        )
+
+
+class Scenario:
+    """request หนึ่งแบบที่จะวัด (before: เรียกก่อนทุก request เช่น ล้าง cache)"""
+
+    def __init__(self, name, url_name, method='get', params=None, data=None, before=None, expect=200):
+        self.name = name
+        self.url_name = url_name
+        self.method = method
+        self.params = params
+        self.data = data
+        self.before = before
+        self.expect = expect
+
+    def request(self, client):
+        if self.before:
+            self.before()
+        url = reverse(self.url_name)
+        if self.method == 'post':
+            return client.post(url, self.data() if callable(self.data) else self.data)
+        return client.get(url, self.params() if callable(self.params) else self.params)
+
+
+def _add_transaction_data():
+    category = catalog.get_catalog().active('expense')[0]
+    return {
+        'title': ADDED_TITLE,
+        'amount': '120.00',
+        'transaction_type': 'expense',
+        'category': category.pk,
+        'date': timezone.localdate().isoformat(),
+        'description': '',
+    }
+
+
+def _this_year():
+    today = timezone.localdate()
+    return {'type': 'expense', 'date_from': today.replace(month=1, day=1).isoformat()}
+
+
+SCENARIOS = [
+    Scenario('dashboard', 'ICANDEP:dashboard'),
+    Scenario('dashboard_uncached', 'ICANDEP:dashboard', before=cache.clear),
+    Scenario('transaction_list', 'ICANDEP:transaction_list'),
+    Scenario('transaction_list_filtered', 'ICANDEP:transaction_list', params=_this_year),
+    Scenario('reports', 'ICANDEP:reports'),
+    Scenario('add_transaction', 'ICANDEP:add_transaction', method='post', data=_add_transaction_data, expect=302),
+    Scenario('admin_transactions', 'admin:ICANDEP_transaction_changelist'),
+    Scenario('admin_categories', 'admin:ICANDEP_category_changelist'),
+]
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(0, round(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def bench_user(size, years=3, seed=0, progress=None):
+    """
+    ผู้ใช้ของขนาดข้อมูลนี้ สร้างข้อมูลครั้งแรกครั้งเดียว คืนค่า (user, จำนวนแถวที่สร้างใหม่)
+    เป็นผู้ใช้ธรรมดา (ไม่ใช่ superuser, ไม่มีรหัสผ่าน) staff ที่ดูหน้า admin ของธุรกรรม/หมวดหมู่ได้อย่างเดียว
+    """
+    user, created = User.objects.get_or_create(
+        username=f'{BENCH_USER_PREFIX}_{size}',
+        defaults={'is_staff': True},
+    )
+    if created or user.is_superuser:
+        # ผู้ใช้ benchmark รุ่นก่อนเป็น superuser
+        user.is_superuser = False
+        user.set_unusable_password()
+        user.save(update_fields=['is_superuser', 'password'])
+        user.user_permissions.add(
+            *Permission.objects.filter(content_type__app_label='ICANDEP', codename__in=ADMIN_PERMISSIONS)
+        )
+    existing = Transaction.objects.filter(user=user).count()
+    if existing >= size:
+        return user, 0
+    _, end = date_range(years)
+    if existing:
+        # รอบก่อนถูกหยุดกลางคัน: เติมข้อมูลต่อจากวันที่เก่าที่สุดที่มีอยู่
+        end = Transaction.objects.filter(user=user).aggregate(earliest=Min('date'))['earliest'] - timedelta(days=1)
+    # เผื่อช่วงวันที่ไว้ 2 เท่า ให้ได้ครบ size แถวแม้ยอดขายปีก่อนๆ ต่ำกว่า
+    start = end - timedelta(days=round(years * 365 * 2))
+    generator = RestaurantGenerator(user, daily_sales=daily_sales_for(size, years), seed=seed)
+    return user, generator.generate(start, end, limit=size - existing, progress=progress)
+
+
+def run_scenario(client, scenario, repeat):
+    # รอบแรกไม่นับ (session ใหม่, โหลด catalog, cache ว่าง) รอบที่สองนับจำนวน query
+    scenario.request(client)
+    with CaptureQueriesContext(connection) as queries:
+        response = scenario.request(client)
+    result = {
+        'scenario': scenario.name,
+        'status': response.status_code,
+        'queries': len(queries),
+    }
+    if response.status_code != scenario.expect:
+        result['error'] = f'คาดว่าได้ {scenario.expect} แต่ได้ {response.status_code}'
+        return result
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        scenario.request(client)
+        timings.append((time.perf_counter() - started) * 1000)
+    result.update({
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'mean_ms': round(statistics.mean(timings), 2),
+        'min_ms': round(min(timings), 2),
+        'max_ms': round(max(timings), 2),
+    })
+    return result
+
+
+def run(sizes, repeat=20, scenarios=None, years=3, seed=0, progress=None, on_result=None):
+    """วัดทุก scenario ที่ทุกขนาดข้อมูล คืนค่า dict ของผลทั้งหมด (meta + results)"""
+    ensure_enabled()
+    selected = [scenario for scenario in SCENARIOS if not scenarios or scenario.name in scenarios]
+    results = []
+    for size in sizes:
+        user, _ = bench_user(size, years=years, seed=seed, progress=progress)
+        client = Client()
+        client.force_login(user)
+        rows = Transaction.objects.filter(user=user).count()
+        for scenario in selected:
+            result = {'size': size, 'rows': rows, **run_scenario(client, scenario, repeat)}
+            results.append(result)
+            if on_result:
+                on_result(result)
+        # ลบรายการที่ scenario add_transaction เพิ่มไว้ ข้อมูลรอบถัดไปจึงเท่าเดิม
+        Transaction.objects.filter(user=user, title=ADDED_TITLE).delete()
+    return {'meta': environment(repeat), 'results': results}
+
+
+def environment(repeat):
+    """ข้อมูลของรอบที่วัด สำหรับเทียบผลข้าม commit / เครื่อง"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'repeat': repeat,
+    }
+
+
+def compare(previous, current):
+    """[(size, scenario, p50 เดิม, p50 ใหม่, % ที่เปลี่ยน)] ของ scenario ที่มีในทั้งสองชุด"""
+    before = {(row['size'], row['scenario']): row for row in previous['results'] if 'p50_ms' in row}
+    changes = []
+    for row in current['results']:
+        old = before.get((row['size'], row['scenario']))
+        if old is None or 'p50_ms' not in row:
+            continue
+        delta = (row['p50_ms'] - old['p50_ms']) / old['p50_ms'] * 100 if old['p50_ms'] else 0.0
+        changes.append((row['size'], row['scenario'], old['p50_ms'], row['p50_ms'], delta))
+    return changes
@@ -0,0 +1,80 @@
+"""
+ลบ/แก้ไขธุรกรรมหลายรายการพร้อมกันจากหน้ารายการ (แถวที่เลือก หรือทุกแถวที่ตรงกับตัวกรอง)
+
+แต่ละคำสั่งเป็น UPDATE หรือ DELETE ครั้งเดียวบน queryset ที่กรองด้วยผู้ใช้แล้ว (ไม่ส่ง signal ทีละแถว)
+เงื่อนไขความสอดคล้องของหมวดหมู่กับประเภทอยู่ใน WHERE ของ UPDATE เอง แถวที่ไม่ตรงจึงไม่ถูกแก้
+จากนั้นคำนวณ DailySummary ของช่วงวันที่ที่ได้รับผลใหม่ครั้งเดียว และเพิ่ม DataVersion ครั้งเดียวต่อคำสั่ง
+"""
+from django.db import connections, transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from . import caching, rollups
+from .models import Transaction
+
+
+def _apply(user, queryset, change, extra_days=()):
+    """รัน change(queryset) (คืนจำนวนแถว) แล้วคำนวณยอดรวมของช่วงวันที่เดิม + extra_days ใหม่"""
+    with transaction.atomic():
+        span = queryset.aggregate(first=Min('date'), last=Max('date'))
+        count = change(queryset)
+        if count:
+            days = [day for day in (span['first'], span['last'], *extra_days) if day]
+            rollups.rebuild(user=user, date_from=min(days), date_to=max(days))
+    if count:
+        caching.bump_data_version(user.pk)
+    return count
+
+
+def _delete_rows(rows):
+    """
+    DELETE ครั้งเดียวของแถวใน queryset คืนค่าจำนวนที่ลบ
+    QuerySet.delete() โหลดทุกแถวมาส่ง post_delete ทีละแถว (ปรับ DailySummary และ DataVersion ทีละแถว)
+    ซึ่ง _apply ทำให้ครั้งเดียวอยู่แล้ว ไม่มีตารางอื่นอ้างถึง Transaction จึงลบด้วย SQL ตรงได้
+    (ดัชนีค้นหา FTS บน SQLite ถูกลบตามด้วย trigger) subquery ห่อด้วย derived table
+    เพราะ MySQL ไม่ยอมให้ DELETE อ่านตารางเดียวกันใน subquery ตรงๆ
+    """
+    db = connections[rows.db]
+    selected_sql, params = rows.order_by().values('id').query.sql_with_params()
+    table, pk = db.ops.quote_name(Transaction._meta.db_table), db.ops.quote_name('id')
+    with db.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table} WHERE {pk} IN (SELECT {pk} FROM ({selected_sql}) selected)', params)
+        return cursor.rowcount
+
+
+def delete(user, queryset):
+    """ลบทุกแถวใน queryset คืนค่าจำนวนที่ลบ"""
+    return _apply(user, queryset, _delete_rows)
+
+
+def set_category(user, queryset, category):
+    """ย้ายไปหมวดหมู่ category เฉพาะแถวที่ประเภทเดียวกับหมวดหมู่ คืนค่าจำนวนที่แก้"""
+    return _apply(
+        user,
+        queryset.filter(transaction_type=category.transaction_type),
+        lambda rows: rows.update(category=category, updated_at=timezone.now()),
+    )
+
+
+def set_date(user, queryset, day):
+    """เปลี่ยนวันที่เป็น day คืนค่าจำนวนที่แก้"""
+    return _apply(
+        user,
+        queryset,
+        lambda rows: rows.update(date=day, updated_at=timezone.now()),
+        extra_days=(day,),
+    )
+
+
+def set_type(user, queryset, transaction_type, category=None):
+    """
+    เปลี่ยนประเภทเป็น transaction_type พร้อมหมวดหมู่ใหม่ของประเภทนั้น (หมวดหมู่เดิมเป็นของอีกประเภท)
+    แถวที่เป็นประเภทนี้อยู่แล้วไม่ถูกแก้ คืนค่าจำนวนที่แก้
+    """
+    if category is not None and category.transaction_type != transaction_type:
+        raise ValueError('หมวดหมู่ไม่ตรงกับประเภทธุรกรรม')
+    return _apply(
+        user,
+        queryset.exclude(transaction_type=transaction_type),
+        lambda rows: rows.update(transaction_type=transaction_type, category=category, updated_at=timezone.now()),
+    )
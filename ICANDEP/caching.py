@@ -0,0 +1,174 @@
+"""
+Cache ของหน้า dashboard ต่อผู้ใช้ต่อเดือน
+
+cache key ประกอบด้วยเลขเวอร์ชันข้อมูลของผู้ใช้ (DataVersion) ซึ่งเพิ่มขึ้นทุกครั้งที่มีการ
+บันทึก/ลบ Transaction ของผู้ใช้นั้น และเวอร์ชันของหมวดหมู่ (catalog) ซึ่งเปลี่ยนเมื่อแก้หมวดหมู่
+cache เก่าจึงไม่ถูกอ่านอีกและหมดอายุไปเอง
+ใช้แค่ get/set/add/incr จึงทำงานได้กับ backend ของ Django ทุกแบบ (locmem, file, database)
+โดยไม่ต้องมี Redis
+"""
+import hashlib
+from datetime import datetime, time
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from . import catalog, concurrency, reporting
+from .models import DataVersion, Transaction
+
+HITS_KEY = 'icandep:dashboard:hits'
+MISSES_KEY = 'icandep:dashboard:misses'
+
+# รายการล่าสุดเก็บเป็น dict จาก values() (ไม่สร้าง model instance, pickle เล็กกว่า)
+RECENT_FIELDS = (
+    'id', 'title', 'description', 'amount', 'transaction_type', 'date', 'category_id', 'category__name',
+)
+
+
+def get_data_version(user):
+    """คืนแถว DataVersion ของผู้ใช้ (สร้างใหม่ถ้ายังไม่มี)"""
+    data_version, _ = DataVersion.objects.get_or_create(user=user)
+    return data_version
+
+
+def request_data_version(request):
+    """DataVersion ของผู้ใช้ใน request นี้ (อ่านจากฐานข้อมูลครั้งเดียวต่อ request)"""
+    if not hasattr(request, '_data_version'):
+        request._data_version = get_data_version(request.user)
+    return request._data_version
+
+
+def request_last_modified(request):
+    """
+    Last-Modified ของหน้าที่แสดงข้อมูลผู้ใช้: changed_at ของ DataVersion (เปลี่ยนทั้งตอนเพิ่ม/แก้ไข/ลบ
+    ต่างจาก updated_at ของแถวที่หายไปเมื่อแถวถูกลบ) แต่ไม่เก่ากว่าเที่ยงคืนวันนี้ เพราะหน้าเปลี่ยนตามวันที่
+    """
+    midnight = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+    return max(request_data_version(request).changed_at, midnight)
+
+
+def bump_data_version(user_id):
+    """
+    เพิ่มเลขเวอร์ชันข้อมูลของผู้ใช้ ทำให้ cache ทุกอันที่อิงเวอร์ชันเดิมใช้ไม่ได้
+    ถ้ายังไม่มีแถว แปลว่ายังไม่เคยมี cache ของผู้ใช้นี้ จึงไม่ต้องสร้าง
+    """
+    DataVersion.objects.filter(user_id=user_id).update(
+        version=F('version') + 1,
+        changed_at=timezone.now(),
+    )
+
+
+def request_etag(request, data_version, *parts):
+    """
+    strong ETag ของ response ที่สร้างจากข้อมูลของผู้ใช้
+    เปลี่ยนเมื่อ: ข้อมูลผู้ใช้เปลี่ยน (DataVersion), หมวดหมู่เปลี่ยน, path/query string ต่างกัน,
+    หรือขึ้นวันใหม่ (ช่วง "เดือนนี้"/"วันนี้" เลื่อนไป) และเมื่อ parts เปลี่ยน (เช่น CSRF secret ของหน้า HTML)
+    """
+    query = '&'.join(sorted(f'{key}={value}' for key, values in request.GET.lists() for value in values))
+    raw = '|'.join(str(part) for part in (
+        request.path, query, data_version, catalog.current_version(), timezone.localdate(), *parts,
+    ))
+    digest = hashlib.blake2b(raw.encode(), digest_size=12).hexdigest()
+    return f'{request.user.pk}-{data_version}-{digest}'
+
+
+def _count(key):
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # key ถูก evict ไประหว่าง add กับ incr
+        cache.set(key, 1, timeout=None)
+
+
+def cache_stats():
+    """จำนวน hit/miss ของ cache หน้า dashboard"""
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 3) if total else None,
+        'backend': settings.CACHES['default']['BACKEND'],
+    }
+
+
+def reset_cache_stats():
+    cache.delete_many([HITS_KEY, MISSES_KEY])
+
+
+def _dashboard_key(user, month_start, version):
+    # ชื่อหมวดหมู่อยู่ใน payload (รายการล่าสุด, หมวดหมู่ 5 อันดับแรก): แก้หมวดหมู่แล้วต้องไม่อ่าน cache เดิม
+    return f'icandep:dashboard:{user.pk}:{month_start:%Y-%m}:{version}:{catalog.current_version()}'
+
+
+def _build_dashboard_payload(month_summary, recent_transactions):
+    return {
+        'monthly_income': month_summary.income,
+        'monthly_expense': month_summary.expense,
+        'monthly_balance': month_summary.balance,
+        'recent_transactions': recent_transactions,
+        'category_stats': month_summary.categories[:5],
+    }
+
+
+def _recent_transactions(user):
+    return list(Transaction.objects.filter(user=user).values(*RECENT_FIELDS)[:10])
+
+
+def dashboard_payload(user, month_start, month_end, version=None):
+    """
+    ข้อมูลของหน้า dashboard (ยอดรวมเดือนนี้, รายการล่าสุด, หมวดหมู่ 5 อันดับแรก)
+    อ่านจาก cache ถ้ามี ไม่เช่นนั้นคำนวณใหม่แล้วเก็บไว้
+    version: เวอร์ชันข้อมูลที่อ่านมาแล้ว (ไม่ต้อง query ซ้ำ)
+    """
+    if version is None:
+        version = get_data_version(user).version
+    key = _dashboard_key(user, month_start, version)
+    payload = cache.get(key)
+    if payload is not None:
+        _count(HITS_KEY)
+        return payload
+
+    _count(MISSES_KEY)
+    payload = _build_dashboard_payload(
+        reporting.summarize(user, month_start, month_end),
+        _recent_transactions(user),
+    )
+    cache.set(key, payload, timeout=settings.DASHBOARD_CACHE_TIMEOUT)
+    return payload
+
+
+async def _acount(key):
+    await cache.aadd(key, 0, timeout=None)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, 1, timeout=None)
+
+
+async def adashboard_payload(user, month_start, month_end, version):
+    """
+    dashboard_payload สำหรับ view แบบ async: ถ้า cache miss จะรันยอดรวมของเดือน
+    และรายการล่าสุดพร้อมกันคนละ connection (ดู concurrency.py)
+    """
+    # อ่านเวอร์ชันหมวดหมู่ด้วย cache API แบบ sync (backend db จะ query) จึงต้องไม่เรียกใน event loop
+    key = await sync_to_async(_dashboard_key)(user, month_start, version)
+    payload = await cache.aget(key)
+    if payload is not None:
+        await _acount(HITS_KEY)
+        return payload
+
+    await _acount(MISSES_KEY)
+    month_summary, recent_transactions = await concurrency.gather_queries(
+        partial(reporting.summarize, user, month_start, month_end),
+        partial(_recent_transactions, user),
+    )
+    payload = _build_dashboard_payload(month_summary, recent_transactions)
+    await cache.aset(key, payload, timeout=settings.DASHBOARD_CACHE_TIMEOUT)
+    return payload
@@ -0,0 +1,86 @@
+"""
+Cache ของหมวดหมู่ (Category) ในหน่วยความจำของ process
+
+หมวดหมู่ใช้ร่วมกันทุกผู้ใช้และแทบไม่เปลี่ยน จึงโหลดทั้งตารางครั้งเดียวแล้วเก็บไว้ใน process
+พร้อมเลขเวอร์ชัน ซึ่งอยู่ในฐานข้อมูล (CatalogVersion) ให้ทุก process/worker เห็นค่าเดียวกัน
+เมื่อหมวดหมู่ถูกบันทึกหรือลบ (signal) เลขเวอร์ชันจะเพิ่มขึ้น และแต่ละ process จะโหลดใหม่เองในครั้งถัดไป
+
+เลขเวอร์ชันถูก cache ไว้ใน Django cache เพียง CATALOG_VERSION_TIMEOUT วินาที (ไม่ต้อง query ทุกครั้ง)
+ถ้า cache ใช้ร่วมกัน (redis/ไฟล์/ฐานข้อมูล) ทุก worker เห็นเวอร์ชันใหม่ทันที
+ถ้าเป็น locmem worker อื่นจะเห็นภายในเวลานั้น
+
+หมายเหตุ: QuerySet.update()/bulk_create() ไม่ส่ง signal ต้องเรียก invalidate() เอง
+"""
+import copy
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CatalogVersion, Category
+
+VERSION_KEY = 'icandep:catalog:version'
+
+_catalog = None
+
+
+class Catalog:
+    """ภาพรวมหมวดหมู่ทั้งหมด ณ เวอร์ชันหนึ่ง (ห้ามแก้ไข instance ที่อยู่ในนี้)"""
+
+    def __init__(self, version, categories):
+        self.version = version
+        self.all = tuple(categories)
+        self.by_id = {category.pk: category for category in self.all}
+        self.by_key = {(category.name, category.transaction_type): category for category in self.all}
+        self.by_type = {}
+        for category in self.all:
+            if category.is_active:
+                self.by_type.setdefault(category.transaction_type, []).append(category)
+
+    def get(self, pk):
+        """หมวดหมู่จาก id (คืนสำเนา เพื่อให้ผู้เรียกแก้ไข/ผูกกับ model อื่นได้)"""
+        try:
+            category = self.by_id[int(pk)]
+        except (KeyError, TypeError, ValueError):
+            return None
+        return copy.copy(category)
+
+    def find(self, name, transaction_type):
+        return self.by_key.get((name, transaction_type))
+
+    def active(self, transaction_type=None):
+        """หมวดหมู่ที่ใช้งานอยู่ เรียงตามประเภทและชื่อ (กรองตามประเภทได้)"""
+        if transaction_type:
+            return list(self.by_type.get(transaction_type, ()))
+        return [category for category in self.all if category.is_active]
+
+
+def current_version():
+    """เลขเวอร์ชันปัจจุบันของหมวดหมู่ (ไม่โหลด catalog) 0 = ยังไม่เคยเปลี่ยนหมวดหมู่"""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = CatalogVersion.objects.values_list('version', flat=True).first() or 0
+        cache.set(VERSION_KEY, version, timeout=settings.CATALOG_VERSION_TIMEOUT)
+    return version
+
+
+def get_catalog():
+    """Catalog ของเวอร์ชันปัจจุบัน (โหลดจากฐานข้อมูลเฉพาะเมื่อเวอร์ชันเปลี่ยน)"""
+    global _catalog
+    version = current_version()
+    catalog = _catalog
+    if catalog is None or catalog.version != version:
+        catalog = Catalog(version, Category.objects.order_by('transaction_type', 'name'))
+        _catalog = catalog
+    return catalog
+
+
+def invalidate():
+    """เพิ่มเลขเวอร์ชันในฐานข้อมูล ทุก process จะโหลดหมวดหมู่ใหม่"""
+    global _catalog
+    _catalog = None
+    updated = CatalogVersion.objects.update(version=F('version') + 1, changed_at=timezone.now())
+    if not updated:
+        CatalogVersion.objects.get_or_create(pk=1)
+    cache.delete(VERSION_KEY)
@@ -0,0 +1,38 @@
+"""
+รัน query หลายชุดพร้อมกันจาก view แบบ async
+
+async ORM ของ Django (aget, acount, async for ...) ส่งทุก query ไปทำใน thread เดียวกัน
+(sync_to_async(thread_sensitive=True)) query ที่ gather พร้อมกันจึงยังรันต่อคิวกันทีละตัว
+ที่นี่จึงรันแต่ละงานใน thread pool ของตัวเองด้วย thread_sensitive=False ทำให้แต่ละงานได้
+connection ฐานข้อมูลของตัวเองและรันขนานกันจริง เวลารวมจึงใกล้กับ query ที่ช้าที่สุดตัวเดียว
+
+connection ของ Django ผูกกับ thread: ก่อนและหลังแต่ละงานจึงเรียก close_old_connections()
+เพื่อไม่ให้ connection ที่หมดอายุหรือเสียค้างอยู่ใน thread ของ pool
+ควรใช้คู่กับ CONN_MAX_AGE=0 + connection pool (DB_POOL=True หรือ pgbouncer) ดู PERFORMANCE.md
+
+ข้อจำกัด: งานที่รันแยก thread มองไม่เห็น transaction ที่ยังไม่ commit ของ request
+(ไม่มีปัญหาสำหรับหน้าที่อ่านอย่างเดียว) และบน SQLite จะไม่เร็วขึ้นมากเพราะอ่านจากไฟล์เดียวกัน
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+
+def in_own_connection(func, *args, **kwargs):
+    """awaitable ที่รัน func(*args, **kwargs) ใน thread ของ pool ด้วย connection ของ thread นั้น"""
+    def run():
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run, thread_sensitive=False)()
+
+
+async def gather_queries(*calls):
+    """
+    รันหลายงานพร้อมกัน คืนผลลัพธ์ตามลำดับ
+    calls: callable ที่ไม่รับ argument (ใช้ functools.partial หรือ lambda)
+    """
+    return await asyncio.gather(*(in_own_connection(call) for call in calls))
@@ -0,0 +1,211 @@
+"""
+ส่งออกธุรกรรมเป็นไฟล์ CSV / Excel (XLSX) แบบ streaming
+
+อ่านข้อมูลด้วย values_list(...).iterator(chunk_size=...) แล้วเขียนออกไปทีละแถว
+หน่วยความจำจึงคงที่ ไม่ว่าจะส่งออก 100 แถวหรือ 1 ล้านแถว ชื่อหมวดหมู่มาจาก JOIN
+ใน query เดียว ไม่มีการ query เพิ่มต่อแถว
+"""
+import csv
+import io
+import re
+import zipfile
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django.template.defaultfilters import filesizeformat
+
+from .models import Transaction
+
+CHUNK_SIZE = 2000
+
+EXPORT_FIELDS = ('date', 'transaction_type', 'category__name', 'title', 'description', 'amount')
+
+EXPORT_HEADER = ['วันที่', 'ประเภท', 'หมวดหมู่', 'รายการ', 'รายละเอียด', 'จำนวนเงิน']
+
+TYPE_LABELS = dict(Transaction.TRANSACTION_TYPES)
+
+# ข้อความที่ขึ้นต้นด้วยตัวอักษรเหล่านี้ Excel/LibreOffice ตีความเป็นสูตร (CSV/formula injection)
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# ตัวอักษรควบคุมที่ XML 1.0 ไม่อนุญาต (ไฟล์ XLSX ที่มีตัวอักษรเหล่านี้ Excel เปิดไม่ได้)
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+
+def safe_text(value):
+    """ข้อความจากผู้ใช้ที่ปลอดภัยสำหรับเปิดใน spreadsheet: เติม ' หน้าข้อความที่จะกลายเป็นสูตร"""
+    if value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def export_rows(querysets):
+    """
+    แถวข้อมูลสำหรับส่งออก (ไม่สร้าง model instance)
+    querysets: queryset เดียว หรือ list ของ queryset ที่ต่อกันตามลำดับ (เช่น ตารางเก็บถาวร + ตารางปัจจุบัน)
+    """
+    if isinstance(querysets, QuerySet):
+        querysets = [querysets]
+    for queryset in querysets:
+        rows = queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=CHUNK_SIZE)
+        for row_date, transaction_type, category_name, title, description, amount in rows:
+            yield [
+                row_date.isoformat(),
+                TYPE_LABELS.get(transaction_type, transaction_type),
+                safe_text(category_name or ''),
+                safe_text(title),
+                safe_text(description or ''),
+                amount,
+            ]
+
+
+class _Echo:
+    """buffer ที่คืนค่าที่ถูกเขียนทันที ใช้คู่กับ csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows):
+    # BOM เพื่อให้ Excel เปิดภาษาไทยได้ถูกต้อง
+    yield '\ufeff'
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+class _ChunkBuffer:
+    """ไฟล์ปลายทางของ ZipFile ที่เก็บ byte ไว้ให้ generator ดึงออกไปเป็นช่วงๆ (ไม่รองรับ seek)"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+_XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="transactions" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def _xlsx_row(values):
+    cells = []
+    for value in values:
+        if isinstance(value, (int, float, Decimal)):
+            cells.append(f'<c><v>{value}</v></c>')
+        else:
+            text = escape(_ILLEGAL_XML_CHARS.sub('', str(value)))
+            cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row>{"".join(cells)}</row>'
+
+
+def stream_xlsx(header, rows):
+    """
+    เขียนไฟล์ XLSX ขั้นต่ำ (sheet เดียว, inline string) แบบ streaming
+    ไม่ต้องพึ่ง openpyxl และไม่ต้องเก็บทั้งไฟล์ไว้ในหน่วยความจำ
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            archive.writestr(name, content)
+        yield buffer.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', mode='w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(header).encode())
+            for count, row in enumerate(rows, start=1):
+                sheet.write(_xlsx_row(row).encode())
+                if count % CHUNK_SIZE == 0:
+                    yield buffer.drain()
+            sheet.write(b'</sheetData></worksheet>')
+        yield buffer.drain()
+    yield buffer.drain()
+
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+
+
+def _export_stream(queryset, file_format):
+    """(chunk ของไฟล์, content type, นามสกุล) ของไฟล์ส่งออก"""
+    rows = export_rows(queryset)
+    if file_format == 'xlsx':
+        return stream_xlsx(EXPORT_HEADER, rows), XLSX_CONTENT_TYPE, 'xlsx'
+    return stream_csv(EXPORT_HEADER, rows), CSV_CONTENT_TYPE, 'csv'
+
+
+def export_response(queryset, filename, file_format='csv'):
+    """StreamingHttpResponse ของไฟล์ส่งออก (csv หรือ xlsx)"""
+    chunks, content_type, extension = _export_stream(queryset, file_format)
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+    return response
+
+
+class ExportTooLarge(ValueError):
+    pass
+
+
+def export_file(queryset, filename, file_format='csv', max_bytes=None):
+    """
+    ไฟล์ส่งออกทั้งไฟล์เป็น bytes (สำหรับงานเบื้องหลังที่เก็บผลลัพธ์ไว้ในฐานข้อมูล)
+    คืนค่า (ชื่อไฟล์, content type, ข้อมูล)
+    max_bytes: ถ้าไฟล์ใหญ่เกินนี้ หยุดอ่านทันทีแล้ว raise ExportTooLarge (หน่วยความจำไม่เกินขนาดนี้มากนัก)
+    """
+    chunks, content_type, extension = _export_stream(queryset, file_format)
+    buffer = io.BytesIO()
+    for chunk in chunks:
+        buffer.write(chunk.encode() if isinstance(chunk, str) else chunk)
+        if max_bytes is not None and buffer.tell() > max_bytes:
+            chunks.close()
+            raise ExportTooLarge(f'ไฟล์ใหญ่เกิน {filesizeformat(max_bytes)}')
+    return f'{filename}.{extension}', content_type, buffer.getvalue()
@@ -1,10 +1,64 @@
 from django import forms
+from django.db import transaction
+from django.forms.models import ModelChoiceIteratorValue
+
+from . import archive, caching, catalog, rollups
 from .models import Transaction, Category
 
+
+class CatalogChoiceIterator:
+    """ตัวเลือกของ CatalogChoiceField สร้างจาก list ใน catalog (ไม่ query ฐานข้อมูล)"""
+
+    def __init__(self, field):
+        self.field = field
+
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for category in self.field.categories:
+            yield (ModelChoiceIteratorValue(category.pk, category), self.field.label_from_instance(category))
+
+    def __len__(self):
+        return len(self.field.categories) + (self.field.empty_label is not None)
+
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.field.categories)
+
+
+class CatalogChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField ของหมวดหมู่ที่อ่านตัวเลือกและตรวจค่าจาก catalog แทน queryset
+    ฟอร์มต้องตั้งค่า categories เป็น list ของ Category ที่อนุญาต
+    (field ถูกสร้างตอน import ฟอร์ม จึงยังไม่โหลด catalog ที่นี่)
+    """
+    iterator = CatalogChoiceIterator
+    categories = ()
+
+    def __deepcopy__(self, memo):
+        result = super().__deepcopy__(memo)
+        result.categories = list(self.categories)
+        return result
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        # ตรวจกับตัวเลือกที่ฟอร์มตั้งไว้แล้ว ไม่ต้องอ่าน catalog ซ้ำทุกฟอร์ม
+        for category in self.categories:
+            if str(category.pk) == str(value):
+                return category
+        raise forms.ValidationError(
+            self.error_messages['invalid_choice'],
+            code='invalid_choice',
+            params={'value': value},
+        )
+
 class TransactionForm(forms.ModelForm):
     class Meta:
         model = Transaction
         fields = ['title', 'amount', 'transaction_type', 'category', 'description', 'date']
+        field_classes = {
+            'category': CatalogChoiceField,
+        }
         widgets = {
             'title': forms.TextInput(attrs={
                 'class': 'form-control',
@@ -35,38 +89,43 @@ class TransactionForm(forms.ModelForm):
             }),
         }
     
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, category_catalog=None, **kwargs):
         super().__init__(*args, **kwargs)
         # ตั้งค่าวันที่เริ่มต้นเป็นวันนี้
         if not self.instance.pk:  # ถ้าเป็นการสร้างใหม่
             self.fields['date'].initial = forms.DateField().to_python(None)
         
-        # กรองหมวดหมู่ตาม transaction_type
-        try:
-            transaction_type = self.data.get('transaction_type') or (self.instance.transaction_type if self.instance.pk else None)
-            if transaction_type:
-                self.fields['category'].queryset = Category.objects.filter(
-                    transaction_type=transaction_type,
-                    is_active=True
-                ).order_by('name')
-            else:
-                self.fields['category'].queryset = Category.objects.filter(is_active=True).order_by('name')
-            
+        # กรองหมวดหมู่ตาม transaction_type (จาก catalog ไม่ query ฐานข้อมูล)
+        # category_catalog: catalog ที่โหลดไว้แล้ว (formset ส่งชุดเดียวกันให้ทุกแถว)
+        transaction_type = self.data.get(self.add_prefix('transaction_type')) or (self.instance.transaction_type if self.instance.pk else None)
+        self.fields['category'].categories = (category_catalog or catalog.get_catalog()).active(transaction_type)
+        
+        if self.fields['category'].categories:
             # ตั้งค่า required สำหรับ category
             self.fields['category'].required = True
             self.fields['category'].empty_label = '-- เลือกหมวดหมู่ --'
-        except Exception:
-            # ถ้าเกิด error (เช่น ตาราง Category ยังไม่มี) ให้ใช้ queryset ว่าง
-            self.fields['category'].queryset = Category.objects.none()
+        else:
             self.fields['category'].required = False
             self.fields['category'].empty_label = '-- ยังไม่มีหมวดหมู่ --'
     
+    def _get_validation_exclusions(self):
+        # หมวดหมู่ถูกตรวจกับ catalog แล้ว ไม่ต้องให้ ForeignKey.validate query ซ้ำ
+        exclude = super()._get_validation_exclusions()
+        exclude.add('category')
+        return exclude
+    
     def clean_amount(self):
         amount = self.cleaned_data.get('amount')
         if amount <= 0:
             raise forms.ValidationError('จำนวนเงินต้องมากกว่า 0')
         return amount
     
+    def clean_date(self):
+        value = self.cleaned_data.get('date')
+        if archive.is_closed(value):
+            raise forms.ValidationError(f'ช่วงเวลาก่อน {archive.boundary():%d/%m/%Y} ปิดบัญชีแล้ว')
+        return value
+    
     def clean(self):
         cleaned_data = super().clean()
         transaction_type = cleaned_data.get('transaction_type')
@@ -81,6 +140,154 @@ class TransactionForm(forms.ModelForm):
         return cleaned_data
 
 
+class BatchTransactionForm(TransactionForm):
+    """หนึ่งแถวในหน้าบันทึกหลายรายการ (widget แบบบรรทัดเดียว ไม่กำหนด id ตายตัว)"""
+    field_order = ['transaction_type', 'category', 'title', 'amount', 'date', 'description']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in ('transaction_type', 'category'):
+            self.fields[name].widget.attrs.pop('id', None)
+        # แถวว่างตัดสินจากค่าเริ่มต้นของ formset ไม่ต้องส่ง initial-* ของวันที่ (default ของ model) มากับฟอร์ม
+        self.fields['date'].show_hidden_initial = False
+        self.fields['description'].widget = forms.TextInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'ไม่บังคับ',
+        })
+
+
+class BaseTransactionBatchFormSet(forms.BaseFormSet):
+    """
+    ชุดฟอร์มบันทึกหลายรายการในครั้งเดียว (เช่น ปิดร้านสิ้นวัน 30-80 รายการ)
+    - ทุกแถวตรวจหมวดหมู่กับ catalog ชุดเดียวกันที่โหลดครั้งเดียว
+    - แถวที่ไม่ได้กรอก (ไม่ต่างจากค่าเริ่มต้น) ถูกข้าม แถวที่ถูกต้องบันทึกได้แม้บางแถวผิด
+    - save() บันทึกด้วย bulk_create ครั้งเดียว แล้วคำนวณ DailySummary และเพิ่มเวอร์ชันข้อมูลครั้งเดียว
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.form_kwargs.setdefault('category_catalog', catalog.get_catalog())
+
+    def split(self):
+        """แยกแถวที่กรอกแล้วเป็น (ถูกต้อง, ผิดพลาด) ถ้า management form เสียหายคืน ([], [])"""
+        if self.non_form_errors():
+            return [], []
+        valid, failed = [], []
+        for form in self.forms:
+            if not form.has_changed():
+                continue
+            (valid if form.is_valid() else failed).append(form)
+        return valid, failed
+
+    def subset(self, forms):
+        """formset ใหม่ที่มีเฉพาะแถวที่ระบุ (เรียงเลขแถวใหม่) พร้อมข้อผิดพลาดเดิม สำหรับแสดงซ้ำ"""
+        data = {
+            f'{self.prefix}-TOTAL_FORMS': str(len(forms)),
+            f'{self.prefix}-INITIAL_FORMS': '0',
+        }
+        for index, form in enumerate(forms):
+            for name in form.fields:
+                data[f'{self.prefix}-{index}-{name}'] = self.data.get(form.add_prefix(name), '')
+        formset = type(self)(data, prefix=self.prefix, form_kwargs=self.form_kwargs)
+        formset.full_clean()
+        return formset
+
+    def save(self, user, forms):
+        """บันทึกแถวที่ตรวจแล้วทั้งหมดใน transaction เดียว คืนค่าจำนวนที่บันทึก"""
+        objs = []
+        for form in forms:
+            obj = form.save(commit=False)
+            obj.user = user
+            objs.append(obj)
+        if not objs:
+            return 0
+        days = [obj.date for obj in objs]
+        with transaction.atomic():
+            # bulk_create ไม่ส่ง signal: คำนวณ DailySummary ของช่วงวันที่นี้ใหม่ครั้งเดียว
+            Transaction.objects.bulk_create(objs, batch_size=1000)
+            rollups.rebuild(user=user, date_from=min(days), date_to=max(days))
+        caching.bump_data_version(user.pk)
+        return len(objs)
+
+
+TransactionBatchFormSet = forms.formset_factory(
+    BatchTransactionForm,
+    formset=BaseTransactionBatchFormSet,
+    extra=10,
+    max_num=100,
+    absolute_max=100,
+    validate_max=True,
+)
+
+
+class IdListField(forms.Field):
+    """รายการ id จาก checkbox หลายตัวชื่อเดียวกัน (ค่าที่ไม่ใช่ตัวเลขถือว่าผิด)"""
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        if not value:
+            return []
+        try:
+            return sorted({int(item) for item in value})
+        except (TypeError, ValueError):
+            raise forms.ValidationError('รายการที่เลือกไม่ถูกต้อง', code='invalid')
+
+
+class BulkActionForm(forms.Form):
+    """คำสั่งกับธุรกรรมหลายรายการในหน้ารายการ (ICANDEP/bulkactions.py)"""
+    ACTIONS = [
+        ('delete', 'ลบ'),
+        ('category', 'เปลี่ยนหมวดหมู่'),
+        ('date', 'เปลี่ยนวันที่'),
+        ('type', 'เปลี่ยนประเภท'),
+    ]
+    MAX_IDS = 500
+
+    action = forms.ChoiceField(choices=ACTIONS)
+    ids = IdListField(required=False)
+    # ทุกแถวที่ตรงกับตัวกรองใน query string (ไม่ใช่เฉพาะแถวที่เห็นในหน้านี้)
+    select_all = forms.BooleanField(required=False)
+    category = CatalogChoiceField(queryset=Category.objects.none(), required=False)
+    transaction_type = forms.ChoiceField(choices=Transaction.TRANSACTION_TYPES, required=False)
+    date = forms.DateField(required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['category'].categories = catalog.get_catalog().active()
+
+    def clean_date(self):
+        value = self.cleaned_data.get('date')
+        if archive.is_closed(value):
+            raise forms.ValidationError(f'ช่วงเวลาก่อน {archive.boundary():%d/%m/%Y} ปิดบัญชีแล้ว')
+        return value
+
+    def clean(self):
+        cleaned_data = super().clean()
+        action = cleaned_data.get('action')
+        ids = cleaned_data.get('ids') or []
+        category = cleaned_data.get('category')
+        transaction_type = cleaned_data.get('transaction_type')
+
+        if not ids and not cleaned_data.get('select_all'):
+            raise forms.ValidationError('กรุณาเลือกรายการอย่างน้อย 1 รายการ')
+        if len(ids) > self.MAX_IDS:
+            raise forms.ValidationError(f'เลือกได้ไม่เกิน {self.MAX_IDS} รายการต่อครั้ง')
+        if action == 'category' and category is None:
+            self.add_error('category', 'กรุณาเลือกหมวดหมู่')
+        if action == 'date' and cleaned_data.get('date') is None and 'date' not in self.errors:
+            self.add_error('date', 'กรุณาเลือกวันที่')
+        if action == 'type':
+            if not transaction_type:
+                self.add_error('transaction_type', 'กรุณาเลือกประเภท')
+            elif category is None and any(
+                option.transaction_type == transaction_type for option in self.fields['category'].categories
+            ):
+                self.add_error('category', 'กรุณาเลือกหมวดหมู่ของประเภทใหม่')
+            elif category is not None and category.transaction_type != transaction_type:
+                self.add_error('category', 'หมวดหมู่ที่เลือกไม่ตรงกับประเภทธุรกรรม')
+        return cleaned_data
+
+
 class CategoryForm(forms.ModelForm):
     """ฟอร์มเพิ่ม/แก้ไขหมวดหมู่ (ให้ผู้ใช้จัดการเองในระบบ)"""
 
@@ -107,4 +314,74 @@ class CategoryForm(forms.ModelForm):
             'is_active': forms.CheckboxInput(attrs={
                 'class': 'form-check-input',
             }),
-        }
\ No newline at end of file
+        }
+
+    def validate_unique(self):
+        """
+        ตรวจชื่อซ้ำ (ชื่อ + ประเภท) ด้วย exists() จากฐานข้อมูล ไม่ใช่ catalog
+        catalog ของ process อื่นอาจยังไม่เห็นหมวดหมู่ที่เพิ่งเพิ่ม ชื่อซ้ำต้องเป็น error ของฟอร์ม ไม่ใช่ IntegrityError
+        """
+        name = self.cleaned_data.get('name')
+        transaction_type = self.cleaned_data.get('transaction_type')
+        duplicates = Category.objects.filter(name=name, transaction_type=transaction_type).exclude(pk=self.instance.pk)
+        if name and transaction_type and duplicates.exists():
+            self.add_error(None, forms.ValidationError(
+                'มีหมวดหมู่ชื่อ "%(name)s" ของประเภทนี้อยู่แล้ว',
+                code='unique_together',
+                params={'name': name},
+            ))
+
+
+class CategoryMergeForm(forms.Form):
+    """รวมหมวดหมู่: ย้ายธุรกรรมทั้งหมดไปหมวดหมู่อื่นของประเภทเดียวกัน (ICANDEP/reassign.py)"""
+    THEN_CHOICES = [
+        ('delete', 'ลบหมวดหมู่เดิม'),
+        ('deactivate', 'ปิดใช้งานหมวดหมู่เดิม (เก็บไว้ดูย้อนหลัง)'),
+    ]
+
+    target = CatalogChoiceField(
+        queryset=Category.objects.none(),
+        label='ย้ายไปหมวดหมู่',
+        empty_label='-- เลือกหมวดหมู่ --',
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+    then = forms.ChoiceField(
+        choices=THEN_CHOICES,
+        initial='delete',
+        label='หลังย้ายแล้ว',
+        widget=forms.RadioSelect(attrs={'class': 'form-check-input'}),
+    )
+
+    def __init__(self, source, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.source = source
+        # เฉพาะหมวดหมู่ที่ใช้งานอยู่ของประเภทเดียวกัน (จาก catalog ไม่ query)
+        self.fields['target'].categories = [
+            category for category in catalog.get_catalog().active(source.transaction_type)
+            if category.pk != source.pk
+        ]
+
+
+class TransactionImportForm(forms.Form):
+    """อัปโหลดไฟล์ CSV เพื่อนำเข้าธุรกรรม (ICANDEP/importers.py)"""
+    DEFAULT_TYPE_CHOICES = [
+        ('income', 'รายรับ (เช่น ไฟล์ยอดขายจาก POS)'),
+        ('expense', 'รายจ่าย'),
+    ]
+
+    file = forms.FileField(
+        label='ไฟล์ CSV (UTF-8)',
+        error_messages={'required': 'กรุณาเลือกไฟล์ CSV'},
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,text/csv'}),
+    )
+    default_type = forms.ChoiceField(
+        choices=DEFAULT_TYPE_CHOICES,
+        initial='income',
+        required=False,
+        label='ประเภทเริ่มต้น (เมื่อไฟล์ไม่ระบุ)',
+        widget=forms.Select(attrs={'class': 'form-select'}),
+    )
+
+    def clean_default_type(self):
+        # ไม่ส่งมา = รายรับ (ไฟล์ยอดขายจาก POS) ค่าอื่นนอกจากตัวเลือกถูก ChoiceField ปฏิเสธไปแล้ว
+        return self.cleaned_data['default_type'] or 'income'
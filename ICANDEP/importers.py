@@ -0,0 +1,319 @@
+"""
+นำเข้าธุรกรรมจำนวนมากจากไฟล์ CSV (ไฟล์ส่งออกรายวันของ POS, statement ธนาคาร)
+
+- จับคู่คอลัมน์จากชื่อหัวตาราง (ไทย/อังกฤษ) และจับคู่หมวดหมู่จากชื่อ
+- ตรวจสอบและบันทึกทีละ batch ด้วย bulk_create (บน PostgreSQL ใช้ COPY)
+- แต่ละแถวมี fingerprint ที่ไม่ซ้ำต่อผู้ใช้ นำเข้าไฟล์เดิมซ้ำจึงไม่เกิดรายการซ้ำ
+- หลังนำเข้า สร้างยอดรวมรายวันใหม่เฉพาะช่วงวันที่ที่ได้รับผลกระทบ
+"""
+import csv
+import hashlib
+import io
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import archive, caching, catalog, rollups
+from .models import DataVersion, Transaction
+
+BATCH_SIZE = 5000
+
+MAX_AMOUNT = Decimal('99999999.99')
+
+COLUMN_ALIASES = {
+    'date': ['date', 'วันที่', 'transaction date', 'posting date', 'วันที่ทำรายการ'],
+    'transaction_type': ['type', 'transaction_type', 'ประเภท'],
+    'category': ['category', 'หมวดหมู่'],
+    'title': ['title', 'item', 'รายการ', 'สินค้า'],
+    'description': ['description', 'memo', 'note', 'รายละเอียด', 'หมายเหตุ'],
+    'amount': ['amount', 'total', 'จำนวนเงิน', 'ยอดเงิน'],
+    'credit': ['credit', 'deposit', 'เงินเข้า', 'ฝาก'],
+    'debit': ['debit', 'withdrawal', 'เงินออก', 'ถอน'],
+}
+
+TYPE_ALIASES = {
+    'income': 'income', 'รายรับ': 'income', 'in': 'income', 'credit': 'income',
+    'expense': 'expense', 'รายจ่าย': 'expense', 'out': 'expense', 'debit': 'expense',
+}
+
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y', '%Y/%m/%d']
+
+COPY_COLUMNS = [
+    'user_id', 'title', 'amount', 'transaction_type', 'category_id',
+    'description', 'date', 'created_at', 'updated_at', 'fingerprint',
+]
+
+
+class RowError(ValueError):
+    pass
+
+
+class ImportResult:
+    """สรุปผลการนำเข้า"""
+
+    def __init__(self):
+        self.processed = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.errors = []  # (เลขบรรทัด, ข้อความ error, ข้อมูลแถวเดิม)
+        self.date_from = None
+        self.date_to = None
+
+    def add_error(self, line, message, row):
+        self.errors.append((line, message, row))
+
+    def write_errors(self, stream, fieldnames, limit=None):
+        """เขียนแถวที่ผิดพลาดเป็น CSV (บรรทัด, error, คอลัมน์เดิม)"""
+        writer = csv.writer(stream)
+        writer.writerow(['line', 'error', *fieldnames])
+        for line, message, row in self.errors[:limit]:
+            writer.writerow([line, message, *(row.get(name, '') for name in fieldnames)])
+
+
+def _parse_date(value):
+    value = value.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+        if parsed.year > 2400:
+            # statement ธนาคารไทยมักใช้ปี พ.ศ.
+            parsed = parsed.replace(year=parsed.year - 543)
+        return parsed
+    raise RowError(f'รูปแบบวันที่ไม่ถูกต้อง: {value}')
+
+
+def _parse_amount(value):
+    cleaned = value.replace(',', '').replace('฿', '').strip()
+    if not cleaned:
+        return None
+    try:
+        return Decimal(cleaned)
+    except InvalidOperation:
+        raise RowError(f'จำนวนเงินไม่ถูกต้อง: {value}')
+
+
+class TransactionImporter:
+    """
+    นำเข้าไฟล์ CSV ให้ผู้ใช้หนึ่งคน
+    progress: callback(result) ถูกเรียกหลังบันทึกแต่ละ batch
+    """
+
+    def __init__(self, user, default_type='income', batch_size=BATCH_SIZE, use_copy=None, progress=None):
+        if default_type not in dict(Transaction.TRANSACTION_TYPES):
+            raise ValueError(f'ประเภทเริ่มต้นไม่ถูกต้อง: {default_type}')
+        self.user = user
+        self.default_type = default_type
+        self.batch_size = batch_size
+        self.use_copy = connection.vendor == 'postgresql' if use_copy is None else use_copy
+        self.progress = progress
+        self.columns = {}
+        self.fieldnames = []
+        self.result = None
+        self._occurrences = {}
+        self.closed_before = archive.boundary()
+        self._load_categories()
+
+    def _load_categories(self):
+        """จับคู่หมวดหมู่ด้วยชื่อ จาก catalog ที่โหลดไว้แล้ว"""
+        self.categories = {}
+        self.category_types = {}
+        for category in catalog.get_catalog().all:
+            key = category.name.strip().casefold()
+            self.categories[(key, category.transaction_type)] = (category.pk, category.name)
+            self.category_types.setdefault(key, set()).add(category.transaction_type)
+
+    def _map_columns(self, fieldnames):
+        normalized = {name.strip().casefold(): name for name in fieldnames if name}
+        for field, aliases in COLUMN_ALIASES.items():
+            for alias in aliases:
+                if alias in normalized:
+                    self.columns[field] = normalized[alias]
+                    break
+        if 'date' not in self.columns:
+            raise ValueError('ไม่พบคอลัมน์วันที่ (date / วันที่)')
+        if not {'amount', 'credit', 'debit'} & self.columns.keys():
+            raise ValueError('ไม่พบคอลัมน์จำนวนเงิน (amount / จำนวนเงิน หรือ credit / debit)')
+
+    def _value(self, row, field):
+        column = self.columns.get(field)
+        return (row.get(column) or '').strip() if column else ''
+
+    def parse_row(self, row):
+        """แปลงหนึ่งแถวเป็น dict ของค่าที่จะบันทึก (raise RowError ถ้าไม่ถูกต้อง)"""
+        row_date = _parse_date(self._value(row, 'date'))
+        if self.closed_before is not None and row_date < self.closed_before:
+            raise RowError(f'ช่วงเวลาก่อน {self.closed_before} ปิดบัญชีแล้ว')
+
+        transaction_type = None
+        raw_type = self._value(row, 'transaction_type').casefold()
+        if raw_type:
+            transaction_type = TYPE_ALIASES.get(raw_type)
+            if transaction_type is None:
+                raise RowError(f'ประเภทไม่ถูกต้อง: {raw_type}')
+
+        amount = _parse_amount(self._value(row, 'amount'))
+        if amount is None:
+            credit = _parse_amount(self._value(row, 'credit'))
+            debit = _parse_amount(self._value(row, 'debit'))
+            if credit:
+                amount, transaction_type = credit, transaction_type or 'income'
+            elif debit:
+                amount, transaction_type = debit, transaction_type or 'expense'
+        if amount is None:
+            raise RowError('ไม่มีจำนวนเงิน')
+        if amount < 0:
+            amount = -amount
+            transaction_type = transaction_type or 'expense'
+        if amount == 0 or amount > MAX_AMOUNT:
+            raise RowError(f'จำนวนเงินต้องมากกว่า 0 และไม่เกิน {MAX_AMOUNT}')
+
+        category_id = None
+        category_name = self._value(row, 'category')
+        if category_name:
+            key = category_name.casefold()
+            if transaction_type is None and len(self.category_types.get(key, ())) == 1:
+                transaction_type = next(iter(self.category_types[key]))
+            transaction_type = transaction_type or self.default_type
+            match = self.categories.get((key, transaction_type))
+            if match is None:
+                raise RowError(f'ไม่พบหมวดหมู่ "{category_name}" ของประเภท {transaction_type}')
+            category_id, category_name = match
+        transaction_type = transaction_type or self.default_type
+
+        title = self._value(row, 'title') or category_name or 'รายการนำเข้า'
+        description = self._value(row, 'description') or None
+        amount = amount.quantize(Decimal('0.01'))
+
+        return {
+            'title': title[:200],
+            'amount': amount,
+            'transaction_type': transaction_type,
+            'category_id': category_id,
+            'description': description,
+            'date': row_date,
+            'fingerprint': self._fingerprint(row_date, transaction_type, amount, title, description),
+        }
+
+    def _fingerprint(self, row_date, transaction_type, amount, title, description):
+        """
+        hash ของเนื้อหาแถว ต่อท้ายด้วยลำดับที่ซ้ำในไฟล์
+        (เช่น ขายกาแฟ 50 บาท 2 แก้วในวันเดียวกัน ยังนับเป็น 2 รายการ)
+        """
+        content = f'{row_date}|{transaction_type}|{amount}|{title}|{description or ""}'
+        base = hashlib.blake2b(content.encode(), digest_size=16).digest()
+        occurrence = self._occurrences.get(base, 0)
+        self._occurrences[base] = occurrence + 1
+        return f'{base.hex()}-{occurrence}'
+
+    def run(self, stream):
+        """
+        อ่าน CSV จาก text stream แล้วนำเข้าทั้งหมด คืนค่า ImportResult
+        ถ้าไฟล์เสียกลางทาง (UnicodeDecodeError, csv.Error) batch ก่อนหน้าถูกบันทึกไปแล้ว
+        ยอดรวมและ DataVersion จึงต้องปรับเสมอ ผลลัพธ์ถึงจุดที่ผิดพลาดอยู่ใน self.result
+        """
+        reader = csv.DictReader(stream)
+        self.result = result = ImportResult()
+        try:
+            self.fieldnames = reader.fieldnames or []
+            self._map_columns(self.fieldnames)
+
+            batch = []
+            for line, row in enumerate(reader, start=2):
+                result.processed += 1
+                try:
+                    values = self.parse_row(row)
+                except RowError as e:
+                    result.add_error(line, str(e), row)
+                    continue
+                batch.append(values)
+                if result.date_from is None or values['date'] < result.date_from:
+                    result.date_from = values['date']
+                if result.date_to is None or values['date'] > result.date_to:
+                    result.date_to = values['date']
+                if len(batch) >= self.batch_size:
+                    self._flush(batch, result)
+                    batch = []
+            if batch:
+                self._flush(batch, result)
+        finally:
+            if result.inserted:
+                rollups.rebuild(user=self.user, date_from=result.date_from, date_to=result.date_to)
+                caching.bump_data_version(self.user.pk)
+        return result
+
+    def _flush(self, batch, result):
+        if self.use_copy:
+            inserted = self._insert_copy(batch)
+        else:
+            inserted = self._insert_bulk(batch)
+        result.inserted += inserted
+        result.duplicates += len(batch) - inserted
+        if self.progress:
+            self.progress(result)
+
+    def _insert_bulk(self, batch):
+        """
+        bulk_create เฉพาะแถวที่ยังไม่เคยนำเข้า (ตรวจ fingerprint ใน query เดียว)
+        bulk_create(ignore_conflicts=True) ไม่บอกว่าข้ามไปกี่แถว จึงนับจำนวนที่บันทึกจริงจากฐานข้อมูล
+        โดยล็อกแถว DataVersion ของผู้ใช้ไว้ การนำเข้าของผู้ใช้เดียวกันพร้อมกันจึงทำทีละ batch
+        และไม่มีแถวของอีกฝ่ายแทรกเข้ามาระหว่างตรวจกับนับ
+        """
+        fingerprints = [values['fingerprint'] for values in batch]
+        matching = Transaction.objects.filter(user=self.user, fingerprint__in=fingerprints)
+        with transaction.atomic():
+            DataVersion.objects.select_for_update().get_or_create(user=self.user)
+            existing = set(matching.values_list('fingerprint', flat=True))
+            objs = [
+                Transaction(user=self.user, **values)
+                for values in batch
+                if values['fingerprint'] not in existing
+            ]
+            if not objs:
+                return 0
+            Transaction.objects.bulk_create(objs, batch_size=1000, ignore_conflicts=True)
+            return matching.count() - len(existing)
+
+    def _insert_copy(self, batch):
+        """
+        PostgreSQL: COPY เข้าตารางชั่วคราว แล้ว INSERT ... ON CONFLICT DO NOTHING
+        แถวที่ fingerprint ซ้ำจะถูกข้ามโดยฐานข้อมูล
+        ตารางชั่วคราวถูก DROP ทันทีหลังใช้ (ON COMMIT DROP ไม่พอเมื่ออยู่ใน atomic() ชั้นนอก
+        เพราะ batch ถัดไปหรือการนำเข้าครั้งที่สองใน transaction เดียวกันจะสร้างตารางชื่อซ้ำ)
+        """
+        now = timezone.now()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for values in batch:
+            writer.writerow([
+                self.user.pk, values['title'], values['amount'], values['transaction_type'],
+                values['category_id'] if values['category_id'] is not None else '',
+                values['description'] or '', values['date'].isoformat(),
+                now.isoformat(), now.isoformat(), values['fingerprint'],
+            ])
+        buffer.seek(0)
+
+        table = connection.ops.quote_name(Transaction._meta.db_table)
+        columns = ', '.join(COPY_COLUMNS)
+        copy_sql = f'COPY icandep_import ({columns}) FROM STDIN WITH (FORMAT csv)'
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMP TABLE icandep_import ON COMMIT DROP AS '
+                f'SELECT {columns} FROM {table} WITH NO DATA'
+            )
+            raw = cursor.cursor
+            if hasattr(raw, 'copy_expert'):
+                raw.copy_expert(copy_sql, buffer)
+            else:
+                with raw.copy(copy_sql) as copy:
+                    copy.write(buffer.getvalue())
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) SELECT {columns} FROM icandep_import '
+                f'ON CONFLICT DO NOTHING'
+            )
+            inserted = cursor.rowcount
+            cursor.execute('DROP TABLE icandep_import')
+            return inserted
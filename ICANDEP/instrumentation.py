@@ -0,0 +1,316 @@
+"""
+วัดเวลาของทุก request แยกตาม view: จำนวน query + เวลาฐานข้อมูล, เวลา render template และเวลารวม
+
+- PerformanceMiddleware เก็บค่าของ request ปัจจุบันไว้ใน ContextVar แล้วส่งออกเป็น header
+  Server-Timing (ดูได้ใน DevTools > Network > Timing) และบันทึกลง histogram ในหน่วยความจำ
+  header ส่งให้ใครบ้างกำหนดด้วย PERF_SERVER_TIMING: 'staff' (ค่าเริ่มต้น: staff หรือเมื่อ DEBUG),
+  'all' (ทุก client) หรือ 'off'
+- เวลาฐานข้อมูลวัดด้วย execute wrapper ที่ติดตั้งกับทุก connection (connection.execute_wrappers)
+  เพราะ ContextVar ถูกส่งต่อเข้า thread ของ sync_to_async ด้วย query ที่ view แบบ async
+  รันขนานกันคนละ connection (ICANDEP/concurrency.py) จึงถูกนับรวมใน request เดียวกัน
+- เวลา template วัดจาก TimedDjangoTemplates (backend ใน TEMPLATES) เฉพาะการ render ชั้นนอกสุด
+  ({% include %} / {% extends %} อยู่ในนั้นแล้ว) รวม query ที่ queryset แบบ lazy รันระหว่าง render ด้วย
+- histogram เก็บเป็นช่วงเวลา (PERF_HISTOGRAM_WINDOW วินาที) ย้อนหลัง PERF_HISTOGRAM_WINDOWS ช่วง
+  ค่าเก่ากว่านั้นหลุดออกไปเอง หน่วยความจำจึงคงที่ เป็นค่าของ process นี้เท่านั้น (แต่ละ worker แยกกัน)
+
+query ที่ช้ากว่า SLOW_QUERY_MS ส่งต่อให้ ICANDEP/slowqueries.py บันทึกพร้อมแผนการ query
+
+ไม่ import model เพราะ backend ของ template ถูกโหลดก่อน app registry พร้อม
+"""
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import DjangoTemplates
+
+from . import slowqueries
+
+# ขอบบนของแต่ละช่อง histogram (ms) ช่องสุดท้ายคือเกิน 10 วินาที
+BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+_current = ContextVar('icandep_request_metrics', default=None)
+
+
+class RequestMetrics:
+    """ค่าที่สะสมระหว่าง request หนึ่ง (query อาจมาจากหลาย thread พร้อมกัน จึงมี lock)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.lock = threading.Lock()
+
+    def add_query(self, duration):
+        with self.lock:
+            self.queries += 1
+            self.db_time += duration
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def current_metrics():
+    """RequestMetrics ของ request ที่กำลังทำงาน (None เมื่ออยู่นอก request เช่น management command)"""
+    return _current.get()
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        result = execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        metrics.add_query(duration)
+    if settings.SLOW_QUERY_MS and duration * 1000 >= settings.SLOW_QUERY_MS:
+        slowqueries.record(metrics, sql, params, many, context['connection'], duration)
+    return result
+
+
+def _install(connection):
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute_wrapper)
+
+
+def install_on_connect(sender, connection, **kwargs):
+    """รับ signal connection_created (เชื่อมใน apps.ready)"""
+    _install(connection)
+
+
+class TimedTemplate:
+    """ห่อ template ของ backend เพื่อจับเวลา render()"""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return self.template.render(context, request)
+        metrics.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics.template_depth -= 1
+            if metrics.template_depth == 0:
+                metrics.template_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates ที่จับเวลา render ของ request ปัจจุบัน (ตั้งค่าใน TEMPLATES['BACKEND'])"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+class LatencyHistograms:
+    """
+    histogram เวลารวมต่อ view แบบหน้าต่างเลื่อน: เก็บ windows ช่วงล่าสุด ช่วงละ window วินาที
+    """
+
+    def __init__(self, window=None, windows=None):
+        self.window = window
+        self.windows = windows
+        self.lock = threading.Lock()
+        self.slots = None
+
+    def _slots(self):
+        if self.slots is None:
+            self.window = self.window or settings.PERF_HISTOGRAM_WINDOW
+            self.windows = self.windows or settings.PERF_HISTOGRAM_WINDOWS
+            self.slots = deque(maxlen=self.windows)
+        return self.slots
+
+    def record(self, view, status, total_ms, db_ms, queries, template_ms):
+        now = time.time()
+        with self.lock:
+            slots = self._slots()
+            if not slots or now - slots[-1][0] >= self.window:
+                slots.append((now - now % self.window, {}))
+            stats = slots[-1][1].get(view)
+            if stats is None:
+                stats = slots[-1][1][view] = _empty_stats()
+            stats['count'] += 1
+            stats['errors'] += status >= 500
+            stats['buckets'][_bucket(total_ms)] += 1
+            stats['total_ms'] += total_ms
+            stats['max_ms'] = max(stats['max_ms'], total_ms)
+            stats['db_ms'] += db_ms
+            stats['queries'] += queries
+            stats['template_ms'] += template_ms
+
+    def snapshot(self):
+        """รวมทุกช่วงที่ยังเก็บอยู่ คืนค่าสถิติต่อ view เรียงตามเวลารวมมากไปน้อย"""
+        merged = {}
+        with self.lock:
+            slots = list(self._slots())
+            for _, views in slots:
+                for view, stats in views.items():
+                    target = merged.get(view)
+                    if target is None:
+                        target = merged[view] = _empty_stats()
+                    for key in ('count', 'errors', 'total_ms', 'db_ms', 'queries', 'template_ms'):
+                        target[key] += stats[key]
+                    target['max_ms'] = max(target['max_ms'], stats['max_ms'])
+                    target['buckets'] = [a + b for a, b in zip(target['buckets'], stats['buckets'])]
+
+        rows = []
+        for view, stats in merged.items():
+            count = stats['count']
+            rows.append({
+                'view': view,
+                'count': count,
+                'errors': stats['errors'],
+                'mean_ms': round(stats['total_ms'] / count, 2),
+                'p50_ms': _quantile(stats, 0.5),
+                'p95_ms': _quantile(stats, 0.95),
+                'p99_ms': _quantile(stats, 0.99),
+                'max_ms': round(stats['max_ms'], 2),
+                'mean_db_ms': round(stats['db_ms'] / count, 2),
+                'mean_queries': round(stats['queries'] / count, 1),
+                'mean_template_ms': round(stats['template_ms'] / count, 2),
+                'total_ms': round(stats['total_ms'], 2),
+                'histogram': {
+                    (f'<={bound}' if bound else f'>{BUCKETS[-1]}'): n
+                    for bound, n in zip((*BUCKETS, None), stats['buckets'])
+                },
+            })
+        rows.sort(key=lambda row: row['total_ms'], reverse=True)
+        return {
+            'window_seconds': self.window,
+            'windows': len(slots),
+            'since': slots[0][0] if slots else None,
+            'views': rows,
+        }
+
+    def reset(self):
+        with self.lock:
+            self.slots = None
+
+
+def _empty_stats():
+    return {
+        'count': 0, 'errors': 0, 'buckets': [0] * (len(BUCKETS) + 1),
+        'total_ms': 0.0, 'max_ms': 0.0, 'db_ms': 0.0, 'queries': 0, 'template_ms': 0.0,
+    }
+
+
+def _bucket(value):
+    for index, bound in enumerate(BUCKETS):
+        if value <= bound:
+            return index
+    return len(BUCKETS)
+
+
+def _quantile(stats, q):
+    """ค่าประมาณ quantile จาก histogram (ขอบบนของช่องที่ถึง q ช่องสุดท้ายใช้ค่าสูงสุดจริง)"""
+    target = q * stats['count']
+    seen = 0
+    for index, n in enumerate(stats['buckets']):
+        seen += n
+        if seen >= target and n:
+            return BUCKETS[index] if index < len(BUCKETS) else round(stats['max_ms'], 2)
+    return round(stats['max_ms'], 2)
+
+
+histograms = LatencyHistograms()
+
+
+def _timing_mode():
+    """'all', 'staff' หรือ 'off' (เมื่อ DEBUG ส่งให้ทุก client)"""
+    mode = settings.PERF_SERVER_TIMING
+    if mode == 'staff' and settings.DEBUG:
+        return 'all'
+    return mode
+
+
+def _send_timing(user):
+    # เวลาของ query/template ช่วยเดาขนาดข้อมูลและจุดที่ช้าได้ โหมด 'staff' จึงส่งให้เฉพาะ staff
+    mode = _timing_mode()
+    if mode == 'staff':
+        return user is not None and user.is_authenticated and user.is_staff
+    return mode == 'all'
+
+
+class PerformanceMiddleware:
+    """
+    ใส่ Server-Timing (db, tpl, app) ใน response ตาม PERF_SERVER_TIMING และบันทึก histogram ต่อ view
+    วางไว้ต้นๆ ของ MIDDLEWARE เพื่อให้เวลารวมครอบคลุม session/auth ด้วย
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = self._start()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        response = self._finish(request, response, metrics)
+        if _send_timing(getattr(request, 'user', None)):
+            response.headers['Server-Timing'] = metrics.server_timing
+        return response
+
+    async def __acall__(self, request):
+        metrics = self._start()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        response = self._finish(request, response, metrics)
+        # request.user ใน view แบบ async ยังไม่ถูกโหลด ต้องใช้ auser() (ห้าม query ใน event loop)
+        user = await request.auser() if _timing_mode() == 'staff' and hasattr(request, 'auser') else None
+        if _send_timing(user):
+            response.headers['Server-Timing'] = metrics.server_timing
+        return response
+
+    def _start(self):
+        # connection ที่เปิดไว้ก่อนโหลด middleware นี้ (ไม่ผ่าน connection_created) ก็ต้องถูกนับ
+        for connection in connections.all(initialized_only=True):
+            _install(connection)
+        return RequestMetrics()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = _current.get()
+        if metrics is not None and request.resolver_match is not None:
+            metrics.view = request.resolver_match.view_name
+
+    def _finish(self, request, response, metrics):
+        total_ms = metrics.elapsed() * 1000
+        db_ms = metrics.db_time * 1000
+        template_ms = metrics.template_time * 1000
+        metrics.server_timing = ', '.join([
+            f'db;desc="{metrics.queries} queries";dur={db_ms:.1f}',
+            f'tpl;desc="template";dur={template_ms:.1f}',
+            f'app;desc="total";dur={total_ms:.1f}',
+        ])
+        histograms.record(
+            metrics.view or '<unresolved>', response.status_code,
+            total_ms, db_ms, metrics.queries, template_ms,
+        )
+        return response
@@ -0,0 +1,205 @@
+"""
+คิวงานเบื้องหลังในฐานข้อมูล (ตาราง Job) สำหรับงานที่นานเกิน timeout ของ request
+
+- enqueue() เพิ่มงานเข้าคิว (งานเดียวกันที่ยังรอ/กำลังทำอยู่จะไม่ถูกเพิ่มซ้ำ)
+- worker (คำสั่ง run_jobs) หยิบงานด้วย claim():
+  PostgreSQL / MySQL ใช้ SELECT ... FOR UPDATE SKIP LOCKED worker หลายตัวจึงหยิบงานพร้อมกันได้
+  โดยไม่รอ lock กัน ส่วน SQLite (ไม่มี SKIP LOCKED) ใช้ UPDATE ... WHERE status='queued'
+  แบบ compare-and-set ตัวที่ UPDATE ได้ 1 แถวคือผู้ได้งาน
+- ผลลัพธ์ที่เป็นไฟล์เก็บใน Job.result (BinaryField) ผู้ใช้ดาวน์โหลดได้จากหน้ารายงาน
+  ไฟล์ที่ใหญ่เกิน JOB_RESULT_MAX_BYTES ทำให้งานล้มเหลวทันที (ไม่เก็บก้อนใหญ่ไว้ในแถวเดียว)
+- งานที่ค้างสถานะ running นานเกิน JOB_STALE_AFTER (worker ตาย) ถูกคืนเข้าคิวจนครบ JOB_MAX_ATTEMPTS
+"""
+import os
+import socket
+import traceback
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.urls import reverse
+from django.utils import timezone
+
+from . import archive, caching, rollups
+from .models import Job
+
+# จำนวนครั้งที่ลองแย่งงานใหม่เมื่อ worker อื่นหยิบงานเดียวกันไปก่อน (เฉพาะแบบ compare-and-set)
+CLAIM_ATTEMPTS = 5
+
+# ฟิลด์ของ Job ที่ส่งให้หน้าเว็บ (ไม่อ่านคอลัมน์ result ที่อาจใหญ่หลาย MB)
+STATUS_FIELDS = (
+    'id', 'kind', 'params', 'status', 'error', 'result_name', 'result_size',
+    'created_at', 'started_at', 'finished_at',
+)
+
+
+class JobError(Exception):
+    """ข้อผิดพลาดที่คาดไว้แล้ว: งานล้มเหลวโดยเก็บเฉพาะข้อความนี้ (ไม่เก็บ traceback)"""
+
+
+def export_report(job):
+    """ส่งออกธุรกรรมของช่วงวันที่ (ไม่ระบุช่วง = ทั้งหมด) เป็น CSV/XLSX"""
+    from .exports import ExportTooLarge, export_file
+
+    params = job.params
+    date_from = date.fromisoformat(params['date_from']) if params.get('date_from') else None
+    date_to = date.fromisoformat(params['date_to']) if params.get('date_to') else None
+    # รวมรายการของช่วงที่ปิดบัญชีแล้ว (ตารางเก็บถาวร) ก่อนรายการปัจจุบัน
+    transactions = archive.range_querysets(job.user, date_from, date_to)
+    filename = 'report-{}-{}'.format(
+        (params.get('date_from') or 'start').replace('-', ''),
+        (params.get('date_to') or 'end').replace('-', ''),
+    )
+    try:
+        return export_file(
+            transactions, filename, params.get('format', 'csv'), max_bytes=settings.JOB_RESULT_MAX_BYTES,
+        )
+    except ExportTooLarge as e:
+        raise JobError(f'{e} กรุณาเลือกช่วงวันที่ให้สั้นลง')
+
+
+def rebuild_rollups(job):
+    """สร้าง DailySummary ใหม่ (ของผู้ใช้เจ้าของงาน หรือทั้งระบบถ้าไม่มีผู้ใช้)"""
+    params = job.params
+    date_from = date.fromisoformat(params['date_from']) if params.get('date_from') else None
+    date_to = date.fromisoformat(params['date_to']) if params.get('date_to') else None
+    rollups.rebuild(user=job.user, date_from=date_from, date_to=date_to)
+    if job.user_id is not None:
+        caching.bump_data_version(job.user_id)
+    return None
+
+
+# ชนิดงาน -> ฟังก์ชันที่รับ Job แล้วคืน (ชื่อไฟล์, content type, bytes) หรือ None ถ้าไม่มีไฟล์ผลลัพธ์
+HANDLERS = {
+    'export_report': export_report,
+    'rebuild_rollups': rebuild_rollups,
+}
+
+KIND_LABELS = {
+    'export_report': 'ส่งออกรายงาน',
+    'rebuild_rollups': 'สร้างยอดรวมรายวันใหม่',
+}
+
+
+def enqueue(kind, user=None, **params):
+    """เพิ่มงานเข้าคิว ถ้ามีงานชนิดและพารามิเตอร์เดียวกันที่ยังไม่เสร็จอยู่แล้ว คืนงานเดิม"""
+    if kind not in HANDLERS:
+        raise ValueError(f'ไม่รู้จักงานชนิด {kind}')
+    pending = Job.objects.filter(
+        user=user, kind=kind, status__in=[Job.STATUS_QUEUED, Job.STATUS_RUNNING],
+    ).only('pk', 'params')
+    for job in pending:
+        if job.params == params:
+            return job
+    return Job.objects.create(user=user, kind=kind, params=params)
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim(worker):
+    """หยิบงานที่รอนานที่สุดมาทำ (เปลี่ยนสถานะเป็น running) คืน Job หรือ None ถ้าคิวว่าง"""
+    if connection.features.has_select_for_update_skip_locked:
+        return _claim_skip_locked(worker)
+    return _claim_compare_and_set(worker)
+
+
+def _queued():
+    return Job.objects.filter(status=Job.STATUS_QUEUED).order_by('created_at', 'id')
+
+
+def _claim_skip_locked(worker):
+    with transaction.atomic():
+        job = _queued().select_for_update(skip_locked=True).defer('result').first()
+        if job is None:
+            return None
+        job.status = Job.STATUS_RUNNING
+        job.worker = worker
+        job.started_at = timezone.now()
+        job.attempts += 1
+        job.save(update_fields=['status', 'worker', 'started_at', 'attempts'])
+    return job
+
+
+def _claim_compare_and_set(worker):
+    for _ in range(CLAIM_ATTEMPTS):
+        pk = _queued().values_list('pk', flat=True).first()
+        if pk is None:
+            return None
+        claimed = Job.objects.filter(pk=pk, status=Job.STATUS_QUEUED).update(
+            status=Job.STATUS_RUNNING,
+            worker=worker,
+            started_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.defer('result').get(pk=pk)
+    return None
+
+
+def run(job):
+    """รันงานที่ claim มาแล้ว แล้วบันทึกผลลัพธ์หรือข้อผิดพลาด คืนค่า True ถ้าสำเร็จ"""
+    try:
+        output = HANDLERS[job.kind](job)
+    except Exception as e:
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.STATUS_FAILED,
+            error=str(e) if isinstance(e, JobError) else traceback.format_exc()[-4000:],
+            finished_at=timezone.now(),
+        )
+        return False
+
+    fields = {'status': Job.STATUS_DONE, 'error': '', 'finished_at': timezone.now()}
+    if output is not None:
+        name, content_type, content = output
+        fields.update(result=content, result_name=name, result_content_type=content_type, result_size=len(content))
+    Job.objects.filter(pk=job.pk).update(**fields)
+    return True
+
+
+def requeue_stale():
+    """
+    คืนงานที่ค้าง running นานเกิน JOB_STALE_AFTER วินาที (worker ถูก kill / timeout) เข้าคิว
+    งานที่รันครบ JOB_MAX_ATTEMPTS แล้วถือว่าล้มเหลว คืนค่า (จำนวนที่คืนเข้าคิว, จำนวนที่ล้มเหลว)
+    """
+    stale = Job.objects.filter(
+        status=Job.STATUS_RUNNING,
+        started_at__lt=timezone.now() - timedelta(seconds=settings.JOB_STALE_AFTER),
+    )
+    failed = stale.filter(attempts__gte=settings.JOB_MAX_ATTEMPTS).update(
+        status=Job.STATUS_FAILED,
+        error='worker หยุดทำงานระหว่างรันงานนี้',
+        finished_at=timezone.now(),
+    )
+    requeued = stale.update(status=Job.STATUS_QUEUED, worker='')
+    return requeued, failed
+
+
+def purge_finished(days=None):
+    """ลบงานที่เสร็จ/ล้มเหลวนานเกิน JOB_RESULT_DAYS วัน (พร้อมไฟล์ผลลัพธ์) คืนค่าจำนวนที่ลบ"""
+    days = settings.JOB_RESULT_DAYS if days is None else days
+    deleted, _ = Job.objects.filter(
+        status__in=[Job.STATUS_DONE, Job.STATUS_FAILED],
+        finished_at__lt=timezone.now() - timedelta(days=days),
+    ).delete()
+    return deleted
+
+
+def recent_jobs(user, kind=None, limit=10):
+    """สถานะงานล่าสุดของผู้ใช้ สำหรับหน้าเว็บ poll (ไม่อ่านไฟล์ผลลัพธ์)"""
+    jobs = Job.objects.filter(user=user)
+    if kind:
+        jobs = jobs.filter(kind=kind)
+    rows = list(jobs.values(*STATUS_FIELDS)[:limit])
+    for row in rows:
+        row['label'] = KIND_LABELS.get(row['kind'], row['kind'])
+        row['status_label'] = dict(Job.STATUSES)[row['status']]
+        # ไม่ส่ง traceback ให้ผู้ใช้ แสดงแค่บรรทัดสุดท้าย
+        row['error'] = row['error'].strip().splitlines()[-1] if row['error'] else ''
+        row['download_url'] = (
+            reverse('ICANDEP:job_download', args=[row['id']])
+            if row['status'] == Job.STATUS_DONE and row['result_name'] else None
+        )
+    return rows
@@ -0,0 +1,84 @@
+"""
+สมุดบัญชีแบบ statement ธนาคาร: ทุกรายการพร้อมยอดคงเหลือหลังรายการนั้น (หน้า ledger)
+
+ต้นทุนของทุกหน้าเท่ากันไม่ว่าจะอยู่ลึกแค่ไหน:
+1. แถวของหน้าแบ่งแบบ keyset ตามลำดับเดียวกับหน้ารายการ (-date, -created_at, -id)
+2. ยอดยกมา (ยอดคงเหลือก่อนแถวที่เก่าที่สุดของหน้า) ไม่ Sum จากตาราง Transaction ทั้งประวัติ
+   แต่รวมจากจุดตรวจที่เก็บไว้แล้ว: PeriodSummary ของช่วงที่ปิดบัญชี (ICANDEP/archive.py)
+   + DailySummary ตั้งแต่ boundary ถึงวันก่อนหน้า + ธุรกรรมวันเดียวกันที่เก่ากว่าแถวนั้น
+3. ยอดสะสมภายในหน้าคำนวณในฐานข้อมูลด้วย Window(Sum(...)) เฉพาะแถวของหน้านั้น (id__in)
+"""
+from decimal import Decimal
+
+from django.db.models import Case, DecimalField, F, Q, Sum, Value, When, Window
+from django.db.models.functions import Coalesce
+
+from . import archive
+from .models import DailySummary, PeriodSummary, Transaction
+from .pagination import KEYSET_ORDERING, PAGE_SIZE, paginate_keyset
+
+AMOUNT = DecimalField(max_digits=14, decimal_places=2)
+
+# SQLite รวม DecimalField เป็นเลขทศนิยมลอยตัว ปัดกลับเป็นสตางค์
+CENT = Decimal('0.01')
+
+CHRONOLOGICAL = (F('date').asc(), F('created_at').asc(), F('id').asc())
+
+
+def _signed(field):
+    """รายรับเป็นบวก รายจ่ายเป็นลบ"""
+    return Case(
+        When(transaction_type='income', then=F(field)),
+        default=-F(field),
+        output_field=AMOUNT,
+    )
+
+
+def _signed_total(queryset, field):
+    return queryset.aggregate(
+        total=Coalesce(Sum(_signed(field)), Value(Decimal('0')), output_field=AMOUNT),
+    )['total']
+
+
+def opening_balance(user, row):
+    """ยอดคงเหลือก่อน row (ทุกรายการที่เก่ากว่า row ตามลำดับ date, created_at, id)"""
+    summaries = DailySummary.objects.filter(user=user, day__lt=row.date)
+    balance = Decimal('0')
+    limit = archive.boundary()
+    if limit is not None and row.date >= limit:
+        # ช่วงที่ปิดบัญชีแล้วใช้ยอดที่แช่แข็งไว้ (ไม่กี่แถวต่อช่วง) แทน DailySummary ทั้งช่วง
+        balance += _signed_total(PeriodSummary.objects.filter(user=user), 'total')
+        summaries = summaries.filter(day__gte=limit)
+    balance += _signed_total(summaries, 'total')
+    same_day = Transaction.objects.filter(user=user, date=row.date).filter(
+        Q(created_at__lt=row.created_at) | Q(created_at=row.created_at, id__lt=row.pk)
+    )
+    return (balance + _signed_total(same_day, 'amount')).quantize(CENT)
+
+
+def paginate(user, after=None, before=None, per_page=PAGE_SIZE):
+    """
+    หนึ่งหน้าของสมุดบัญชี (KeysetPage) แต่ละแถวมี .balance = ยอดคงเหลือหลังรายการนั้น
+    page.opening_balance / page.closing_balance คือยอดก่อนแถวเก่าสุด / หลังแถวใหม่สุดของหน้า
+    """
+    page = paginate_keyset(
+        Transaction.objects.filter(user=user).only('id', 'date', 'created_at'),
+        after=after, before=before, per_page=per_page,
+    )
+    page.opening_balance = page.closing_balance = None
+    if not page.object_list:
+        return page
+
+    opening = opening_balance(user, page.object_list[-1])
+    rows = list(
+        Transaction.objects.filter(id__in=[row.pk for row in page.object_list])
+        .select_related('category')
+        .annotate(running=Window(Sum(_signed('amount')), order_by=CHRONOLOGICAL))
+        .order_by(*KEYSET_ORDERING)
+    )
+    for row in rows:
+        row.balance = (opening + row.running).quantize(CENT)
+    page.object_list = rows
+    page.opening_balance = opening
+    page.closing_balance = rows[0].balance
+    return page
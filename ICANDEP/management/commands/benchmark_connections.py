@@ -0,0 +1,94 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+class Command(BaseCommand):
+    help = (
+        'วัด overhead ของการเชื่อมต่อฐานข้อมูลต่อ request: '
+        'เปิดใหม่ทุก request (CONN_MAX_AGE=0) เทียบกับการตั้งค่าปัจจุบัน'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='จำนวน request จำลองต่อรอบ (ค่าเริ่มต้น 50)')
+        parser.add_argument('--database', default='default', help='alias ของฐานข้อมูล')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        settings_dict = connection.settings_dict
+        configured = settings_dict['CONN_MAX_AGE']
+        pooled = bool(settings_dict.get('OPTIONS', {}).get('pool'))
+
+        self.stdout.write(f'engine:       {settings_dict["ENGINE"]}')
+        self.stdout.write(f'host:         {settings_dict.get("HOST") or "-"}')
+        self.stdout.write(f'CONN_MAX_AGE: {configured}  health checks: {settings_dict.get("CONN_HEALTH_CHECKS")}  pool: {pooled}')
+        self.stdout.write('')
+
+        rounds = [('เปิดใหม่ทุก request', 0, False)]
+        if configured != 0 or pooled:
+            rounds.append(('การตั้งค่าปัจจุบัน', configured, pooled))
+
+        results = []
+        try:
+            for label, max_age, keep_pool in rounds:
+                results.append((label, self._run(connection, max_age, keep_pool, options['requests'])))
+        finally:
+            connection.close()
+            settings_dict['CONN_MAX_AGE'] = configured
+
+        for label, (timings, connects) in results:
+            self.stdout.write(
+                f'{label:<22} mean {statistics.mean(timings):7.2f} ms  '
+                f'p50 {statistics.median(timings):7.2f} ms  '
+                f'p95 {_percentile(timings, 95):7.2f} ms  '
+                f'connect {connects}/{len(timings)}'
+            )
+        if len(results) == 2:
+            saved = statistics.mean(results[0][1][0]) - statistics.mean(results[1][1][0])
+            self.stdout.write(self.style.SUCCESS(f'\n✓ ลดลง {saved:.2f} ms ต่อ request'))
+        else:
+            self.stdout.write(self.style.WARNING('\nCONN_MAX_AGE=0 และไม่ได้เปิด pool: ทุก request เปิด connection ใหม่'))
+
+    def _run(self, connection, max_age, keep_pool, count):
+        """
+        จำลอง request ตามวงจรของ Django: request_started/request_finished เรียก
+        close_old_connections ซึ่งปิดหรือเก็บ connection ไว้ตาม CONN_MAX_AGE
+        """
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        if not keep_pool:
+            pool_options = connection.settings_dict.get('OPTIONS', {}).pop('pool', None)
+
+        connects = 0
+
+        def count_connect(sender, connection, **kwargs):
+            nonlocal connects
+            connects += 1
+
+        connection_created.connect(count_connect, weak=False)
+        timings = []
+        try:
+            for _ in range(count):
+                start = time.perf_counter()
+                request_started.send(sender=self.__class__)
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    cursor.fetchone()
+                request_finished.send(sender=self.__class__)
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection_created.disconnect(count_connect)
+            connection.close()
+            if not keep_pool and pool_options is not None:
+                connection.settings_dict['OPTIONS']['pool'] = pool_options
+        return timings, connects
+
+
+def _percentile(values, percent):
+    ordered = sorted(values)
+    index = max(0, round(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ICANDEP import archive
+
+
+class Command(BaseCommand):
+    help = (
+        'ปิดบัญชีช่วงเวลา (ทั้งปีหรือทั้งเดือน): แช่แข็งยอดรวม ย้ายธุรกรรมไปตารางเก็บถาวร '
+        '(PostgreSQL: partition ใหม่ของช่วงนั้น) ต้องปิดเรียงจากช่วงเก่าสุด'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('periods', nargs='+', help='ช่วงที่จะปิด เช่น 2023 หรือ 2024-01 (หลายช่วงได้ เรียงจากเก่าไปใหม่)')
+
+    def handle(self, *args, **options):
+        try:
+            periods = [archive.parse_period(value) for value in options['periods']]
+        except archive.PeriodError as e:
+            raise CommandError(str(e))
+
+        for start, end in sorted(periods):
+            try:
+                period = archive.close_period(start, end)
+            except archive.PeriodError as e:
+                raise CommandError(str(e))
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ ปิดช่วง {period.start} ถึง {period.end} | ย้าย {period.transactions:,} ธุรกรรม '
+                f'| ยอดแช่แข็ง {period.summaries.count():,} แถว'
+            ))
+        self.stdout.write(f'ข้อมูลร้อนเริ่มที่ {archive.boundary()}')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from ICANDEP import caching
+
+
+class Command(BaseCommand):
+    help = 'แสดงจำนวน hit/miss ของ cache หน้า dashboard (ใช้ได้กับ file/database cache ที่แชร์กับเว็บ)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='ล้างตัวนับหลังแสดงผล')
+
+    def handle(self, *args, **options):
+        stats = caching.cache_stats()
+        self.stdout.write(f'backend:   {stats["backend"]}')
+        self.stdout.write(f'hits:      {stats["hits"]}')
+        self.stdout.write(f'misses:    {stats["misses"]}')
+        self.stdout.write(f'hit ratio: {stats["hit_ratio"] if stats["hit_ratio"] is not None else "-"}')
+        if options['reset']:
+            caching.reset_cache_stats()
+            self.stdout.write(self.style.SUCCESS('✓ ล้างตัวนับแล้ว'))
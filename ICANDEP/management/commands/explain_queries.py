@@ -0,0 +1,108 @@
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+
+# ตารางที่ต้องไม่ถูกอ่านแบบ full scan
+CHECKED_TABLES = ['ICANDEP_transaction', 'ICANDEP_dailysummary']
+
+# หน้าที่ต้องตรวจ (ชื่อ url, query string)
+CHECKED_VIEWS = [
+    ('ICANDEP:dashboard', ''),
+    ('ICANDEP:transaction_list', ''),
+    ('ICANDEP:transaction_list', '?type=expense&date_from=2020-01-01'),
+    ('ICANDEP:reports', ''),
+    ('ICANDEP:reports', '?preset=this_year'),
+]
+
+
+def _uses_full_scan(plan, vendor):
+    """ดูจากแผนการ query ว่ามีการสแกนทั้งตารางที่ต้องตรวจหรือไม่"""
+    for line in plan:
+        for table in CHECKED_TABLES:
+            if table not in line:
+                continue
+            if vendor == 'sqlite' and line.lstrip('|-` ').startswith('SCAN') and 'USING' not in line:
+                return True
+            if vendor == 'postgresql' and 'Seq Scan' in line:
+                return True
+    return False
+
+
+class Command(BaseCommand):
+    help = 'รัน EXPLAIN กับ query ที่หน้า dashboard / transaction_list / reports ใช้จริง และตรวจว่าใช้ index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='ชื่อผู้ใช้ที่จะใช้ทดสอบ (ค่าเริ่มต้น: ผู้ใช้คนแรกที่มีธุรกรรม)')
+        parser.add_argument(
+            '--no-seqscan',
+            action='store_true',
+            help='(PostgreSQL) ปิด enable_seqscan เพื่อดูว่า index ใช้ได้จริง แม้ตารางยังเล็กจน planner เลือก Seq Scan',
+        )
+        parser.add_argument('--verbose-plan', action='store_true', help='แสดงแผนการ query ทั้งหมด')
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f'ยังไม่รองรับฐานข้อมูล {vendor}')
+
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            user = User.objects.filter(transaction__isnull=False).order_by('pk').first()
+        if user is None:
+            raise CommandError('ไม่พบผู้ใช้สำหรับทดสอบ กรุณาระบุ --user')
+
+        if vendor == 'postgresql' and options['no_seqscan']:
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+        failures = 0
+        for url_name, query_string in CHECKED_VIEWS:
+            path = reverse(url_name) + query_string
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n{path}'))
+            for sql, params in self._capture_queries(path, user):
+                plan = self._explain(sql, params)
+                full_scan = _uses_full_scan(plan, vendor)
+                failures += full_scan
+                status = self.style.ERROR('✗ FULL SCAN') if full_scan else self.style.SUCCESS('✓ index')
+                self.stdout.write(f'  {status}  {sql[:110]}')
+                if options['verbose_plan'] or full_scan:
+                    for line in plan:
+                        self.stdout.write(f'      {line}')
+
+        if failures:
+            raise CommandError(f'พบ {failures} query ที่สแกนทั้งตาราง')
+        self.stdout.write(self.style.SUCCESS('\n✓ ทุก query ใช้ index'))
+
+    def _capture_queries(self, path, user):
+        """เรียก view โดยตรงแล้วเก็บ SELECT ที่แตะตารางที่ต้องตรวจ"""
+        captured = []
+
+        def wrapper(execute, sql, params, many, context):
+            if sql.lstrip().upper().startswith('SELECT') and any(t in sql for t in CHECKED_TABLES):
+                captured.append((sql, params))
+            return execute(sql, params, many, context)
+
+        request = RequestFactory().get(path)
+        request.user = user
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        match = resolve(request.path_info)
+        with connection.execute_wrapper(wrapper):
+            response = match.func(request, *match.args, **match.kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        return captured
+
+    def _explain(self, sql, params):
+        prefix = connection.ops.explain_query_prefix()
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            rows = cursor.fetchall()
+        if connection.vendor == 'sqlite':
+            # EXPLAIN QUERY PLAN คืน (id, parent, notused, detail)
+            return [row[-1] for row in rows]
+        return [row[0] for row in rows]
@@ -0,0 +1,57 @@
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from ICANDEP.synthetic import RestaurantGenerator, daily_sales_for, date_range
+
+
+class Command(BaseCommand):
+    help = 'สร้างข้อมูลจำลองของร้านอาหาร (หลายผู้ใช้ หลายปี ยอดขายตามฤดูกาล) สำหรับวัดประสิทธิภาพ'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=3, help='จำนวนร้าน/ผู้ใช้ (ค่าเริ่มต้น 3)')
+        parser.add_argument('--years', type=float, default=2, help='จำนวนปีย้อนหลังจากวันนี้ (ค่าเริ่มต้น 2)')
+        parser.add_argument('--daily-sales', type=int, default=None,
+                            help='จำนวนบิลขายเฉลี่ยต่อวัน (ค่าเริ่มต้น: คำนวณจาก --transactions หรือ 40)')
+        parser.add_argument('--transactions', type=int, default=None,
+                            help='จำนวนธุรกรรมต่อผู้ใช้ (ตัดเมื่อครบ)')
+        parser.add_argument('--prefix', default='demo', help='คำนำหน้าชื่อผู้ใช้ (ค่าเริ่มต้น demo -> demo_01, demo_02 ...)')
+        parser.add_argument('--password', default=None, help='รหัสผ่านของผู้ใช้ที่สร้าง (ค่าเริ่มต้น: ล็อกอินไม่ได้)')
+        parser.add_argument('--seed', type=int, default=0, help='seed ของตัวสุ่ม (seed เดียวกัน = ข้อมูลเดียวกัน)')
+
+    def handle(self, *args, **options):
+        start, end = date_range(options['years'])
+        size = options['transactions']
+        daily_sales = options['daily_sales'] or (daily_sales_for(size, options['years']) if size else 40)
+        password = make_password(options['password'])
+
+        usernames = [f'{options["prefix"]}_{number:02d}' for number in range(1, options['users'] + 1)]
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        if existing:
+            raise CommandError(
+                f'มีผู้ใช้ {", ".join(sorted(existing))} อยู่แล้ว ใช้ --prefix อื่น หรือลบผู้ใช้เดิมก่อน'
+            )
+        # รหัสผ่าน hash ครั้งเดียวแล้วใช้ร่วมกัน (hash ต่อผู้ใช้ช้ามาก)
+        users = User.objects.bulk_create([User(username=name, password=password) for name in usernames])
+        if not users[0].pk:
+            users = list(User.objects.filter(username__in=usernames).order_by('username'))
+
+        self.stdout.write(f'สร้างข้อมูล {start} ถึง {end} | {daily_sales} บิล/วัน | {len(users)} ผู้ใช้')
+        started = time.monotonic()
+        total = 0
+
+        def progress(user, created):
+            elapsed = time.monotonic() - started
+            self.stdout.write(f'  {user.username}: {created:,} แถว | รวม {total + created:,} | {elapsed:.0f} วินาที')
+
+        for user in users:
+            generator = RestaurantGenerator(user, daily_sales=daily_sales, seed=options['seed'])
+            total += generator.generate(start, end, limit=size, progress=progress)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✓ สร้าง {total:,} ธุรกรรมให้ {len(users)} ผู้ใช้ ใน {elapsed:.1f} วินาที '
+            f'({total / elapsed if elapsed else 0:,.0f} แถว/วินาที)'
+        ))
@@ -0,0 +1,60 @@
+import csv
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from ICANDEP.importers import BATCH_SIZE, TransactionImporter
+
+
+class Command(BaseCommand):
+    help = 'นำเข้าธุรกรรมจากไฟล์ CSV (POS / statement ธนาคาร) นำเข้าไฟล์เดิมซ้ำได้โดยไม่เกิดรายการซ้ำ'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='ไฟล์ CSV (UTF-8)')
+        parser.add_argument('--user', required=True, help='ชื่อผู้ใช้เจ้าของธุรกรรม')
+        parser.add_argument('--default-type', choices=['income', 'expense'], default='income',
+                            help='ประเภทเมื่อแถวไม่ระบุและเดาไม่ได้ (ค่าเริ่มต้น: income)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument('--errors', help='ไฟล์สำหรับเขียนแถวที่ผิดพลาด (ค่าเริ่มต้น: <path>.errors.csv)')
+        parser.add_argument('--no-copy', action='store_true', help='(PostgreSQL) ใช้ bulk_create แทน COPY')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['user']).first()
+        if user is None:
+            raise CommandError(f'ไม่พบผู้ใช้ {options["user"]}')
+
+        started = time.monotonic()
+
+        def progress(result):
+            elapsed = time.monotonic() - started
+            rate = result.processed / elapsed if elapsed else 0
+            self.stdout.write(
+                f'  อ่านแล้ว {result.processed:,} แถว | เพิ่ม {result.inserted:,} | ซ้ำ {result.duplicates:,} '
+                f'| ผิดพลาด {len(result.errors):,} | {rate:,.0f} แถว/วินาที'
+            )
+
+        importer = TransactionImporter(
+            user,
+            default_type=options['default_type'],
+            batch_size=options['batch_size'],
+            use_copy=False if options['no_copy'] else None,
+            progress=progress,
+        )
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as stream:
+                result = importer.run(stream)
+        except (OSError, ValueError, csv.Error) as e:
+            raise CommandError(str(e))
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'\n✓ นำเข้า {result.inserted:,} รายการ (ข้ามที่ซ้ำ {result.duplicates:,}) '
+            f'จาก {result.processed:,} แถว ใน {elapsed:.1f} วินาที'
+        ))
+
+        if result.errors:
+            errors_path = options['errors'] or f'{options["path"]}.errors.csv'
+            with open(errors_path, 'w', encoding='utf-8-sig', newline='') as stream:
+                result.write_errors(stream, importer.fieldnames)
+            self.stdout.write(self.style.WARNING(f'⚠️  มี {len(result.errors):,} แถวที่ผิดพลาด ดูรายละเอียดใน {errors_path}'))
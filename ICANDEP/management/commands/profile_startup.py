@@ -0,0 +1,166 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# รันใน process ใหม่: import wsgi แล้วส่ง request ตรงเข้า WSGI application (ไม่ผ่าน network)
+CHILD_SCRIPT = r'''
+import json, sys, time
+start = time.perf_counter()
+import workapp.wsgi
+imported = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+
+def request(path):
+    environ = {'PATH_INFO': path, 'HTTP_HOST': '127.0.0.1'}
+    setup_testing_defaults(environ)
+    status = []
+    begin = time.perf_counter()
+    response = workapp.wsgi.application(environ, lambda s, h, e=None: status.append(s))
+    b''.join(response)
+    response.close()
+    return status[0], (time.perf_counter() - begin) * 1000
+
+first_status, first_ms = request(sys.argv[1])
+second_status, second_ms = request(sys.argv[1])
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'first_response_ms': first_ms,
+    'second_response_ms': second_ms,
+    'time_to_first_response_ms': (imported - start) * 1000 + first_ms,
+    'status': first_status,
+}))
+'''
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)')
+
+
+class Command(BaseCommand):
+    help = (
+        'วัดเวลา cold start ของ workapp.wsgi: เวลา import, เวลาถึง response แรกของ path ที่กำหนด '
+        'และรายงาน import time (แบบ python -X importtime) แยกตาม module/package'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/app/', help='path ที่ใช้วัด response แรก (ค่าเริ่มต้น /app/)')
+        parser.add_argument('--runs', type=int, default=5, help='จำนวน process ที่รันต่อโหมด (ค่าเริ่มต้น 5)')
+        parser.add_argument('--limit', type=int, default=20, help='จำนวน module ที่แสดงในรายงาน import')
+        parser.add_argument('--json', dest='json_path', help='บันทึกผลเป็นไฟล์ JSON เพื่อเทียบข้ามรุ่น')
+
+    def handle(self, *args, **options):
+        if options['runs'] < 1:
+            raise CommandError('--runs ต้องมากกว่า 0')
+
+        report = {'path': options['path'], 'python': sys.version.split()[0], 'modes': {}}
+        modes = (('warmup', True), ('no_warmup', False))
+        runs = {label: [] for label, _ in modes}
+        # สลับโหมดทีละรอบ เพื่อไม่ให้ cache ของระบบไฟล์เข้าข้างโหมดใดโหมดหนึ่ง
+        for _ in range(options['runs']):
+            for label, warmup in modes:
+                runs[label].append(self._run_child(options['path'], warmup))
+        for label, _ in modes:
+            report['modes'][label] = _median_of(runs[label])
+
+        imports = self._run_child(options['path'], True, importtime=True)
+        report['imports'] = imports
+
+        self._print_report(report, options['limit'])
+        if options['json_path']:
+            with open(options['json_path'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'\n✓ บันทึกผลที่ {options["json_path"]}'))
+
+    def _run_child(self, path, warmup, importtime=False):
+        env = dict(os.environ)
+        env['COLD_START_WARMUP'] = 'True' if warmup else 'False'
+        env.setdefault('DJANGO_SETTINGS_MODULE', 'workapp.settings')
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(settings.BASE_DIR), env.get('PYTHONPATH')]))
+        command = [sys.executable]
+        if importtime:
+            command += ['-X', 'importtime']
+        command += ['-c', CHILD_SCRIPT, path]
+
+        started = time.perf_counter()
+        completed = subprocess.run(command, env=env, cwd=settings.BASE_DIR, capture_output=True, text=True)
+        wall_ms = (time.perf_counter() - started) * 1000
+        if completed.returncode != 0:
+            raise CommandError(f'process ทดสอบล้มเหลว:\n{completed.stderr[-2000:]}')
+
+        if importtime:
+            return _parse_importtime(completed.stderr)
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        result['process_wall_ms'] = wall_ms
+        return result
+
+    def _print_report(self, report, limit):
+        self.stdout.write(f'path: {report["path"]}  python: {report["python"]}  (ค่ากลางของแต่ละโหมด)\n')
+        self.stdout.write(f'{"":<12}{"import":>10}{"response แรก":>14}{"ถึง response แรก":>18}{"response ที่ 2":>16}{"ทั้ง process":>14}')
+        for label, values in report['modes'].items():
+            self.stdout.write(
+                f'{label:<12}'
+                f'{values["import_ms"]:>8.1f}ms'
+                f'{values["first_response_ms"]:>12.1f}ms'
+                f'{values["time_to_first_response_ms"]:>16.1f}ms'
+                f'{values["second_response_ms"]:>14.1f}ms'
+                f'{values["process_wall_ms"]:>12.1f}ms'
+            )
+
+        imports = report['imports']
+        self.stdout.write(f'\nimport ทั้งหมด {imports["total_ms"]:.1f}ms จาก {imports["count"]} module')
+        self.stdout.write('\nmodule ที่ใช้เวลามากที่สุด (self / cumulative):')
+        for row in imports['modules'][:limit]:
+            self.stdout.write(f'  {row["self_ms"]:>7.1f}ms {row["cumulative_ms"]:>8.1f}ms  {row["module"]}')
+        self.stdout.write('\nแยกตาม package (ผลรวม self):')
+        for row in imports['packages'][:limit]:
+            self.stdout.write(f'  {row["self_ms"]:>7.1f}ms  {row["package"]}')
+
+
+def _parse_importtime(stderr):
+    """แปลงผล -X importtime เป็นรายการ module เรียงตาม self time และผลรวมต่อ package"""
+    modules = []
+    total = 0
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        modules.append({
+            'module': name,
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+        })
+        if not indent:
+            # module ระดับบนสุด (import ตรงจาก script)
+            total += int(cumulative_us)
+
+    packages = defaultdict(float)
+    for row in modules:
+        parts = row['module'].split('.')
+        # แยก django.contrib.* ออกเป็นราย app เพื่อให้เห็นค่าใช้จ่ายของ admin/auth
+        depth = 3 if parts[:2] == ['django', 'contrib'] else 2 if parts[0] == 'django' else 1
+        packages['.'.join(parts[:depth])] += row['self_ms']
+
+    return {
+        'total_ms': total / 1000,
+        'count': len(modules),
+        'modules': sorted(modules, key=lambda row: row['self_ms'], reverse=True),
+        'packages': [
+            {'package': name, 'self_ms': round(value, 3)}
+            for name, value in sorted(packages.items(), key=lambda item: item[1], reverse=True)
+        ],
+    }
+
+
+def _median_of(runs):
+    keys = [key for key, value in runs[0].items() if isinstance(value, (int, float))]
+    result = {'status': runs[0]['status'], 'runs': len(runs)}
+    for key in keys:
+        values = sorted(run[key] for run in runs)
+        result[key] = values[len(values) // 2]
+    return result
@@ -0,0 +1,47 @@
+from datetime import datetime
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from ICANDEP import jobs, rollups
+
+
+class Command(BaseCommand):
+    help = 'สร้างตารางยอดรวมรายวัน (DailySummary) ใหม่ทั้งหมดจากตาราง Transaction'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='สร้างใหม่เฉพาะผู้ใช้นี้')
+        parser.add_argument('--date-from', help='วันที่เริ่มต้น (YYYY-MM-DD)')
+        parser.add_argument('--date-to', help='วันที่สิ้นสุด (YYYY-MM-DD)')
+        parser.add_argument('--background', action='store_true',
+                            help='เพิ่มเข้าคิวงานเบื้องหลังแทนการรันทันที (worker คือคำสั่ง run_jobs)')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f'ไม่พบผู้ใช้ {options["user"]}')
+
+        try:
+            date_from = self._parse_date(options['date_from'])
+            date_to = self._parse_date(options['date_to'])
+        except ValueError:
+            raise CommandError('รูปแบบวันที่ต้องเป็น YYYY-MM-DD')
+
+        if options['background']:
+            job = jobs.enqueue(
+                'rebuild_rollups', user,
+                date_from=date_from.isoformat() if date_from else None,
+                date_to=date_to.isoformat() if date_to else None,
+            )
+            self.stdout.write(self.style.SUCCESS(f'✓ เพิ่มงาน #{job.pk} เข้าคิวแล้ว'))
+            return
+
+        created = rollups.rebuild(user=user, date_from=date_from, date_to=date_to)
+        self.stdout.write(self.style.SUCCESS(f'✓ สร้างยอดรวมรายวันใหม่ {created} แถว'))
+
+    def _parse_date(self, value):
+        if not value:
+            return None
+        return datetime.strptime(value, '%Y-%m-%d').date()
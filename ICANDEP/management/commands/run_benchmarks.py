@@ -0,0 +1,88 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from ICANDEP import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'วัดเวลา (p50/p95) และจำนวน query ของหน้า dashboard, รายการ, รายงาน, เพิ่มรายการ และ admin '
+        'ที่ขนาดข้อมูลต่างๆ แล้วเขียนผลเป็น JSON ไว้เทียบระหว่าง commit'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='10000,100000',
+                            help='จำนวนธุรกรรมของแต่ละชุดข้อมูล คั่นด้วย , (ค่าเริ่มต้น 10000,100000)')
+        parser.add_argument('--repeat', type=int, default=20, help='จำนวนรอบที่จับเวลาต่อ scenario (ค่าเริ่มต้น 20)')
+        parser.add_argument('--scenarios', default='',
+                            help=f'เลือกเฉพาะบาง scenario คั่นด้วย , ({", ".join(s.name for s in benchmarks.SCENARIOS)})')
+        parser.add_argument('--years', type=float, default=3, help='ช่วงปีของข้อมูลจำลอง (ค่าเริ่มต้น 3)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='benchmark-results.json', help='ไฟล์ผลลัพธ์ JSON')
+        parser.add_argument('--compare', help='ไฟล์ผลลัพธ์ครั้งก่อน เพื่อแสดง p50 ที่เปลี่ยนไป')
+
+    def handle(self, *args, **options):
+        try:
+            benchmarks.ensure_enabled()
+        except benchmarks.BenchmarksDisabled as e:
+            raise CommandError(str(e))
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError('--sizes ต้องเป็นตัวเลขคั่นด้วย ,')
+        scenarios = {name.strip() for name in options['scenarios'].split(',') if name.strip()}
+        unknown = scenarios - {scenario.name for scenario in benchmarks.SCENARIOS}
+        if unknown:
+            raise CommandError(f'ไม่รู้จัก scenario: {", ".join(sorted(unknown))}')
+
+        previous = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as stream:
+                    previous = json.load(stream)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'อ่านไฟล์ {options["compare"]} ไม่ได้: {e}')
+
+        def progress(user, created):
+            self.stdout.write(f'  สร้างข้อมูล {user.username}: {created:,} แถว')
+
+        self.stdout.write(f'{"ขนาด":>9} {"scenario":<26} {"status":>6} {"query":>6} {"p50 ms":>9} {"p95 ms":>9}')
+
+        def on_result(row):
+            if 'error' in row:
+                self.stdout.write(self.style.ERROR(
+                    f'{row["size"]:>9,} {row["scenario"]:<26} {row["status"]:>6} {row["queries"]:>6} {row["error"]}'
+                ))
+                return
+            self.stdout.write(
+                f'{row["size"]:>9,} {row["scenario"]:<26} {row["status"]:>6} {row["queries"]:>6} '
+                f'{row["p50_ms"]:>9.2f} {row["p95_ms"]:>9.2f}'
+            )
+
+        # ALLOWED_HOSTS ของ test client และการเก็บ context ของ template เหมือนตอนรัน test
+        setup_test_environment()
+        try:
+            report = benchmarks.run(
+                sizes,
+                repeat=options['repeat'],
+                scenarios=scenarios,
+                years=options['years'],
+                seed=options['seed'],
+                progress=progress,
+                on_result=on_result,
+            )
+        finally:
+            teardown_test_environment()
+
+        with open(options['output'], 'w', encoding='utf-8') as stream:
+            json.dump(report, stream, cls=DjangoJSONEncoder, ensure_ascii=False, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'\n✓ บันทึกผลที่ {options["output"]} (commit {report["meta"]["commit"]})'))
+
+        if previous:
+            self.stdout.write(f'\nเทียบกับ {options["compare"]} (commit {previous["meta"].get("commit")}):')
+            for size, name, before, after, delta in benchmarks.compare(previous, report):
+                style = self.style.ERROR if delta > 10 else self.style.SUCCESS if delta < -10 else str
+                self.stdout.write(style(f'{size:>9,} {name:<26} {before:>9.2f} -> {after:>9.2f} ms ({delta:+.1f}%)'))
@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from ICANDEP import jobs
+
+
+class Command(BaseCommand):
+    help = 'worker ของคิวงานเบื้องหลัง (ตาราง Job) รันได้หลายตัวพร้อมกัน'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--burst', action='store_true',
+                            help='ทำงานที่รออยู่จนคิวว่างแล้วจบ (สำหรับ cron / scheduled function)')
+        parser.add_argument('--max-jobs', type=int, default=0, help='จบหลังทำงานครบจำนวนนี้ (0 = ไม่จำกัด)')
+        parser.add_argument('--sleep', type=float, default=2.0, help='วินาทีที่รอเมื่อคิวว่าง (ค่าเริ่มต้น: 2)')
+        parser.add_argument('--worker', default=None, help='ชื่อ worker (ค่าเริ่มต้น: host:pid)')
+
+    def handle(self, *args, **options):
+        worker = options['worker'] or jobs.worker_name()
+        self.stdout.write(f'worker {worker} เริ่มทำงาน')
+        self._housekeeping()
+
+        done = 0
+        try:
+            while not options['max_jobs'] or done < options['max_jobs']:
+                # worker ทำงานยาว ปิด connection ที่หมดอายุ/เสียเหมือนตอนจบ request
+                close_old_connections()
+                job = jobs.claim(worker)
+                if job is None:
+                    if options['burst']:
+                        break
+                    time.sleep(options['sleep'])
+                    self._housekeeping()
+                    continue
+
+                started = time.monotonic()
+                ok = jobs.run(job)
+                elapsed = time.monotonic() - started
+                done += 1
+                if ok:
+                    self.stdout.write(self.style.SUCCESS(f'✓ {job.kind} #{job.pk} เสร็จใน {elapsed:.1f} วินาที'))
+                else:
+                    self.stdout.write(self.style.ERROR(f'✗ {job.kind} #{job.pk} ล้มเหลว ({elapsed:.1f} วินาที)'))
+        except KeyboardInterrupt:
+            self.stdout.write('\nหยุดตามคำสั่ง (งานที่ค้างจะถูกคืนเข้าคิวเมื่อครบ JOB_STALE_AFTER)')
+
+        self.stdout.write(f'worker {worker} จบการทำงาน (ทำไป {done} งาน)')
+
+    def _housekeeping(self):
+        requeued, failed = jobs.requeue_stale()
+        purged = jobs.purge_finished()
+        if requeued or failed or purged:
+            self.stdout.write(
+                self.style.WARNING(f'คืนงานค้างเข้าคิว {requeued} | ล้มเหลว {failed} | ลบงานเก่า {purged}')
+            )
@@ -0,0 +1,46 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ICANDEP import slowqueries
+
+
+class Command(BaseCommand):
+    help = 'สรุป query ช้าจากไฟล์ SLOW_QUERY_LOG: รูปแบบ query ที่ใช้เวลารวมมากที่สุด พร้อม view และแผนการ query'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--file', default=None, help='ไฟล์ log (ค่าเริ่มต้น SLOW_QUERY_LOG)')
+        parser.add_argument('--limit', type=int, default=10, help='จำนวนรูปแบบ query ที่แสดง (ค่าเริ่มต้น 10)')
+        parser.add_argument('--view', default=None, help='เฉพาะ view นี้ เช่น ICANDEP:reports')
+        parser.add_argument('--plans', action='store_true', help='แสดงแผนการ query (EXPLAIN) ล่าสุดของแต่ละรูปแบบ')
+
+    def handle(self, *args, **options):
+        path = options['file'] or settings.SLOW_QUERY_LOG
+        if not path:
+            raise CommandError('ยังไม่ได้ตั้งค่า SLOW_QUERY_LOG (หรือระบุ --file)')
+        try:
+            entries = slowqueries.read_log(path)
+        except OSError as e:
+            raise CommandError(f'อ่านไฟล์ {path} ไม่ได้: {e}')
+
+        top = slowqueries.summarize(entries, limit=options['limit'], view=options['view'])
+        if not top:
+            self.stdout.write('ไม่มี query ช้าในไฟล์นี้')
+            return
+
+        self.stdout.write(f'{len(entries):,} รายการจาก {path}\n')
+        self.stdout.write(f'{"#":>3} {"ครั้ง":>6} {"รวม ms":>11} {"เฉลี่ย ms":>10} {"สูงสุด ms":>10}  view')
+        for rank, group in enumerate(top, 1):
+            views = ', '.join(
+                f'{view} ({count})'
+                for view, count in sorted(group['views'].items(), key=lambda item: item[1], reverse=True)
+            )
+            self.stdout.write(self.style.WARNING(
+                f'{rank:>3} {group["count"]:>6,} {group["total_ms"]:>11,.1f} '
+                f'{group["mean_ms"]:>10,.1f} {group["max_ms"]:>10,.1f}  {views}'
+            ))
+            self.stdout.write(f'    {group["fingerprint"][:500]}')
+            self.stdout.write(f'    params: {group["sample_params"]}')
+            if options['plans'] and group['plan']:
+                for line in group['plan'].splitlines():
+                    self.stdout.write(f'    | {line}')
+            self.stdout.write('')
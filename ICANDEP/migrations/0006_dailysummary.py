@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_daily_summaries(apps, schema_editor):
+    """สร้างยอดรวมรายวันจากธุรกรรมที่มีอยู่แล้ว"""
+    Transaction = apps.get_model('ICANDEP', 'Transaction')
+    DailySummary = apps.get_model('ICANDEP', 'DailySummary')
+    grouped = (
+        Transaction.objects.order_by()
+        .values('user_id', 'date', 'transaction_type', 'category_id')
+        .annotate(total=Sum('amount'), count=Count('id'))
+    )
+    DailySummary.objects.bulk_create(
+        [
+            DailySummary(
+                user_id=row['user_id'],
+                day=row['date'],
+                transaction_type=row['transaction_type'],
+                category_id=row['category_id'],
+                total=row['total'],
+                count=row['count'],
+            )
+            for row in grouped
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ICANDEP', '0005_transaction_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='วันที่')),
+                ('transaction_type', models.CharField(choices=[('income', 'รายรับ'), ('expense', 'รายจ่าย')], max_length=10, verbose_name='ประเภท')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='ยอดรวม')),
+                ('count', models.IntegerField(default=0, verbose_name='จำนวนรายการ')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='ICANDEP.category', verbose_name='หมวดหมู่')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='ผู้ใช้')),
+            ],
+            options={
+                'verbose_name': 'ยอดรวมรายวัน',
+                'verbose_name_plural': 'ยอดรวมรายวัน',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['user', 'day', 'transaction_type'], name='dailysum_user_day_type_idx')],
+                'unique_together': {('user', 'day', 'transaction_type', 'category')},
+            },
+        ),
+        migrations.RunPython(populate_daily_summaries, migrations.RunPython.noop),
+    ]
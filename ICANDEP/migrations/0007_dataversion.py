@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-18 12:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ICANDEP', '0006_dailysummary'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DataVersion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='ผู้ใช้')),
+                ('version', models.PositiveBigIntegerField(default=1, verbose_name='เวอร์ชัน')),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='เปลี่ยนแปลงล่าสุด')),
+            ],
+            options={
+                'verbose_name': 'เวอร์ชันข้อมูล',
+                'verbose_name_plural': 'เวอร์ชันข้อมูล',
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ICANDEP', '0008_transaction_fingerprint'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50, verbose_name='ชนิดงาน')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='พารามิเตอร์')),
+                ('status', models.CharField(choices=[('queued', 'รอคิว'), ('running', 'กำลังทำงาน'), ('done', 'เสร็จแล้ว'), ('failed', 'ล้มเหลว')], default='queued', max_length=10, verbose_name='สถานะ')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='จำนวนครั้งที่รัน')),
+                ('worker', models.CharField(blank=True, max_length=100, verbose_name='worker')),
+                ('error', models.TextField(blank=True, verbose_name='ข้อผิดพลาด')),
+                ('result', models.BinaryField(blank=True, null=True, verbose_name='ผลลัพธ์')),
+                ('result_name', models.CharField(blank=True, max_length=200, verbose_name='ชื่อไฟล์ผลลัพธ์')),
+                ('result_content_type', models.CharField(blank=True, max_length=100, verbose_name='ชนิดไฟล์ผลลัพธ์')),
+                ('result_size', models.PositiveIntegerField(default=0, verbose_name='ขนาดผลลัพธ์ (ไบต์)')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='วันที่สร้าง')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='เริ่มทำงาน')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='เสร็จเมื่อ')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='ผู้ใช้')),
+            ],
+            options={
+                'verbose_name': 'งานเบื้องหลัง',
+                'verbose_name_plural': 'งานเบื้องหลัง',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(condition=models.Q(('status', 'queued')), fields=['created_at', 'id'], name='job_queue_idx'), models.Index(fields=['user', '-created_at'], name='job_user_recent_idx')],
+            },
+        ),
+    ]
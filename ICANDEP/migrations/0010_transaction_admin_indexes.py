@@ -0,0 +1,42 @@
+from django.db import migrations, models
+
+# ค้นหาใน admin ด้วย ^title (title__istartswith) ต้องใช้ index ที่ตรงกับ SQL ของแต่ละฐานข้อมูล:
+# PostgreSQL: UPPER("title"::text) LIKE UPPER(%s)  -> index แบบ expression + text_pattern_ops
+# SQLite:     "title" LIKE %s ESCAPE '\'           -> index แบบ COLLATE NOCASE (LIKE ของ SQLite ไม่สนตัวพิมพ์)
+TITLE_INDEX = {
+    'postgresql': (
+        'CREATE INDEX IF NOT EXISTS txn_title_prefix_idx '
+        'ON "ICANDEP_transaction" (UPPER("title"::text) text_pattern_ops)'
+    ),
+    'sqlite': (
+        'CREATE INDEX IF NOT EXISTS txn_title_prefix_idx '
+        'ON "ICANDEP_transaction" ("title" COLLATE NOCASE)'
+    ),
+}
+
+
+def create_title_index(apps, schema_editor):
+    sql = TITLE_INDEX.get(schema_editor.connection.vendor)
+    if sql:
+        schema_editor.execute(sql)
+
+
+def drop_title_index(apps, schema_editor):
+    if schema_editor.connection.vendor in TITLE_INDEX:
+        schema_editor.execute('DROP INDEX IF EXISTS txn_title_prefix_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ICANDEP', '0009_job'),
+    ]
+
+    operations = [
+        # changelist ของ admin (ทุกผู้ใช้) เรียงตาม (-date, -created_at, -id) และกรองช่วงวันที่
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['-date', '-created_at', '-id'], name='txn_recent_idx'),
+        ),
+        migrations.RunPython(create_title_index, drop_title_index),
+    ]
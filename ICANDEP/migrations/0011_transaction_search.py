@@ -0,0 +1,78 @@
+from django.db import migrations
+
+# ค้นหาข้อความ (ICANDEP/search.py) ใช้ index คนละแบบตามฐานข้อมูล
+#
+# SQLite: ตารางเงา FTS5 แบบ external content (เก็บเฉพาะ index ไม่เก็บข้อความซ้ำ) + trigger ซิงก์ทุกการเขียน
+# หมายเหตุ: migration ที่สร้างตาราง ICANDEP_transaction ใหม่ (SQLite ALTER บางแบบ) จะลบ trigger ไปด้วย
+# ต้องรัน SQLITE_TRIGGERS ซ้ำ แล้วสั่ง 'rebuild' หลัง migration นั้น
+SQLITE_TABLE = (
+    'CREATE VIRTUAL TABLE IF NOT EXISTS "ICANDEP_transaction_fts" USING fts5('
+    "title, description, content='ICANDEP_transaction', content_rowid='id', tokenize='trigram')"
+)
+SQLITE_TRIGGERS = [
+    'CREATE TRIGGER IF NOT EXISTS txn_fts_insert AFTER INSERT ON "ICANDEP_transaction" BEGIN '
+    'INSERT INTO "ICANDEP_transaction_fts" (rowid, title, description) VALUES (new.id, new.title, new.description); '
+    'END',
+    'CREATE TRIGGER IF NOT EXISTS txn_fts_delete AFTER DELETE ON "ICANDEP_transaction" BEGIN '
+    'INSERT INTO "ICANDEP_transaction_fts" ("ICANDEP_transaction_fts", rowid, title, description) '
+    "VALUES ('delete', old.id, old.title, old.description); "
+    'END',
+    'CREATE TRIGGER IF NOT EXISTS txn_fts_update AFTER UPDATE OF title, description ON "ICANDEP_transaction" BEGIN '
+    'INSERT INTO "ICANDEP_transaction_fts" ("ICANDEP_transaction_fts", rowid, title, description) '
+    "VALUES ('delete', old.id, old.title, old.description); "
+    'INSERT INTO "ICANDEP_transaction_fts" (rowid, title, description) VALUES (new.id, new.title, new.description); '
+    'END',
+]
+SQLITE_REBUILD = 'INSERT INTO "ICANDEP_transaction_fts" ("ICANDEP_transaction_fts") VALUES (\'rebuild\')'
+
+POSTGRES_INDEXES = ['txn_search_vector_idx', 'txn_title_trgm_idx', 'txn_description_trgm_idx']
+
+
+def _postgres_indexes():
+    from django.contrib.postgres.indexes import GinIndex, OpClass
+    from django.contrib.postgres.search import SearchVector
+    from django.db.models.functions import Upper
+
+    return [
+        # ต้องตรงกับ ICANDEP/search.py:_pg_vector()
+        GinIndex(SearchVector('title', 'description', config='simple'), name='txn_search_vector_idx'),
+        # title/description__icontains บน PostgreSQL คือ UPPER(col::text) LIKE UPPER('%...%')
+        GinIndex(OpClass(Upper('title'), name='gin_trgm_ops'), name='txn_title_trgm_idx'),
+        GinIndex(OpClass(Upper('description'), name='gin_trgm_ops'), name='txn_description_trgm_idx'),
+    ]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        model = apps.get_model('ICANDEP', 'Transaction')
+        for index in _postgres_indexes():
+            schema_editor.add_index(model, index)
+    elif vendor == 'sqlite':
+        schema_editor.execute(SQLITE_TABLE)
+        for sql in SQLITE_TRIGGERS:
+            schema_editor.execute(sql)
+        schema_editor.execute(SQLITE_REBUILD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for name in POSTGRES_INDEXES:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+    elif vendor == 'sqlite':
+        for name in ('txn_fts_insert', 'txn_fts_delete', 'txn_fts_update'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        schema_editor.execute('DROP TABLE IF EXISTS "ICANDEP_transaction_fts"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ICANDEP', '0010_transaction_admin_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
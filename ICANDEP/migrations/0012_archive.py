@@ -0,0 +1,133 @@
+# Generated by Django 5.2.4 on 2026-10-18 13:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# ArchivedTransaction เป็น managed=False: ตารางสร้างเองตามฐานข้อมูล (คอลัมน์เดียวกับ ICANDEP_transaction)
+# PostgreSQL: PARTITION BY RANGE (date) primary key ต้องรวมคอลัมน์ partition ด้วย จึงเป็น (id, date)
+#             partition ของแต่ละช่วงสร้างตอนปิดช่วง (ICANDEP/archive.py)
+# SQLite:     ตารางธรรมดา
+ARCHIVE_TABLE = {
+    'postgresql': """
+        CREATE TABLE "ICANDEP_transaction_archive" (
+            "id" bigint NOT NULL,
+            "user_id" integer NOT NULL REFERENCES "auth_user" ("id") DEFERRABLE INITIALLY DEFERRED,
+            "title" varchar(200) NOT NULL,
+            "amount" numeric(10, 2) NOT NULL,
+            "transaction_type" varchar(10) NOT NULL,
+            "category_id" bigint NULL REFERENCES "ICANDEP_category" ("id") DEFERRABLE INITIALLY DEFERRED,
+            "description" text NULL,
+            "date" date NOT NULL,
+            "created_at" timestamp with time zone NOT NULL,
+            "updated_at" timestamp with time zone NOT NULL,
+            "fingerprint" varchar(64) NULL,
+            PRIMARY KEY ("id", "date")
+        ) PARTITION BY RANGE ("date")
+    """,
+    'sqlite': """
+        CREATE TABLE "ICANDEP_transaction_archive" (
+            "id" integer NOT NULL PRIMARY KEY,
+            "user_id" integer NOT NULL REFERENCES "auth_user" ("id") DEFERRABLE INITIALLY DEFERRED,
+            "title" varchar(200) NOT NULL,
+            "amount" decimal NOT NULL,
+            "transaction_type" varchar(10) NOT NULL,
+            "category_id" bigint NULL REFERENCES "ICANDEP_category" ("id") DEFERRABLE INITIALLY DEFERRED,
+            "description" text NULL,
+            "date" date NOT NULL,
+            "created_at" datetime NOT NULL,
+            "updated_at" datetime NOT NULL,
+            "fingerprint" varchar(64) NULL
+        )
+    """,
+}
+# บน PostgreSQL index ของตารางแม่ถูกสร้างในทุก partition ให้เอง
+ARCHIVE_INDEX = (
+    'CREATE INDEX txn_archive_user_recent_idx ON "ICANDEP_transaction_archive" '
+    '("user_id", "date" DESC, "created_at" DESC, "id" DESC)'
+)
+
+
+def create_archive_table(apps, schema_editor):
+    schema_editor.execute(ARCHIVE_TABLE[schema_editor.connection.vendor])
+    schema_editor.execute(ARCHIVE_INDEX)
+
+
+def drop_archive_table(apps, schema_editor):
+    schema_editor.execute('DROP TABLE IF EXISTS "ICANDEP_transaction_archive"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ICANDEP', '0011_transaction_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # ตารางสร้างด้วย SQL ของแต่ละฐานข้อมูล ส่วน state ของ model (รวม FK user/category) ประกาศให้ครบ
+        # เพื่อให้ model ใน migration ถัดไป (apps.get_model) และ makemigrations ตรงกับ models.py
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_archive_table, drop_archive_table),
+            ],
+            state_operations=[
+                migrations.CreateModel(
+                    name='ArchivedTransaction',
+                    fields=[
+                        ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                        ('title', models.CharField(max_length=200, verbose_name='หัวข้อ')),
+                        ('amount', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='จำนวนเงิน')),
+                        ('transaction_type', models.CharField(choices=[('income', 'รายรับ'), ('expense', 'รายจ่าย')], max_length=10, verbose_name='ประเภท')),
+                        ('description', models.TextField(blank=True, null=True, verbose_name='รายละเอียด')),
+                        ('date', models.DateField(verbose_name='วันที่')),
+                        ('created_at', models.DateTimeField(verbose_name='วันที่สร้าง')),
+                        ('updated_at', models.DateTimeField(verbose_name='วันที่อัปเดต')),
+                        ('fingerprint', models.CharField(blank=True, max_length=64, null=True, verbose_name='ลายนิ้วมือการนำเข้า')),
+                        ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='ICANDEP.category', verbose_name='หมวดหมู่')),
+                        ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='ผู้ใช้')),
+                    ],
+                    options={
+                        'verbose_name': 'รายการธุรกรรมที่เก็บถาวร',
+                        'verbose_name_plural': 'รายการธุรกรรมที่เก็บถาวร',
+                        'db_table': 'ICANDEP_transaction_archive',
+                        'ordering': ['-date', '-created_at'],
+                        'managed': False,
+                    },
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedPeriod',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateField(unique=True, verbose_name='วันแรก')),
+                ('end', models.DateField(verbose_name='วันแรกของช่วงถัดไป')),
+                ('transactions', models.PositiveIntegerField(default=0, verbose_name='จำนวนธุรกรรมที่ย้าย')),
+                ('closed_at', models.DateTimeField(auto_now_add=True, verbose_name='ปิดเมื่อ')),
+            ],
+            options={
+                'verbose_name': 'ช่วงที่ปิดบัญชีแล้ว',
+                'verbose_name_plural': 'ช่วงที่ปิดบัญชีแล้ว',
+                'ordering': ['start'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PeriodSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transaction_type', models.CharField(choices=[('income', 'รายรับ'), ('expense', 'รายจ่าย')], max_length=10, verbose_name='ประเภท')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=16, verbose_name='ยอดรวม')),
+                ('count', models.IntegerField(default=0, verbose_name='จำนวนรายการ')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='ICANDEP.category', verbose_name='หมวดหมู่')),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='summaries', to='ICANDEP.archivedperiod', verbose_name='ช่วงเวลา')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='ผู้ใช้')),
+            ],
+            options={
+                'verbose_name': 'ยอดรวมของช่วงที่ปิดแล้ว',
+                'verbose_name_plural': 'ยอดรวมของช่วงที่ปิดแล้ว',
+                'indexes': [models.Index(fields=['user', 'period'], name='periodsum_user_period_idx')],
+                'unique_together': {('period', 'user', 'transaction_type', 'category')},
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+# ArchivedTransaction เป็น managed = False จึงประกาศ index ใน Meta ไม่ได้ (ดู 0012)
+# การรวม/ลบหมวดหมู่ (ICANDEP/reassign.py) ค้นและ UPDATE รายการที่เก็บถาวรตาม category_id
+ARCHIVE_CATEGORY_INDEX = 'CREATE INDEX txn_archive_category_idx ON "ICANDEP_transaction_archive" ("category_id")'
+
+
+def create_index(apps, schema_editor):
+    schema_editor.execute(ARCHIVE_CATEGORY_INDEX)
+
+
+def drop_index(apps, schema_editor):
+    schema_editor.execute('DROP INDEX IF EXISTS txn_archive_category_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ICANDEP', '0012_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
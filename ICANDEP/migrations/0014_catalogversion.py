@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-18 14:21
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ICANDEP', '0013_archive_category_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=1, verbose_name='เวอร์ชัน')),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='เปลี่ยนแปลงล่าสุด')),
+            ],
+            options={
+                'verbose_name': 'เวอร์ชันหมวดหมู่',
+                'verbose_name_plural': 'เวอร์ชันหมวดหมู่',
+            },
+        ),
+    ]
@@ -40,11 +40,31 @@ class Transaction(models.Model):
     date = models.DateField(default=timezone.now, verbose_name="วันที่")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="วันที่สร้าง")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="วันที่อัปเดต")
+    # ลายนิ้วมือของแถวที่นำเข้าจากไฟล์ ใช้กันนำเข้าซ้ำ (รายการที่คีย์เองเป็น NULL)
+    fingerprint = models.CharField(max_length=64, null=True, blank=True, editable=False, verbose_name="ลายนิ้วมือการนำเข้า")
     
     class Meta:
         ordering = ['-date', '-created_at']
         verbose_name = "รายการธุรกรรม"
         verbose_name_plural = "รายการธุรกรรม"
+        indexes = [
+            # ยอดรวมตามช่วงวันที่ (dashboard/reports) - มี amount ต่อท้ายเพื่อให้ Sum อ่านจาก index ได้เลย
+            models.Index(fields=['user', 'date', 'transaction_type', 'amount'], name='txn_user_date_type_amt_idx'),
+            # รายการล่าสุด และการแบ่งหน้าแบบ keyset (-date, -created_at, -id)
+            models.Index(fields=['user', '-date', '-created_at', '-id'], name='txn_user_recent_idx'),
+            # changelist ของ admin (ทุกผู้ใช้) และตัวกรองช่วงเวลา ICANDEP/admin.py:PeriodFilter
+            # (index ค้นหา ^title สร้างแยกตามฐานข้อมูลใน migration 0010)
+            models.Index(fields=['-date', '-created_at', '-id'], name='txn_recent_idx'),
+            # สถิติตามหมวดหมู่ (เฉพาะแถวที่มีหมวดหมู่)
+            models.Index(
+                fields=['user', 'date', 'category'],
+                condition=models.Q(category__isnull=False),
+                name='txn_user_date_cat_idx',
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'fingerprint'], name='txn_user_fingerprint_uniq'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.amount} บาท"
@@ -56,3 +76,190 @@ class Transaction(models.Model):
     @property
     def is_expense(self):
         return self.transaction_type == 'expense'
+
+
+class DailySummary(models.Model):
+    """
+    ยอดรวมรายวันของธุรกรรม แยกตามผู้ใช้ ประเภท และหมวดหมู่
+    อัปเดตอัตโนมัติเมื่อมีการเพิ่ม/แก้ไข/ลบ Transaction (ดู ICANDEP/rollups.py)
+    ใช้แทนการ Sum จากตาราง Transaction ตรงๆ ในหน้า dashboard และ reports
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="ผู้ใช้")
+    day = models.DateField(verbose_name="วันที่")
+    transaction_type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES, verbose_name="ประเภท")
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, verbose_name="หมวดหมู่", null=True, blank=True)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="ยอดรวม")
+    count = models.IntegerField(default=0, verbose_name="จำนวนรายการ")
+
+    class Meta:
+        ordering = ['-day']
+        verbose_name = "ยอดรวมรายวัน"
+        verbose_name_plural = "ยอดรวมรายวัน"
+        unique_together = ['user', 'day', 'transaction_type', 'category']
+        indexes = [
+            models.Index(fields=['user', 'day', 'transaction_type'], name='dailysum_user_day_type_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.day} {self.transaction_type}: {self.total}"
+
+
+class DataVersion(models.Model):
+    """
+    เลขเวอร์ชันข้อมูลของผู้ใช้ เพิ่มขึ้นทุกครั้งที่ธุรกรรมของผู้ใช้ถูกเพิ่ม/แก้ไข/ลบ
+    ใช้เป็นส่วนหนึ่งของ cache key ทำให้ cache เก่าหมดอายุทันทีโดยไม่ต้องลบทีละ key
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, verbose_name="ผู้ใช้")
+    version = models.PositiveBigIntegerField(default=1, verbose_name="เวอร์ชัน")
+    changed_at = models.DateTimeField(default=timezone.now, verbose_name="เปลี่ยนแปลงล่าสุด")
+
+    class Meta:
+        verbose_name = "เวอร์ชันข้อมูล"
+        verbose_name_plural = "เวอร์ชันข้อมูล"
+
+    def __str__(self):
+        return f"{self.user} v{self.version}"
+
+
+class CatalogVersion(models.Model):
+    """
+    เลขเวอร์ชันของหมวดหมู่ (แถวเดียว) เพิ่มขึ้นทุกครั้งที่หมวดหมู่ถูกบันทึก/ลบ (ICANDEP/catalog.py)
+    อยู่ในฐานข้อมูลเพื่อให้ทุก process/worker เห็นค่าเดียวกัน แม้ cache จะเป็นของแต่ละ process (locmem)
+    """
+    version = models.PositiveBigIntegerField(default=1, verbose_name="เวอร์ชัน")
+    changed_at = models.DateTimeField(default=timezone.now, verbose_name="เปลี่ยนแปลงล่าสุด")
+
+    class Meta:
+        verbose_name = "เวอร์ชันหมวดหมู่"
+        verbose_name_plural = "เวอร์ชันหมวดหมู่"
+
+    def __str__(self):
+        return f"หมวดหมู่ v{self.version}"
+
+
+class Job(models.Model):
+    """
+    งานเบื้องหลังที่ใช้เวลานานเกิน timeout ของ request (รายงานช่วงยาว, ส่งออกทั้งหมด, สร้างยอดรวมใหม่)
+    เก็บคิวในฐานข้อมูลเดิม ไม่ต้องมี Redis/Celery รันด้วยคำสั่ง run_jobs (ดู ICANDEP/jobs.py)
+    """
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUSES = [
+        (STATUS_QUEUED, 'รอคิว'),
+        (STATUS_RUNNING, 'กำลังทำงาน'),
+        (STATUS_DONE, 'เสร็จแล้ว'),
+        (STATUS_FAILED, 'ล้มเหลว'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, verbose_name="ผู้ใช้")
+    kind = models.CharField(max_length=50, verbose_name="ชนิดงาน")
+    params = models.JSONField(default=dict, blank=True, verbose_name="พารามิเตอร์")
+    status = models.CharField(max_length=10, choices=STATUSES, default=STATUS_QUEUED, verbose_name="สถานะ")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="จำนวนครั้งที่รัน")
+    worker = models.CharField(max_length=100, blank=True, verbose_name="worker")
+    error = models.TextField(blank=True, verbose_name="ข้อผิดพลาด")
+    # ไฟล์ผลลัพธ์ (CSV/XLSX) เก็บในฐานข้อมูลเลย ไม่ต้องมี storage แยก
+    result = models.BinaryField(null=True, blank=True, verbose_name="ผลลัพธ์")
+    result_name = models.CharField(max_length=200, blank=True, verbose_name="ชื่อไฟล์ผลลัพธ์")
+    result_content_type = models.CharField(max_length=100, blank=True, verbose_name="ชนิดไฟล์ผลลัพธ์")
+    result_size = models.PositiveIntegerField(default=0, verbose_name="ขนาดผลลัพธ์ (ไบต์)")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="วันที่สร้าง")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="เริ่มทำงาน")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="เสร็จเมื่อ")
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "งานเบื้องหลัง"
+        verbose_name_plural = "งานเบื้องหลัง"
+        indexes = [
+            # คิวงานที่รอ (index เล็ก มีเฉพาะแถวที่ยังไม่ได้รัน) ให้ worker หยิบงานเก่าสุดก่อน
+            models.Index(
+                fields=['created_at', 'id'],
+                condition=models.Q(status='queued'),
+                name='job_queue_idx',
+            ),
+            # งานล่าสุดของผู้ใช้ (หน้ารายงาน poll สถานะ)
+            models.Index(fields=['user', '-created_at'], name='job_user_recent_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class ArchivedPeriod(models.Model):
+    """
+    ช่วงเวลาที่ปิดบัญชีแล้ว (คำสั่ง close_period, ICANDEP/archive.py): ธุรกรรมของช่วงนี้ย้ายไป ArchivedTransaction
+    และยอดรวมถูกแช่แข็งไว้ใน PeriodSummary ช่วงที่ปิดต่อกันตั้งแต่ต้น จุดสิ้นสุดล่าสุดคือขอบเขตข้อมูลร้อน
+    """
+    start = models.DateField(unique=True, verbose_name="วันแรก")
+    end = models.DateField(verbose_name="วันแรกของช่วงถัดไป")
+    transactions = models.PositiveIntegerField(default=0, verbose_name="จำนวนธุรกรรมที่ย้าย")
+    closed_at = models.DateTimeField(auto_now_add=True, verbose_name="ปิดเมื่อ")
+
+    class Meta:
+        ordering = ['start']
+        verbose_name = "ช่วงที่ปิดบัญชีแล้ว"
+        verbose_name_plural = "ช่วงที่ปิดบัญชีแล้ว"
+
+    def __str__(self):
+        return f"{self.start} - {self.end}"
+
+
+class PeriodSummary(models.Model):
+    """ยอดรวมที่แช่แข็งของช่วงที่ปิดแล้ว ต่อผู้ใช้ / ประเภท / หมวดหมู่ (ไม่เปลี่ยนอีก)"""
+    period = models.ForeignKey(ArchivedPeriod, on_delete=models.CASCADE, related_name='summaries', verbose_name="ช่วงเวลา")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="ผู้ใช้")
+    transaction_type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES, verbose_name="ประเภท")
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, verbose_name="หมวดหมู่", null=True, blank=True)
+    total = models.DecimalField(max_digits=16, decimal_places=2, default=0, verbose_name="ยอดรวม")
+    count = models.IntegerField(default=0, verbose_name="จำนวนรายการ")
+
+    class Meta:
+        verbose_name = "ยอดรวมของช่วงที่ปิดแล้ว"
+        verbose_name_plural = "ยอดรวมของช่วงที่ปิดแล้ว"
+        unique_together = ['period', 'user', 'transaction_type', 'category']
+        indexes = [
+            models.Index(fields=['user', 'period'], name='periodsum_user_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.period} {self.transaction_type}: {self.total}"
+
+
+class ArchivedTransaction(models.Model):
+    """
+    ธุรกรรมของช่วงที่ปิดแล้ว (อ่านอย่างเดียว คอลัมน์เดียวกับ Transaction และคง id เดิม)
+    ตารางสร้างเองใน migration 0012: PostgreSQL เป็นตารางแบ่ง partition ตามช่วงวันที่ (PARTITION BY RANGE)
+    หนึ่ง partition ต่อช่วงที่ปิด ส่วน SQLite เป็นตารางธรรมดา
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, verbose_name="ผู้ใช้")
+    title = models.CharField(max_length=200, verbose_name="หัวข้อ")
+    amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="จำนวนเงิน")
+    transaction_type = models.CharField(max_length=10, choices=Transaction.TRANSACTION_TYPES, verbose_name="ประเภท")
+    category = models.ForeignKey(Category, on_delete=models.PROTECT, verbose_name="หมวดหมู่", null=True, blank=True)
+    description = models.TextField(blank=True, null=True, verbose_name="รายละเอียด")
+    date = models.DateField(verbose_name="วันที่")
+    created_at = models.DateTimeField(verbose_name="วันที่สร้าง")
+    updated_at = models.DateTimeField(verbose_name="วันที่อัปเดต")
+    fingerprint = models.CharField(max_length=64, null=True, blank=True, verbose_name="ลายนิ้วมือการนำเข้า")
+
+    class Meta:
+        managed = False
+        db_table = 'ICANDEP_transaction_archive'
+        ordering = ['-date', '-created_at']
+        verbose_name = "รายการธุรกรรมที่เก็บถาวร"
+        verbose_name_plural = "รายการธุรกรรมที่เก็บถาวร"
+
+    def __str__(self):
+        return f"{self.title} - {self.amount} บาท"
+
+    @property
+    def is_income(self):
+        return self.transaction_type == 'income'
+
+    @property
+    def is_expense(self):
+        return self.transaction_type == 'expense'
@@ -0,0 +1,162 @@
+"""
+แบ่งหน้าแบบ keyset (cursor) สำหรับรายการธุรกรรม
+
+ใช้ลำดับเดียวกับ Transaction.Meta.ordering คือ (-date, -created_at) และใช้ id
+เป็นตัวตัดสินกรณีค่าซ้ำ ทำให้แต่ละหน้าเป็นการค้นหาแบบ "ต่อจากแถวสุดท้าย"
+แทนการใช้ OFFSET ต้นทุนของทุกหน้าจึงเท่ากัน ไม่ว่าจะเลื่อนลึกไปแค่ไหน
+
+EstimatedCountPaginator สำหรับหน้า admin: นับจำนวนแถวทั้งตารางจากค่าประมาณของ PostgreSQL แทน COUNT(*)
+"""
+import base64
+import binascii
+from datetime import date, datetime
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+PAGE_SIZE = 25
+
+KEYSET_ORDERING = ('-date', '-created_at', '-id')
+
+# ต่ำกว่านี้ COUNT(*) ยังเร็วพอ และค่าประมาณของตารางเล็กคลาดเคลื่อนง่าย
+ESTIMATE_MIN_ROWS = 100_000
+
+
+def encode_cursor(obj):
+    """
+    แปลงตำแหน่งของแถว (date, created_at, id) เป็นสตริงสำหรับใส่ใน URL
+    รับได้ทั้ง model instance และ dict จาก values() (ต้องมี date, created_at, id)
+    """
+    if isinstance(obj, dict):
+        row_date, created_at, pk = obj['date'], obj['created_at'], obj['id']
+    else:
+        row_date, created_at, pk = obj.date, obj.created_at, obj.pk
+    raw = f'{row_date.isoformat()}|{created_at.isoformat()}|{pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """แปลง cursor กลับเป็น (date, created_at, id) คืนค่า None ถ้า cursor ไม่ถูกต้อง"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        date_str, created_str, pk_str = raw.split('|')
+        return date.fromisoformat(date_str), datetime.fromisoformat(created_str), int(pk_str)
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        return None
+
+
+def _after(position):
+    """เงื่อนไขแถวที่อยู่ถัดไป (เก่ากว่า) ตามลำดับ (-date, -created_at, -id)"""
+    row_date, created_at, pk = position
+    # date <= ... นำหน้า OR ให้ฐานข้อมูลเริ่มอ่าน index (user, date, ...) ที่ตำแหน่ง cursor ได้เลย
+    # (SQLite ใช้เงื่อนไข OR เป็นช่วงของ index ไม่ได้ จะไล่อ่านจากแถวล่าสุดจนถึง cursor)
+    return Q(date__lte=row_date) & (
+        Q(date__lt=row_date)
+        | Q(date=row_date, created_at__lt=created_at)
+        | Q(date=row_date, created_at=created_at, id__lt=pk)
+    )
+
+
+def _before(position):
+    """เงื่อนไขแถวที่อยู่ก่อนหน้า (ใหม่กว่า) ตามลำดับ (-date, -created_at, -id)"""
+    row_date, created_at, pk = position
+    return Q(date__gte=row_date) & (
+        Q(date__gt=row_date)
+        | Q(date=row_date, created_at__gt=created_at)
+        | Q(date=row_date, created_at=created_at, id__gt=pk)
+    )
+
+
+class KeysetPage:
+    """ผลลัพธ์ของหนึ่งหน้า พร้อม cursor สำหรับลิงก์หน้าถัดไป/ก่อนหน้า"""
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+
+    @property
+    def next_cursor(self):
+        if self.has_next and self.object_list:
+            return encode_cursor(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous and self.object_list:
+            return encode_cursor(self.object_list[0])
+        return None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def paginate_keyset(queryset, after=None, before=None, per_page=PAGE_SIZE):
+    """
+    ดึงหนึ่งหน้าจาก queryset ของ Transaction (หรือ .values() ของมัน)
+    - after: cursor ของแถวสุดท้ายในหน้าก่อน (เลื่อนไปหน้าถัดไป)
+    - before: cursor ของแถวแรกในหน้าปัจจุบัน (ย้อนกลับหน้าก่อน)
+    ดึงเกินมา 1 แถวเพื่อรู้ว่ายังมีหน้าต่อไปหรือไม่ โดยไม่ต้องนับทั้งหมด
+    """
+    after_pos = decode_cursor(after)
+    before_pos = decode_cursor(before) if after_pos is None else None
+
+    if before_pos is not None:
+        # ย้อนกลับ: เรียงกลับด้านเพื่อเอาแถวที่ติดกับ cursor ก่อน แล้วค่อยกลับลำดับใน Python
+        rows = list(
+            queryset.filter(_before(before_pos))
+            .order_by('date', 'created_at', 'id')[:per_page + 1]
+        )
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page]
+        rows.reverse()
+        return KeysetPage(rows, has_next=True, has_previous=has_previous)
+
+    if after_pos is not None:
+        queryset = queryset.filter(_after(after_pos))
+
+    rows = list(queryset.order_by(*KEYSET_ORDERING)[:per_page + 1])
+    has_next = len(rows) > per_page
+    return KeysetPage(rows[:per_page], has_next=has_next, has_previous=after_pos is not None)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator ของ admin ที่ไม่ COUNT(*) ทั้งตาราง: เมื่อ queryset ไม่มีเงื่อนไข (หน้าแรกของ changelist)
+    บน PostgreSQL ใช้ pg_class.reltuples (ค่าที่ VACUUM/ANALYZE ประมาณไว้) ถ้ามีตั้งแต่ ESTIMATE_MIN_ROWS แถว
+    กรณีอื่น (มีตัวกรอง/ค้นหา, ฐานข้อมูลอื่น, ยังไม่เคย ANALYZE) นับจริงตามปกติ
+    ใช้คู่กับ show_full_result_count = False เพื่อไม่ให้ admin นับทั้งตารางซ้ำอีกรอบ
+    """
+
+    @cached_property
+    def count(self):
+        estimate = self._estimate()
+        if estimate is not None:
+            return estimate
+        return super().count
+
+    def _estimate(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where:
+            return None
+        connection = connections[self.object_list.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [connection.ops.quote_name(self.object_list.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+        # -1 = ยังไม่เคย VACUUM/ANALYZE (PostgreSQL 14+)
+        if row is None or row[0] < ESTIMATE_MIN_ROWS:
+            return None
+        return row[0]
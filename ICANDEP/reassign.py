@@ -0,0 +1,91 @@
+"""
+การใช้งานและการรวมหมวดหมู่ (หน้า manage_categories)
+
+หมวดหมู่ถูกอ้างถึงด้วย PROTECT จาก Transaction และ ArchivedTransaction จึงลบหมวดหมู่ที่ยังใช้อยู่ไม่ได้
+merge() ย้ายธุรกรรมทั้งหมดไปหมวดหมู่อื่นของประเภทเดียวกันด้วย UPDATE ครั้งเดียวต่อตาราง
+แล้วค่อยลบหรือปิดใช้งานหมวดหมู่เดิม ทั้งหมดใน transaction เดียว
+
+DailySummary / PeriodSummary อ้างถึงหมวดหมู่แบบ CASCADE: ต้องรวมแถวยอดรวมของหมวดหมู่เดิมเข้ากับหมวดหมู่ใหม่ก่อน
+(ไม่เช่นนั้นการลบหมวดหมู่จะลบยอดรวมทิ้ง และ PeriodSummary ของช่วงที่ปิดบัญชีคำนวณใหม่ไม่ได้)
+"""
+from dataclasses import dataclass
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Subquery
+from django.utils import timezone
+
+from . import caching
+from .models import ArchivedTransaction, DailySummary, PeriodSummary, Transaction
+
+# นับจำนวนที่ใช้หมวดหมู่ถึงแค่นี้ (เกินกว่านี้แสดงเป็น "มากกว่า") ไม่ต้องนับทั้งตาราง
+USAGE_LIMIT = 10_000
+
+
+def usage(category):
+    """
+    จำนวนธุรกรรม (ปัจจุบัน + เก็บถาวร) ที่ใช้หมวดหมู่นี้ นับไม่เกิน USAGE_LIMIT + 1
+    อ่านจาก index ของ category_id อย่างเดียว (COUNT จาก subquery ที่มี LIMIT)
+    """
+    count = Transaction.objects.filter(category=category).order_by().values('pk')[:USAGE_LIMIT + 1].count()
+    if count <= USAGE_LIMIT:
+        count += (
+            ArchivedTransaction.objects.filter(category=category).order_by()
+            .values('pk')[:USAGE_LIMIT + 1 - count].count()
+        )
+    return count
+
+
+@dataclass
+class MergeResult:
+    moved: int = 0
+    archived: int = 0
+    deleted: bool = False
+
+
+def _merge_rollups(model, source, target, key):
+    """ย้ายแถวยอดรวมของ source ไป target: แถวที่ target มี key เดียวกันอยู่แล้วบวกยอดเข้าไป ที่เหลือเปลี่ยนหมวดหมู่"""
+    same_key = {field: OuterRef(field) for field in key}
+    source_rows = model.objects.filter(category=source, **same_key)
+    model.objects.filter(category=target).filter(Exists(source_rows)).update(
+        total=F('total') + Subquery(source_rows.values('total')[:1]),
+        count=F('count') + Subquery(source_rows.values('count')[:1]),
+    )
+    model.objects.filter(category=source).filter(
+        Exists(model.objects.filter(category=target, **same_key))
+    ).delete()
+    model.objects.filter(category=source).update(category=target)
+
+
+def merge(source, target, delete_source=True):
+    """
+    ย้ายธุรกรรมทั้งหมดของ source ไป target (ประเภทเดียวกัน) แล้วลบ source (หรือปิดใช้งานถ้า delete_source=False)
+    คืนค่า MergeResult
+    """
+    if source.pk == target.pk:
+        raise ValueError('ต้องเลือกหมวดหมู่อื่น')
+    if source.transaction_type != target.transaction_type:
+        raise ValueError('หมวดหมู่ที่รวมกันต้องเป็นประเภทเดียวกัน')
+
+    result = MergeResult()
+    with transaction.atomic():
+        # ผู้ใช้ที่ได้รับผล (จากแถวยอดรวม ซึ่งน้อยกว่าธุรกรรมมาก) ก่อนแถวเหล่านั้นย้ายไปหมวดหมู่ใหม่
+        users = set(DailySummary.objects.filter(category=source).values_list('user_id', flat=True).distinct())
+        users |= set(PeriodSummary.objects.filter(category=source).values_list('user_id', flat=True).distinct())
+
+        # UPDATE ตรงๆ ไม่ส่ง signal ทีละแถว: ยอดรวมย้ายตามด้วย _merge_rollups ด้านล่าง
+        result.moved = Transaction.objects.filter(category=source).update(category=target, updated_at=timezone.now())
+        result.archived = ArchivedTransaction.objects.filter(category=source).update(category=target)
+        _merge_rollups(DailySummary, source, target, ('user', 'day', 'transaction_type'))
+        _merge_rollups(PeriodSummary, source, target, ('period', 'user', 'transaction_type'))
+
+        if delete_source:
+            source.delete()
+            result.deleted = True
+        else:
+            source.is_active = False
+            source.save(update_fields=['is_active'])
+
+    # หมวดหมู่ของรายการเปลี่ยน: cache/ETag ของผู้ใช้เหล่านี้ใช้ไม่ได้
+    for user_id in users:
+        caching.bump_data_version(user_id)
+    return result
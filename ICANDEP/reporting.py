@@ -0,0 +1,178 @@
+"""
+รายงานสรุปยอดจากตาราง DailySummary
+
+แต่ละฟังก์ชันตอบรายงานหนึ่งชุดด้วย query แบบ GROUP BY เพียงครั้งเดียว
+(TruncDay/TruncMonth ... ร่วมกับ Sum(filter=Q(...)) แยกรายรับ/รายจ่าย)
+และคืนผลเป็นโครงสร้างเล็กๆ ที่ใช้ร่วมกันได้ทั้ง dashboard และ reports
+"""
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncQuarter, TruncWeek, TruncYear
+
+from . import archive
+from .models import DailySummary
+
+GRANULARITIES = {
+    'day': TruncDay,
+    'week': TruncWeek,
+    'month': TruncMonth,
+    'quarter': TruncQuarter,
+    'year': TruncYear,
+}
+
+LABEL_FORMATS = {
+    'day': '%d %b %Y',
+    'week': '%d %b %Y',
+    'month': '%b %Y',
+    'quarter': '%b %Y',
+    'year': '%Y',
+}
+
+INCOME = Q(transaction_type='income')
+EXPENSE = Q(transaction_type='expense')
+
+
+@dataclass
+class PeriodTotals:
+    """ยอดรวมของหนึ่งช่วง (วัน/สัปดาห์/เดือน/ไตรมาส/ปี)"""
+    start: date
+    label: str
+    income: Decimal = Decimal('0')
+    expense: Decimal = Decimal('0')
+
+    @property
+    def balance(self):
+        return self.income - self.expense
+
+
+@dataclass
+class Summary:
+    """ยอดรวมของช่วงวันที่หนึ่ง พร้อมยอดแยกตามหมวดหมู่"""
+    income: Decimal = Decimal('0')
+    expense: Decimal = Decimal('0')
+    categories: list = field(default_factory=list)
+
+    @property
+    def balance(self):
+        return self.income - self.expense
+
+    @property
+    def ratio(self):
+        """รายจ่ายคิดเป็นกี่เปอร์เซ็นต์ของรายรับ"""
+        return (self.expense / self.income * 100) if self.income > 0 else 0
+
+    def categories_of(self, transaction_type):
+        return [row for row in self.categories if row['transaction_type'] == transaction_type]
+
+
+def period_start(day, granularity):
+    """วันแรกของช่วงที่ day อยู่"""
+    if granularity == 'day':
+        return day
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    if granularity == 'quarter':
+        return day.replace(month=(day.month - 1) // 3 * 3 + 1, day=1)
+    if granularity == 'year':
+        return day.replace(month=1, day=1)
+    raise ValueError(f'ไม่รู้จัก granularity: {granularity}')
+
+
+def shift_period(start, granularity, steps):
+    """เลื่อนวันแรกของช่วงไป steps ช่วง (ติดลบ = ย้อนหลัง) ตามปฏิทินจริง ไม่ใช่ทีละ 30 วัน"""
+    if granularity == 'day':
+        return start + timedelta(days=steps)
+    if granularity == 'week':
+        return start + timedelta(weeks=steps)
+    months = {'month': 1, 'quarter': 3, 'year': 12}[granularity] * steps
+    index = start.year * 12 + start.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def period_series(user, granularity='month', periods=6, end=None):
+    """
+    ยอดรายรับ/รายจ่ายย้อนหลัง periods ช่วง สิ้นสุดที่ช่วงของวันที่ end (ค่าเริ่มต้น: วันนี้)
+    ใช้ query เดียว และเติมช่วงที่ไม่มีข้อมูลเป็น 0
+    """
+    trunc = GRANULARITIES[granularity]
+    end = end or date.today()
+    last_start = period_start(end, granularity)
+    first_start = shift_period(last_start, granularity, -(periods - 1))
+    range_end = shift_period(last_start, granularity, 1)
+
+    rows = (
+        DailySummary.objects.filter(user=user, day__gte=first_start, day__lt=range_end)
+        .annotate(period=trunc('day'))
+        .order_by()
+        .values('period')
+        .annotate(income=Sum('total', filter=INCOME), expense=Sum('total', filter=EXPENSE))
+    )
+    by_start = {_as_date(row['period']): row for row in rows}
+
+    series = []
+    start = first_start
+    for _ in range(periods):
+        row = by_start.get(start, {})
+        series.append(PeriodTotals(
+            start=start,
+            label=start.strftime(LABEL_FORMATS[granularity]),
+            income=row.get('income') or Decimal('0'),
+            expense=row.get('expense') or Decimal('0'),
+        ))
+        start = shift_period(start, granularity, 1)
+    return series
+
+
+def summarize(user, date_from=None, date_to=None):
+    """
+    ยอดรวมรายรับ/รายจ่ายและยอดแยกตามหมวดหมู่ของช่วงวันที่ (รวมวันสุดท้าย)
+    ไม่ระบุวันที่ = ตั้งแต่เริ่มใช้ระบบ ใช้ query เดียว (GROUP BY ประเภท, หมวดหมู่)
+    ถ้ามีช่วงที่ปิดบัญชีแล้ว ส่วนก่อน archive.boundary() อ่านจากยอดที่แช่แข็งไว้ (PeriodSummary) แทน
+    """
+    sources = []
+    boundary = archive.boundary()
+    if date_from is None and boundary is not None and (date_to is None or date_to >= boundary):
+        sources.append(archive.frozen_totals(user))
+        date_from = boundary
+
+    rows = DailySummary.objects.filter(user=user)
+    if date_from is not None:
+        rows = rows.filter(day__gte=date_from)
+    if date_to is not None:
+        rows = rows.filter(day__lte=date_to)
+    sources.append(
+        rows.order_by()
+        .values('transaction_type', 'category__id', 'category__name')
+        .annotate(total=Sum('total'), count=Sum('count'))
+    )
+
+    merged = {}
+    for source in sources:
+        for row in source:
+            key = (row['transaction_type'], row['category__id'])
+            if key in merged:
+                merged[key]['total'] += row['total']
+                merged[key]['count'] += row['count']
+            else:
+                merged[key] = row
+
+    summary = Summary()
+    for row in merged.values():
+        if row['transaction_type'] == 'income':
+            summary.income += row['total']
+        else:
+            summary.expense += row['total']
+        if row['category__id'] is not None:
+            summary.categories.append(row)
+    summary.categories.sort(key=lambda row: row['total'], reverse=True)
+    return summary
+
+
+def _as_date(value):
+    # Trunc บน DateField คืนค่า date อยู่แล้ว แต่บางฐานข้อมูลอาจคืน datetime
+    return value.date() if isinstance(value, datetime) else value
@@ -0,0 +1,116 @@
+"""
+ดูแลตาราง DailySummary (ยอดรวมรายวันต่อ ผู้ใช้ / วัน / ประเภท / หมวดหมู่)
+
+- การเพิ่ม/แก้ไข/ลบ Transaction ทีละรายการ (รวมถึงผ่าน admin) ปรับยอดแบบ incremental
+  ผ่าน signals ใน ICANDEP/signals.py
+- งานที่แก้ข้อมูลทีละมากๆ ด้วย QuerySet.update()/bulk_create() ซึ่งไม่ส่ง signal
+  ให้เรียก rebuild() เฉพาะผู้ใช้และช่วงวันที่ที่ได้รับผลกระทบ
+- ช่วงที่ปิดบัญชีแล้ว (ICANDEP/archive.py) ไม่อยู่ในตาราง Transaction แล้ว rebuild() จึงไม่แตะช่วงนั้น
+"""
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from . import archive
+from .models import DailySummary, Transaction
+
+BATCH_SIZE = 2000
+
+ROLLUP_FIELDS = ('user_id', 'date', 'transaction_type', 'category_id', 'amount')
+
+
+def snapshot(obj):
+    """เก็บค่าที่มีผลกับยอดรวมของ Transaction ไว้เป็น dict"""
+    return {field: getattr(obj, field) for field in ROLLUP_FIELDS}
+
+
+def apply_delta(user_id, day, transaction_type, category_id, amount, count):
+    """บวก/ลบยอดของแถว DailySummary หนึ่งแถว (สร้างแถวใหม่ถ้ายังไม่มี)"""
+    rows = DailySummary.objects.filter(
+        user_id=user_id,
+        day=day,
+        transaction_type=transaction_type,
+        category_id=category_id,
+    )
+    changes = {'total': F('total') + amount, 'count': F('count') + count}
+    if rows.update(**changes):
+        if count < 0:
+            rows.filter(count__lte=0).delete()
+        return
+
+    if count < 0:
+        # ไม่มีแถวให้หักออก (เช่น กำลังลบผู้ใช้ทั้งคน) ไม่ต้องทำอะไร
+        return
+
+    try:
+        with transaction.atomic():
+            DailySummary.objects.create(
+                user_id=user_id,
+                day=day,
+                transaction_type=transaction_type,
+                category_id=category_id,
+                total=amount,
+                count=count,
+            )
+    except IntegrityError:
+        # มีคำขออื่นสร้างแถวเดียวกันไปก่อนแล้ว
+        rows.update(**changes)
+
+
+def record_change(previous=None, current=None):
+    """ปรับยอดจากค่าก่อนและหลังการเปลี่ยนแปลง (ค่าใดเป็น None หมายถึงไม่มีแถวนั้น)"""
+    if previous and current and previous == current:
+        return
+    if previous:
+        apply_delta(previous['user_id'], previous['date'], previous['transaction_type'],
+                    previous['category_id'], -previous['amount'], -1)
+    if current:
+        apply_delta(current['user_id'], current['date'], current['transaction_type'],
+                    current['category_id'], current['amount'], 1)
+
+
+def rebuild(user=None, date_from=None, date_to=None):
+    """
+    คำนวณ DailySummary ใหม่จากตาราง Transaction
+    ระบุ user / ช่วงวันที่เพื่อจำกัดขอบเขตได้ คืนค่าจำนวนแถวที่สร้าง
+    วันก่อน archive.boundary() ถูกตัดออกเสมอ (ยอดของช่วงที่ปิดแล้วคงเดิม)
+    """
+    floor = archive.boundary()
+    if floor is not None and (date_from is None or date_from < floor):
+        date_from = floor
+    summaries = DailySummary.objects.all()
+    transactions = Transaction.objects.all()
+    if user is not None:
+        summaries = summaries.filter(user=user)
+        transactions = transactions.filter(user=user)
+    if date_from is not None:
+        summaries = summaries.filter(day__gte=date_from)
+        transactions = transactions.filter(date__gte=date_from)
+    if date_to is not None:
+        summaries = summaries.filter(day__lte=date_to)
+        transactions = transactions.filter(date__lte=date_to)
+
+    grouped = (
+        transactions.order_by()
+        .values('user_id', 'date', 'transaction_type', 'category_id')
+        .annotate(total=Sum('amount'), count=Count('id'))
+    )
+    created = 0
+    with transaction.atomic():
+        summaries.delete()
+        rows = grouped.iterator(chunk_size=BATCH_SIZE)
+        while batch := list(islice(rows, BATCH_SIZE)):
+            DailySummary.objects.bulk_create(
+                DailySummary(
+                    user_id=row['user_id'],
+                    day=row['date'],
+                    transaction_type=row['transaction_type'],
+                    category_id=row['category_id'],
+                    total=row['total'],
+                    count=row['count'],
+                )
+                for row in batch
+            )
+            created += len(batch)
+    return created
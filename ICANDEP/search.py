@@ -0,0 +1,142 @@
+"""
+ค้นหาข้อความในหัวข้อและรายละเอียดของธุรกรรมด้วย index (ช่องค้นหา q ในหน้ารายการ)
+
+PostgreSQL (index สร้างใน migration 0011):
+- to_tsvector('simple', title || ' ' || description) + GIN สำหรับคำที่คั่นด้วยช่องว่าง
+  (config 'simple' เพราะไม่มี stemmer ภาษาไทย)
+- pg_trgm (gin_trgm_ops บน UPPER(title), UPPER(description)) สำหรับ substring ภาษาไทย
+  ที่ไม่มีช่องว่างคั่นคำ: title/description ILIKE '%คำ%' ใช้ index นี้
+- รวมสองเงื่อนไขด้วย OR (bitmap OR ของ index) เรียงตาม ts_rank + ความคล้ายของหัวข้อ
+
+SQLite: ตารางเงา FTS5 (ICANDEP_transaction_fts, tokenizer trigram) แบบ external content
+ซิงก์ด้วย trigger ตอน INSERT/UPDATE/DELETE จึงครอบคลุม bulk_create และการนำเข้าด้วย
+คำที่สั้นกว่า 3 ตัวอักษร trigram หาไม่ได้ ใช้ LIKE กับแถวที่ผ่านตัวกรองอื่นแล้วแทน เรียงตาม bm25()
+
+ผลค้นหาเรียงตามความเกี่ยวข้อง (ไม่ใช่วันที่) จึงแบ่งหน้าด้วยเลขหน้า และจำกัดไว้ MAX_RESULTS แถวแรก
+รายการที่เก็บถาวรแล้ว (ArchivedTransaction) ไม่มี index ค้นหา ใช้ LIKE และเรียงตามวันที่
+"""
+from django.db import connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Transaction
+from .pagination import KEYSET_ORDERING, PAGE_SIZE, KeysetPage
+
+FTS_TABLE = 'ICANDEP_transaction_fts'
+
+# trigram (ทั้ง FTS5 และ pg_trgm) ต้องมีอย่างน้อย 3 ตัวอักษร
+MIN_TRIGRAM_LENGTH = 3
+
+MAX_TERMS = 8
+MAX_RESULTS = 500
+
+
+def terms(text):
+    """คำค้นที่คั่นด้วยช่องว่าง (ตัดที่ MAX_TERMS คำ)"""
+    return [word[:100] for word in (text or '').split()][:MAX_TERMS]
+
+
+def _like(words):
+    condition = Q()
+    for word in words:
+        condition &= Q(title__icontains=word) | Q(description__icontains=word)
+    return condition
+
+
+def _fts_match(words):
+    """นิพจน์ MATCH ของ FTS5: ทุกคำต้องพบ (แต่ละคำเป็น phrase จึงไม่ถูกตีความเป็น operator)"""
+    return ' '.join('"{}"'.format(word.replace('"', '""')) for word in words)
+
+
+def _pg_vector():
+    from django.contrib.postgres.search import SearchVector
+    # ต้องตรงกับ expression ของ index txn_search_vector_idx ใน migration 0011
+    return SearchVector('title', 'description', config='simple')
+
+
+def _pg_query(text):
+    from django.contrib.postgres.search import SearchQuery
+    return SearchQuery(text, config='simple', search_type='websearch')
+
+
+def matching(queryset, text):
+    """กรอง queryset ของ Transaction ให้เหลือแถวที่ตรงกับคำค้น (ไม่มีคำค้น = queryset เดิม)"""
+    words = terms(text)
+    if not words:
+        return queryset
+    if queryset.model is not Transaction:
+        return queryset.filter(_like(words))
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        text = ' '.join(words)
+        return queryset.annotate(search_vector=_pg_vector()).filter(
+            Q(search_vector=_pg_query(text)) | Q(title__icontains=text) | Q(description__icontains=text)
+        )
+    if vendor == 'sqlite':
+        indexed = [word for word in words if len(word) >= MIN_TRIGRAM_LENGTH]
+        if indexed:
+            queryset = queryset.filter(id__in=RawSQL(
+                f'SELECT rowid FROM "{FTS_TABLE}" WHERE "{FTS_TABLE}" MATCH %s', [_fts_match(indexed)],
+            ))
+        return queryset.filter(_like([word for word in words if len(word) < MIN_TRIGRAM_LENGTH]))
+    return queryset.filter(_like(words))
+
+
+def ranked_rows(queryset, text, offset, limit):
+    """
+    แถวที่ตรงกับคำค้นตำแหน่ง offset ถึง offset + limit เรียงตามความเกี่ยวข้องมากไปน้อย
+    แล้วตามลำดับปกติ (-date, -created_at, -id) queryset คือแถวที่ผ่านตัวกรองอื่นแล้ว แต่ยังไม่ผ่าน matching()
+    """
+    words = terms(text)
+    vendor = connections[queryset.db].vendor
+    if queryset.model is not Transaction:
+        return list(matching(queryset, text).order_by(*KEYSET_ORDERING)[offset:offset + limit])
+    if vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchRank, TrigramSimilarity
+        text = ' '.join(words)
+        return list(
+            matching(queryset, text).annotate(
+                search_rank=SearchRank(_pg_vector(), _pg_query(text)) + TrigramSimilarity('title', text),
+            ).order_by('-search_rank', *KEYSET_ORDERING)[offset:offset + limit]
+        )
+
+    indexed = [word for word in words if len(word) >= MIN_TRIGRAM_LENGTH]
+    if vendor != 'sqlite' or not indexed:
+        return list(matching(queryset, text).order_by(*KEYSET_ORDERING)[offset:offset + limit])
+
+    # bm25() ใช้ได้เฉพาะใน query ที่ MATCH ตาราง FTS เอง: JOIN กับแถวที่ผ่านตัวกรองแล้ว
+    # เลือก id ตามอันดับ (MATCH ครั้งเดียว) แล้วค่อยโหลด object ของหน้านี้
+    queryset = queryset.filter(_like([word for word in words if len(word) < MIN_TRIGRAM_LENGTH]))
+    filtered_sql, params = queryset.values('id', 'date', 'created_at').query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            f'SELECT t.id FROM "{FTS_TABLE}" JOIN ({filtered_sql}) t ON t.id = "{FTS_TABLE}".rowid '
+            f'WHERE "{FTS_TABLE}" MATCH %s '
+            f'ORDER BY bm25("{FTS_TABLE}"), t.date DESC, t.created_at DESC, t.id DESC '
+            f'LIMIT %s OFFSET %s',
+            [*params, _fts_match(indexed), limit, offset],
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+    rows = queryset.in_bulk(ids)
+    return [rows[pk] for pk in ids if pk in rows]
+
+
+def paginate_ranked(queryset, text, number=1, per_page=PAGE_SIZE):
+    """
+    หนึ่งหน้าของผลค้นหาที่เรียงตามความเกี่ยวข้อง (number เริ่มที่ 1) ไม่นับจำนวนทั้งหมด
+    queryset ยังไม่ผ่าน matching() (ranked_rows กรองเอง)
+    ดึงเกินมา 1 แถวเพื่อรู้ว่ามีหน้าถัดไป หน้าเกิน MAX_RESULTS ถือว่าหมดแล้ว
+    """
+    try:
+        number = max(1, int(number))
+    except (TypeError, ValueError):
+        number = 1
+    offset = (number - 1) * per_page
+    if offset >= MAX_RESULTS:
+        rows = []
+    else:
+        rows = ranked_rows(queryset, text, offset, min(per_page + 1, MAX_RESULTS - offset + 1))
+    has_next = len(rows) > per_page and offset + per_page < MAX_RESULTS
+    page = KeysetPage(rows[:per_page], has_next=has_next, has_previous=number > 1)
+    page.number = number
+    return page
@@ -0,0 +1,64 @@
+"""
+หมวดหมู่เริ่มต้นสำหรับร้านอาหาร
+
+สร้างตอน migrate ครั้งแรก (post_migrate เมื่อตาราง Category ยังว่าง) หรือด้วยคำสั่ง create_categories
+ใช้ bulk_create(ignore_conflicts=True) เพียง query เดียว หมวดหมู่ที่มีอยู่แล้ว
+(ชื่อ + ประเภทซ้ำตาม unique_together) จะถูกข้ามโดยฐานข้อมูล
+"""
+from django.db import DatabaseError
+
+INCOME_CATEGORIES = [
+    ('ขายอาหาร', 'bi-egg-fried'),
+    ('ขายเครื่องดื่ม', 'bi-cup'),
+    ('ขายของหวาน', 'bi-cake'),
+    ('ขายของทานเล่น', 'bi-bag'),
+    ('รับจ้างจัดเลี้ยง', 'bi-calendar-event'),
+    ('รายรับอื่นๆ', 'bi-wallet'),
+]
+
+EXPENSE_CATEGORIES = [
+    ('วัตถุดิบอาหาร', 'bi-basket'),
+    ('วัตถุดิบเครื่องดื่ม', 'bi-cup-straw'),
+    ('ค่าแรงพนักงาน', 'bi-people'),
+    ('ค่าเช่าที่', 'bi-building'),
+    ('ค่าน้ำ-ค่าไฟ', 'bi-lightning'),
+    ('ค่าแก๊ส', 'bi-fire'),
+    ('อุปกรณ์ครัว', 'bi-tools'),
+    ('ภาชนะบรรจุ', 'bi-box'),
+    ('ค่าโฆษณา', 'bi-megaphone'),
+    ('ค่าซ่อมบำรุง', 'bi-wrench'),
+    ('ค่าขนส่ง', 'bi-truck'),
+    ('ภาษี', 'bi-receipt'),
+    ('รายจ่ายอื่นๆ', 'bi-cash-stack'),
+]
+
+
+def default_categories():
+    """(ชื่อ, ประเภท, ไอคอน) ของหมวดหมู่เริ่มต้นทั้งหมด"""
+    for name, icon in INCOME_CATEGORIES:
+        yield name, 'income', icon
+    for name, icon in EXPENSE_CATEGORIES:
+        yield name, 'expense', icon
+
+
+def seed_categories(category_model, using='default'):
+    """
+    สร้างหมวดหมู่เริ่มต้นที่ยังไม่มี ด้วย INSERT เดียว
+    category_model รับได้ทั้ง model จริงและ historical model จาก migration
+    """
+    from . import catalog
+
+    category_model.objects.using(using).bulk_create(
+        [
+            category_model(name=name, transaction_type=transaction_type, icon=icon, is_active=True)
+            for name, transaction_type, icon in default_categories()
+        ],
+        ignore_conflicts=True,
+    )
+    try:
+        # bulk_create ไม่ส่ง signal จึงต้องให้ catalog โหลดใหม่เอง
+        catalog.invalidate()
+    except DatabaseError:
+        # migrate ย้อนไปก่อนมีตาราง CatalogVersion หรือ CACHE_BACKEND=db แต่ยังไม่ได้ createcachetable:
+        # ยังไม่มี process ใดถือ catalog อยู่
+        pass
@@ -0,0 +1,59 @@
+from django.apps import apps as global_apps
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import caching, catalog, rollups
+from .models import Category, Transaction
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_rollup_key(sender, instance, **kwargs):
+    """จำค่าเดิมก่อนบันทึก เพื่อหักยอดเดิมออกจาก DailySummary เมื่อแก้ไข"""
+    previous = None
+    if instance.pk:
+        previous = sender.objects.filter(pk=instance.pk).values(*rollups.ROLLUP_FIELDS).first()
+    instance._rollup_previous = previous
+
+
+@receiver(post_save, sender=Transaction)
+def update_rollup_on_save(sender, instance, **kwargs):
+    rollups.record_change(
+        previous=getattr(instance, '_rollup_previous', None),
+        current=rollups.snapshot(instance),
+    )
+    caching.bump_data_version(instance.user_id)
+
+
+@receiver(post_delete, sender=Transaction)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    rollups.record_change(previous=rollups.snapshot(instance))
+    caching.bump_data_version(instance.user_id)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_catalog(sender, **kwargs):
+    catalog.invalidate()
+
+
+def seed_default_categories(sender, using, apps=global_apps, plan=None, **kwargs):
+    """
+    post_migrate: สร้างหมวดหมู่เริ่มต้นครั้งเดียวตอน migrate แทนการตรวจใน request
+    ทำเฉพาะเมื่อตาราง Category ยังว่าง (ติดตั้งใหม่ หรือหลัง flush) migrate ครั้งต่อๆ ไป
+    ไม่สร้างหมวดหมู่ที่ผู้ใช้ลบไปแล้วกลับมา และไม่ INSERT ทุกครั้งที่ deploy
+    flush ส่ง post_migrate โดยไม่มี apps/plan จึงใช้ app registry ปัจจุบันแทน
+    """
+    if sender.name != 'ICANDEP' or plan == []:
+        # ไม่มี migration ที่ต้องรัน (deploy ที่ schema ไม่เปลี่ยน)
+        return
+
+    from . import seeding  # ใช้เฉพาะตอน migrate ไม่ต้องโหลดตอนเว็บเริ่มทำงาน
+
+    try:
+        category_model = apps.get_model('ICANDEP', 'Category')
+    except LookupError:
+        # migrate ย้อนไปก่อนมีตาราง Category
+        return
+    if category_model.objects.using(using).exists():
+        return
+    seeding.seed_categories(category_model, using=using)
@@ -0,0 +1,166 @@
+"""
+บันทึก query ที่ช้ากว่า SLOW_QUERY_MS จาก view ของ ICANDEP และ admin พร้อมแผนการ query (EXPLAIN)
+
+- ตรวจใน execute wrapper ของ ICANDEP/instrumentation.py (ทุก connection) จึงรู้ว่า query มาจาก view ไหน
+- เก็บ SQL, parameter, เวลา, view และแผนการ query ไว้ใน ring buffer ของ process (SLOW_QUERY_BUFFER รายการ)
+  และเขียนต่อท้ายไฟล์ JSON lines (SLOW_QUERY_LOG) ถ้าตั้งค่าไว้ ให้คำสั่ง slow_queries สรุปภายหลัง
+- EXPLAIN เฉพาะ SELECT: ทุก query ที่ยังไม่เคยเห็นรูปแบบนี้ และสุ่มตามสัดส่วน SLOW_QUERY_EXPLAIN_RATE
+  สำหรับรูปแบบที่เคย explain แล้ว PostgreSQL ใช้ EXPLAIN (ANALYZE off) (ไม่รัน query ซ้ำ)
+  SQLite ใช้ EXPLAIN QUERY PLAN รันด้วย cursor ของ backend โดยตรง (ไม่ผ่าน execute wrapper) จึงไม่ถูกนับหรือตรวจซ้ำ
+- รูปแบบของ query (fingerprint) คือ SQL ที่แทนค่าคงที่ด้วย ? และยุบรายการ IN (...) ให้เหลือรูปแบบเดียว
+"""
+import json
+import random
+import re
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_IN_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_READ = re.compile(r'\s*(?:SELECT|WITH)\b', re.IGNORECASE)
+
+_lock = threading.Lock()
+_buffer = None
+_explained = set()
+
+
+def fingerprint(sql):
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    return _IN_LIST.sub('(...)', sql)
+
+
+def buffer():
+    """ring buffer ของ process นี้ (รายการใหม่สุดอยู่ท้าย)"""
+    global _buffer
+    if _buffer is None:
+        _buffer = deque(maxlen=settings.SLOW_QUERY_BUFFER)
+    return _buffer
+
+
+def watched(view):
+    return view is not None and view.startswith(tuple(settings.SLOW_QUERY_VIEWS))
+
+
+def explain(connection, sql, params):
+    """แผนการ query เป็นข้อความ (None ถ้า explain ไม่ได้) ไม่ผ่าน execute wrapper ของ Django"""
+    if connection.vendor == 'postgresql':
+        prefix = 'EXPLAIN (ANALYZE off) '
+    elif connection.vendor == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    else:
+        prefix = 'EXPLAIN '
+    # EXPLAIN ที่ error ใน transaction ของ PostgreSQL ทำให้ทั้ง transaction ใช้ไม่ได้ จึงครอบด้วย savepoint
+    savepoint = connection.vendor == 'postgresql' and connection.in_atomic_block
+    cursor = connection.create_cursor()
+    try:
+        if savepoint:
+            cursor.execute('SAVEPOINT icandep_explain')
+        try:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+        except Exception:
+            if savepoint:
+                cursor.execute('ROLLBACK TO SAVEPOINT icandep_explain')
+            return None
+        if savepoint:
+            cursor.execute('RELEASE SAVEPOINT icandep_explain')
+    finally:
+        cursor.close()
+    if connection.vendor == 'sqlite':
+        # (id, parent, notused, detail)
+        return '\n'.join(str(row[-1]) for row in rows)
+    return '\n'.join(' '.join(str(value) for value in row) for row in rows)
+
+
+def record(metrics, sql, params, many, connection, duration):
+    """เรียกจาก execute wrapper เมื่อ query ช้ากว่าเกณฑ์"""
+    if many or not watched(metrics.view):
+        return
+    key = fingerprint(sql)
+    plan = None
+    if _READ.match(sql):
+        with _lock:
+            first = key not in _explained
+            if first:
+                _explained.add(key)
+        if first or random.random() < settings.SLOW_QUERY_EXPLAIN_RATE:
+            plan = explain(connection, sql, params)
+
+    entry = {
+        'at': timezone.now().isoformat(),
+        'view': metrics.view,
+        'duration_ms': round(duration * 1000, 2),
+        'fingerprint': key,
+        'sql': sql,
+        'params': list(params) if params is not None else None,
+        'database': connection.alias,
+        'plan': plan,
+    }
+    with _lock:
+        buffer().append(entry)
+        if settings.SLOW_QUERY_LOG:
+            try:
+                with open(settings.SLOW_QUERY_LOG, 'a', encoding='utf-8') as stream:
+                    stream.write(json.dumps(entry, cls=DjangoJSONEncoder, ensure_ascii=False, default=str) + '\n')
+            except OSError:
+                pass
+
+
+def read_log(path):
+    """รายการจากไฟล์ JSON lines (ข้ามบรรทัดที่เสีย)"""
+    entries = []
+    with open(path, encoding='utf-8') as stream:
+        for line in stream:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+    return entries
+
+
+def summarize(entries, limit=10, view=None):
+    """
+    จัดกลุ่มตาม fingerprint แล้วเรียงตามเวลารวมมากไปน้อย
+    แต่ละกลุ่มมีตัวอย่าง SQL/parameter ล่าสุด และแผนการ query ล่าสุดที่มี
+    """
+    groups = {}
+    for entry in entries:
+        if view and entry.get('view') != view:
+            continue
+        group = groups.get(entry['fingerprint'])
+        if group is None:
+            group = groups[entry['fingerprint']] = {
+                'fingerprint': entry['fingerprint'],
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'views': {},
+                'sample_sql': None,
+                'sample_params': None,
+                'plan': None,
+                'last_at': None,
+            }
+        duration = entry['duration_ms']
+        group['count'] += 1
+        group['total_ms'] += duration
+        group['max_ms'] = max(group['max_ms'], duration)
+        group['views'][entry.get('view')] = group['views'].get(entry.get('view'), 0) + 1
+        group['sample_sql'] = entry['sql']
+        group['sample_params'] = entry.get('params')
+        group['last_at'] = entry.get('at')
+        if entry.get('plan'):
+            group['plan'] = entry['plan']
+
+    top = sorted(groups.values(), key=lambda group: group['total_ms'], reverse=True)[:limit]
+    for group in top:
+        group['total_ms'] = round(group['total_ms'], 2)
+        group['mean_ms'] = round(group['total_ms'] / group['count'], 2)
+    return top
@@ -0,0 +1,193 @@
+"""
+สร้างข้อมูลจำลองของร้านอาหารสำหรับวัดประสิทธิภาพ (คำสั่ง generate_data และ run_benchmarks)
+
+- ใช้หมวดหมู่เริ่มต้นชุดเดียวกับ create_categories (ICANDEP/seeding.py)
+- ยอดขายรายวันขึ้นกับฤดูกาล: เดือน (ไฮซีซั่นปลายปี, สงกรานต์/หน้าฝนเงียบ), วันในสัปดาห์
+  (ศุกร์-อาทิตย์คึกคัก), วันพิเศษ, การเติบโตรายปี (ปีก่อนๆ ขายได้น้อยกว่า) และวันหยุดร้าน
+- รายจ่ายตามรอบจริง: วัตถุดิบรายวันตามยอดขาย, ค่าแก๊ส/ภาชนะรายสัปดาห์, ค่าเช่า/ค่าไฟ/ค่าแรงรายเดือน,
+  ภาษีรายไตรมาส และค่าซ่อม/อุปกรณ์แบบสุ่ม
+- บันทึกด้วย bulk_create ทีละ batch (ไม่เรียก signal ต่อแถว) แล้วสร้างยอดรวมรายวันใหม่ครั้งเดียวต่อผู้ใช้
+- ใช้ random.Random(seed) ผล seed เดียวกันจึงได้ข้อมูลชุดเดิมทุกครั้ง
+"""
+import calendar
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import caching, catalog, rollups
+from .models import Category, Transaction
+from .seeding import seed_categories
+
+BATCH_SIZE = 5000
+
+# ตัวคูณยอดขายตามเดือน (ม.ค.-ธ.ค.)
+MONTH_FACTORS = [1.15, 1.05, 1.0, 0.85, 0.95, 0.9, 0.9, 0.9, 0.85, 0.95, 1.1, 1.25]
+
+# ตัวคูณยอดขายตามวันในสัปดาห์ (จันทร์-อาทิตย์)
+WEEKDAY_FACTORS = [0.8, 0.85, 0.9, 0.95, 1.15, 1.35, 1.25]
+
+# วันพิเศษ (เดือน, วัน) -> ตัวคูณ
+SPECIAL_DAYS = {(2, 14): 1.4, (12, 24): 1.3, (12, 31): 1.6, (1, 1): 0.6, (4, 13): 0.6, (4, 14): 0.5, (4, 15): 0.6}
+
+GROWTH_PER_YEAR = 0.08
+
+CLOSED_DAY_CHANCE = 0.02
+
+# หมวดหมู่รายรับ: (สัดส่วนของจำนวนบิล, [(ชื่อรายการ, ราคาต่ำสุด, ราคาสูงสุด)])
+SALES = {
+    'ขายอาหาร': (0.55, [
+        ('ข้าวผัดกะเพรา', 50, 80), ('ผัดไทยกุ้งสด', 60, 120), ('ต้มยำกุ้ง', 120, 250),
+        ('ข้าวมันไก่', 45, 70), ('ส้มตำ', 40, 80), ('แกงเขียวหวาน', 70, 140), ('ข้าวขาหมู', 50, 80),
+    ]),
+    'ขายเครื่องดื่ม': (0.25, [
+        ('ชาเย็น', 30, 55), ('กาแฟเย็น', 40, 70), ('น้ำมะพร้าว', 35, 60), ('น้ำเปล่า', 10, 20),
+    ]),
+    'ขายของหวาน': (0.1, [('ข้าวเหนียวมะม่วง', 60, 120), ('บัวลอย', 30, 50), ('ขนมครก', 30, 60)]),
+    'ขายของทานเล่น': (0.099, [('ทอดมัน', 60, 100), ('ปอเปี๊ยะทอด', 40, 80), ('หมูปิ้ง', 10, 50)]),
+    'รับจ้างจัดเลี้ยง': (0.001, [('จัดเลี้ยงนอกสถานที่', 5000, 40000)]),
+}
+
+_SALE_NAMES = list(SALES)
+_SALE_WEIGHTS = [SALES[name][0] for name in _SALE_NAMES]
+
+
+class RestaurantGenerator:
+    """
+    สร้างธุรกรรมจำลองของร้านหนึ่งร้าน (ผู้ใช้หนึ่งคน)
+    daily_sales: จำนวนบิลขายเฉลี่ยต่อวันในปีล่าสุด ก่อนคูณฤดูกาล
+    """
+
+    def __init__(self, user, daily_sales=40, seed=0, batch_size=BATCH_SIZE):
+        self.user = user
+        self.daily_sales = daily_sales
+        self.batch_size = batch_size
+        self.rng = random.Random(f'{seed}:{user.username}')
+        # ขนาดร้านต่างกันในแต่ละผู้ใช้
+        self.scale = self.rng.uniform(0.7, 1.5)
+        self.rent = Decimal(self.rng.randrange(8000, 40000, 500))
+        self.wages = Decimal(self.rng.randrange(15000, 60000, 1000))
+        seed_categories(Category)
+        current = catalog.get_catalog()
+        self.categories = {
+            (category.name, category.transaction_type): category.pk
+            for category in current.all
+        }
+
+    def _row(self, day, transaction_type, category_name, title, amount):
+        return Transaction(
+            user=self.user,
+            title=title,
+            amount=Decimal(amount).quantize(Decimal('0.01')),
+            transaction_type=transaction_type,
+            category_id=self.categories.get((category_name, transaction_type)),
+            date=day,
+        )
+
+    def _sales_count(self, day, end):
+        if self.rng.random() < CLOSED_DAY_CHANCE:
+            return 0
+        factor = (
+            MONTH_FACTORS[day.month - 1]
+            * WEEKDAY_FACTORS[day.weekday()]
+            * SPECIAL_DAYS.get((day.month, day.day), 1.0)
+            * (1 + GROWTH_PER_YEAR) ** (-(end - day).days / 365)
+            * self.rng.gauss(1, 0.1)
+        )
+        return max(0, round(self.daily_sales * self.scale * factor))
+
+    def day_rows(self, day, end):
+        """ธุรกรรมทั้งหมดของวันหนึ่ง (ขาย + รายจ่ายที่ถึงรอบ)"""
+        rng = self.rng
+        rows = []
+        totals = {}
+        for _ in range(self._sales_count(day, end)):
+            category_name = rng.choices(_SALE_NAMES, weights=_SALE_WEIGHTS)[0]
+            title, low, high = rng.choice(SALES[category_name][1])
+            quantity = rng.choices([1, 2, 3, 4], weights=[60, 25, 10, 5])[0] if high < 1000 else 1
+            amount = rng.randint(low, high) * quantity
+            totals[category_name] = totals.get(category_name, 0) + amount
+            rows.append(self._row(day, 'income', category_name, title, amount))
+
+        # วัตถุดิบซื้อทุกวันตามยอดขาย
+        if totals.get('ขายอาหาร'):
+            rows.append(self._row(day, 'expense', 'วัตถุดิบอาหาร', 'ซื้อวัตถุดิบตลาดเช้า',
+                                  totals['ขายอาหาร'] * rng.uniform(0.3, 0.4)))
+        if totals.get('ขายเครื่องดื่ม'):
+            rows.append(self._row(day, 'expense', 'วัตถุดิบเครื่องดื่ม', 'ซื้อน้ำแข็ง/นม/ชา',
+                                  totals['ขายเครื่องดื่ม'] * rng.uniform(0.25, 0.35)))
+
+        if day.weekday() == 0:
+            rows.append(self._row(day, 'expense', 'ค่าแก๊ส', 'เติมแก๊สหุงต้ม', rng.randint(400, 900) * self.scale))
+            rows.append(self._row(day, 'expense', 'ภาชนะบรรจุ', 'กล่อง/ถุง/หลอด', rng.randint(300, 1200) * self.scale))
+
+        last_day = calendar.monthrange(day.year, day.month)[1]
+        if day.day == 1:
+            rows.append(self._row(day, 'expense', 'ค่าเช่าที่', 'ค่าเช่าร้านรายเดือน', self.rent))
+        if day.day == 5:
+            # หน้าร้อน (มี.ค.-พ.ค.) เปิดแอร์มากขึ้น
+            hot = 1.4 if day.month in (3, 4, 5) else 1.0
+            rows.append(self._row(day, 'expense', 'ค่าน้ำ-ค่าไฟ', 'ค่าไฟ/ค่าน้ำประปา',
+                                  rng.randint(3000, 7000) * self.scale * hot))
+        if day.day == 10:
+            rows.append(self._row(day, 'expense', 'ค่าโฆษณา', 'โฆษณาออนไลน์', rng.randint(500, 3000)))
+        if day.day in (15, last_day):
+            rows.append(self._row(day, 'expense', 'ค่าแรงพนักงาน', 'เงินเดือนพนักงาน (ครึ่งเดือน)', self.wages / 2))
+        if day.day == 25 and day.month in (3, 6, 9, 12):
+            rows.append(self._row(day, 'expense', 'ภาษี', 'ภาษีรายไตรมาส', rng.randint(2000, 15000) * self.scale))
+
+        if rng.random() < 0.1:
+            rows.append(self._row(day, 'expense', 'ค่าขนส่ง', 'ค่าส่งของ', rng.randint(50, 400)))
+        if rng.random() < 0.02:
+            rows.append(self._row(day, 'expense', 'ค่าซ่อมบำรุง', 'ซ่อมอุปกรณ์', rng.randint(500, 8000)))
+        if rng.random() < 0.01:
+            rows.append(self._row(day, 'expense', 'อุปกรณ์ครัว', 'ซื้ออุปกรณ์ครัว', rng.randint(300, 5000)))
+        return rows
+
+    def generate(self, start, end, limit=None, progress=None):
+        """
+        สร้างธุรกรรมตั้งแต่ end ย้อนหลังไปถึง start (limit: หยุดเมื่อครบจำนวนแถว แม้ยังไม่ถึง start)
+        คืนค่าจำนวนแถวที่สร้าง
+        """
+        created = 0
+        batch = []
+        day = end
+        while day >= start and (limit is None or created + len(batch) < limit):
+            batch.extend(self.day_rows(day, end))
+            day -= timedelta(days=1)
+            if len(batch) >= self.batch_size:
+                created += self._flush(batch, limit, created)
+                batch = []
+                if progress:
+                    progress(self.user, created)
+        if batch:
+            created += self._flush(batch, limit, created)
+            if progress:
+                progress(self.user, created)
+
+        if created:
+            rollups.rebuild(user=self.user)
+            caching.bump_data_version(self.user.pk)
+        return created
+
+    def _flush(self, batch, limit, created):
+        if limit is not None:
+            batch = batch[:limit - created]
+        with transaction.atomic():
+            Transaction.objects.bulk_create(batch, batch_size=1000)
+        return len(batch)
+
+
+def daily_sales_for(size, years):
+    """
+    จำนวนบิลขายเฉลี่ยต่อวันที่ทำให้ได้ประมาณ size แถวใน years ปี
+    (รายจ่ายราว 8% ของแถวทั้งหมด และยอดขายปีก่อนๆ ต่ำกว่าตาม GROWTH_PER_YEAR)
+    """
+    return max(1, round(size / (years * 365) / 1.08 * (1 + GROWTH_PER_YEAR / 2)))
+
+
+def date_range(years, end=None):
+    end = end or timezone.localdate()
+    return end - timedelta(days=round(years * 365)) + timedelta(days=1), end
@@ -0,0 +1,80 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from .utils import make_transaction
+
+
+class TransactionAdminSearchTests(TestCase):
+    """ค้นหาใน admin: หัวข้อที่ขึ้นต้นด้วยคำค้น หรือชื่อผู้ใช้ตรงทั้งคำ"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('root', password='pw')
+        self.owner = User.objects.create_user('Somchai', password='pw')
+        for title in ('ค่าไฟ', 'ค่าน้ำ'):
+            make_transaction(self.owner, title, '300.00', day=date(2020, 5, 1))
+        self.client.force_login(self.admin)
+
+    def _titles(self, term):
+        response = self.client.get('/admin/ICANDEP/transaction/', {'q': term})
+        return sorted(row.title for row in response.context['cl'].result_list)
+
+    def test_search(self):
+        self.assertEqual(self._titles('ค่าไฟ'), ['ค่าไฟ'])
+        self.assertEqual(self._titles('Somchai'), ['ค่าน้ำ', 'ค่าไฟ'])
+        self.assertEqual(self._titles('somchai'), [])
+
+
+class TransactionAdminChangelistTests(TestCase):
+    """หน้ารายการธุรกรรมใน admin: ตัวกรองไม่โหลดผู้ใช้ทั้งหมด และจำนวน query ไม่โตตามข้อมูล"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('root', password='pw')
+        self.owner = User.objects.create_user('owner', password='pw')
+        make_transaction(self.owner, 'ปีก่อน', '10.00', day=date(2019, 12, 31))
+        make_transaction(self.owner, 'ต้นปี', '20.00', day=date(2020, 1, 1))
+        make_transaction(self.owner, 'กลางปี', '30.00', day=date(2020, 6, 15))
+        self.client.force_login(self.admin)
+
+    def _changelist(self, params=None):
+        response = self.client.get('/admin/ICANDEP/transaction/', params or {})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def _titles(self, params):
+        return sorted(row.title for row in self._changelist(params).context['cl'].result_list)
+
+    def _queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._changelist()
+        return len(queries)
+
+    def test_user_filter_is_an_input(self):
+        for n in range(5):
+            User.objects.create_user(f'sidebar-{n}', password='pw')
+        self.assertNotContains(self._changelist(), 'sidebar-')
+        self.assertEqual(self._titles({'username': 'owner'}), ['กลางปี', 'ต้นปี', 'ปีก่อน'])
+        self.assertEqual(self._titles({'username': 'sidebar-1'}), [])
+
+    def test_period_filter_uses_date_ranges(self):
+        self.assertEqual(self._titles({'period': '2020'}), ['กลางปี', 'ต้นปี'])
+        self.assertEqual(self._titles({'period': '2019-12'}), ['ปีก่อน'])
+        self.assertEqual(self._titles({'period': '2020-06'}), ['กลางปี'])
+        # เลือกปีแล้วจึงแสดงเดือนของปีนั้น
+        self.assertNotContains(self._changelist(), '?period=2020-06')
+        self.assertContains(self._changelist({'period': '2020'}), '?period=2020-06')
+        # ค่าที่ไม่ถูกต้องให้ admin แสดงหน้า error ตามปกติ (redirect ?e=1) ไม่ใช่ 500
+        response = self.client.get('/admin/ICANDEP/transaction/', {'period': '2020-13'})
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(CATALOG_VERSION_TIMEOUT=300)
+    def test_query_budget_does_not_grow_with_rows_or_users(self):
+        self._changelist()  # โหลด catalog เข้า cache ก่อนนับ
+        before = self._queries()
+        users = User.objects.bulk_create([User(username=f'budget-{n}') for n in range(30)])
+        for n, user in enumerate(users):
+            make_transaction(user, f'รายการ {n}', '1.00', day=date(2015 + n % 6, 1 + n % 12, 1))
+        self.assertEqual(self._queries(), before)
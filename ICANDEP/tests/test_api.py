@@ -0,0 +1,86 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..models import Category
+from .utils import make_transaction
+
+
+class ApiTests(TestCase):
+    """JSON API v1: ล็อกอินด้วย session, ข้อมูลเฉพาะของผู้ใช้, ETag/304 ตามเวอร์ชันข้อมูล"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('api', password='pw')
+        other = User.objects.create_user('other', password='pw')
+        self.food = Category.objects.create(name='อาหาร', transaction_type='expense')
+        for day in range(1, 6):
+            make_transaction(self.user, f'ข้าว {day}', '50.00', day=date(2020, 1, day), category=self.food)
+        make_transaction(self.user, 'ยอดขาย', '500.00', 'income', day=date(2020, 2, 1))
+        make_transaction(other, 'ของผู้อื่น', '999.00', day=date(2020, 1, 3))
+        self.client.force_login(self.user)
+
+    def test_requires_login(self):
+        self.client.logout()
+        for url in ('/app/api/v1/transactions/', '/app/api/v1/dashboard/', '/app/api/v1/reports/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 401)
+            self.assertIn('error', response.json())
+
+    def test_get_only(self):
+        self.assertEqual(self.client.post('/app/api/v1/transactions/').status_code, 405)
+
+    def test_transactions_pages(self):
+        response = self.client.get('/app/api/v1/transactions/', {'limit': 4})
+        self.assertEqual(set(response['Cache-Control'].split(', ')), {'private', 'no-cache'})
+        data = response.json()
+        self.assertEqual([row['title'] for row in data['results']], ['ยอดขาย', 'ข้าว 5', 'ข้าว 4', 'ข้าว 3'])
+        self.assertEqual(data['results'][1]['category__name'], 'อาหาร')
+        self.assertIsNone(data['previous'])
+        data = self.client.get('/app/api/v1/transactions/', {'limit': 4, 'after': data['next']}).json()
+        self.assertEqual([row['title'] for row in data['results']], ['ข้าว 2', 'ข้าว 1'])
+        self.assertIsNone(data['next'])
+        filtered = self.client.get('/app/api/v1/transactions/', {'type': 'income'}).json()['results']
+        self.assertEqual([row['title'] for row in filtered], ['ยอดขาย'])
+
+    def test_dashboard(self):
+        make_transaction(self.user, 'กาแฟวันนี้', '60.00', day=date.today())
+        data = self.client.get('/app/api/v1/dashboard/').json()
+        self.assertEqual(Decimal(data['expense']), Decimal('60.00'))
+        self.assertEqual(data['recent_transactions'][0]['title'], 'กาแฟวันนี้')
+
+    def test_reports(self):
+        response = self.client.get('/app/api/v1/reports/', {
+            'date_from': '2020-01-01', 'date_to': '2020-02-29', 'granularity': 'month', 'periods': 2,
+        })
+        data = response.json()
+        self.assertEqual((Decimal(data['income']), Decimal(data['expense'])), (Decimal('500.00'), Decimal('250.00')))
+        self.assertEqual(
+            [(period['start'], Decimal(period['expense'])) for period in data['series']['periods']],
+            [('2020-01-01', Decimal('250.00')), ('2020-02-01', Decimal('0'))],
+        )
+        response = self.client.get('/app/api/v1/reports/', {'granularity': 'decade'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_api_not_modified(self):
+        response = self.client.get('/app/api/v1/transactions/')
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/app/api/v1/transactions/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        make_transaction(self.user, 'ใหม่', '10.00')
+        self.assertEqual(self.client.get('/app/api/v1/transactions/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_not_modified_per_endpoint_and_user(self):
+        for url in ('/app/api/v1/dashboard/', '/app/api/v1/reports/?preset=this_year'):
+            etag = self.client.get(url)['ETag']
+            with self.assertNumQueries(3):
+                # session, ผู้ใช้, DataVersion: ไม่มี query รวมยอด
+                self.assertEqual(self.client.get(url, headers={'If-None-Match': etag}).status_code, 304)
+        etag = self.client.get('/app/api/v1/transactions/')['ETag']
+        # ETag ของ query string อื่นหรือผู้ใช้อื่นใช้ไม่ได้
+        response = self.client.get('/app/api/v1/transactions/?type=income', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.client.force_login(User.objects.get(username='other'))
+        self.assertEqual(self.client.get('/app/api/v1/transactions/', headers={'If-None-Match': etag}).status_code, 200)
@@ -0,0 +1,127 @@
+from datetime import date
+from decimal import Decimal
+
+from django.apps import apps
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.loader import MigrationLoader
+from django.test import TestCase
+
+from .. import archive, jobs, reporting
+from ..models import ArchivedTransaction, Category, Job, PeriodSummary, Transaction
+from .utils import make_transaction
+
+
+class ArchiveTests(TestCase):
+    """ปิดช่วงบัญชี: ยอดรวมต้องเท่าเดิม ไม่นับช่วงที่ปิดซ้ำสองครั้ง"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('archive', password='pw')
+        self.food = Category.objects.create(name='อาหาร', transaction_type='expense')
+        make_transaction(self.user, 'มกราคม', '100.00', category=self.food, day=date(2020, 1, 10))
+        make_transaction(self.user, 'รายรับมกราคม', '500.00', 'income', day=date(2020, 1, 20))
+        make_transaction(self.user, 'กุมภาพันธ์', '40.00', category=self.food, day=date(2020, 2, 10))
+        make_transaction(self.user, 'มีนาคม', '7.00', category=self.food, day=date(2020, 3, 5))
+
+    def _close(self, start, end):
+        with self.captureOnCommitCallbacks(execute=True):
+            return archive.close_period(start, end)
+
+    def _summaries(self):
+        return [
+            reporting.summarize(self.user),
+            reporting.summarize(self.user, date(2020, 1, 1), date(2020, 1, 31)),
+            reporting.summarize(self.user, date(2020, 1, 15), date(2020, 2, 29)),
+            reporting.summarize(self.user, date(2020, 2, 1)),
+            reporting.summarize(self.user, date_to=date(2020, 2, 29)),
+        ]
+
+    def _totals(self, summaries):
+        return [(summary.income, summary.expense) for summary in summaries]
+
+    def test_close_period_moves_rows_and_freezes_totals(self):
+        period = self._close(date(2020, 1, 1), date(2020, 2, 1))
+        self.assertEqual(period.transactions, 2)
+        self.assertEqual(archive.boundary(), date(2020, 2, 1))
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(ArchivedTransaction.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(
+            sorted(PeriodSummary.objects.filter(period=period).values_list('transaction_type', 'total', 'count')),
+            [('expense', Decimal('100.00'), 1), ('income', Decimal('500.00'), 1)],
+        )
+
+    def test_summaries_unchanged_by_closing(self):
+        before = self._totals(self._summaries())
+        self._close(date(2020, 1, 1), date(2020, 2, 1))
+        self.assertEqual(self._totals(self._summaries()), before)
+        self._close(date(2020, 2, 1), date(2020, 3, 1))
+        self.assertEqual(self._totals(self._summaries()), before)
+        all_time = reporting.summarize(self.user)
+        self.assertEqual((all_time.income, all_time.expense), (Decimal('500.00'), Decimal('147.00')))
+        self.assertEqual(
+            [(row['category__name'], row['total'], row['count']) for row in all_time.categories],
+            [('อาหาร', Decimal('147.00'), 3)],
+        )
+
+    def test_close_period_rejects_overlap_and_gaps(self):
+        self._close(date(2020, 1, 1), date(2020, 2, 1))
+        with self.assertRaises(archive.PeriodError):
+            archive.close_period(date(2020, 1, 1), date(2020, 3, 1))
+        with self.assertRaises(archive.PeriodError):
+            archive.close_period(date(2020, 3, 1), date(2020, 4, 1))
+
+
+class ReportExportTests(TestCase):
+    """ไฟล์ส่งออกของหน้ารายงานต้องรวมรายการของช่วงที่ปิดบัญชีแล้ว"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('export', password='pw')
+        self.category = Category.objects.create(name='อาหาร', transaction_type='expense')
+        for title, day in (('มกราคม', date(2020, 1, 10)), ('กุมภาพันธ์', date(2020, 2, 10))):
+            make_transaction(self.user, title, '10.00', day=day, category=self.category)
+        with self.captureOnCommitCallbacks(execute=True):
+            archive.close_period(date(2020, 1, 1), date(2020, 2, 1))
+
+    def _titles(self, content):
+        lines = content.decode('utf-8-sig').splitlines()[1:]
+        return [line.split(',')[3] for line in lines]
+
+    def test_view_export_includes_archived_rows(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/app/reports/export/', {'date_from': '2020-01-01', 'date_to': '2020-02-29'})
+        self.assertEqual(self._titles(b''.join(response.streaming_content)), ['มกราคม', 'กุมภาพันธ์'])
+
+    def test_job_export_includes_archived_rows(self):
+        job = Job.objects.create(user=self.user, kind='export_report', params={'format': 'csv'})
+        _, _, content = jobs.export_report(job)
+        self.assertEqual(self._titles(content), ['มกราคม', 'กุมภาพันธ์'])
+
+    def test_export_of_archived_period_only(self):
+        job = Job.objects.create(
+            user=self.user, kind='export_report', params={'date_from': '2020-01-01', 'date_to': '2020-01-31'},
+        )
+        _, _, content = jobs.export_report(job)
+        self.assertEqual(self._titles(content), ['มกราคม'])
+
+
+class ArchiveMigrationStateTests(TestCase):
+    """ตาราง archive สร้างด้วย SQL เอง แต่ state ของ migration ต้องตรงกับ models.py (รวม FK)"""
+
+    def test_state_matches_model(self):
+        state = MigrationLoader(connection).project_state().apps.get_model('ICANDEP', 'ArchivedTransaction')
+        model = apps.get_model('ICANDEP', 'ArchivedTransaction')
+
+        def fields(model):
+            return {field.name: field.deconstruct()[1:] for field in model._meta.local_fields}
+
+        self.assertEqual(fields(state).keys(), fields(model).keys())
+        for name, (path, args, kwargs) in fields(model).items():
+            state_path, state_args, state_kwargs = fields(state)[name]
+            kwargs.pop('to', None)
+            state_kwargs.pop('to', None)
+            self.assertEqual((state_path, state_args, state_kwargs), (path, args, kwargs), name)
+        self.assertEqual(state._meta.get_field('user').related_model._meta.label, 'auth.User')
+        self.assertEqual(state._meta.get_field('category').related_model._meta.label, 'ICANDEP.Category')
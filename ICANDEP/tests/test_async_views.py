@@ -0,0 +1,70 @@
+from datetime import date
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import AsyncClient, TransactionTestCase, override_settings
+from django.urls import include, path
+
+from .. import archive, async_views
+from .. import urls as app_urls
+from ..models import ArchivedTransaction, Category
+from .utils import make_transaction
+
+
+def _async_patterns():
+    """urlpatterns ของแอปที่ใช้หน้า dashboard/รายงานแบบ async (เหมือนตั้ง ASYNC_VIEWS=True)"""
+    replaced = {'dashboard': async_views.dashboard, 'reports': async_views.reports}
+    return [
+        path(str(pattern.pattern), replaced[pattern.name], name=pattern.name) if pattern.name in replaced else pattern
+        for pattern in app_urls.urlpatterns
+    ]
+
+
+class AsyncUrls:
+    urlpatterns = [path('app/', include((_async_patterns(), 'ICANDEP')))]
+
+
+@override_settings(ROOT_URLCONF=AsyncUrls)
+class AsyncReportsTests(TransactionTestCase):
+    """หน้า dashboard/รายงานแบบ async: query แยก thread จึงต้อง commit ข้อมูลจริง (TransactionTestCase)"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('async', password='pw')
+        self.category = Category.objects.create(name='เงินเดือน', transaction_type='income')
+        make_transaction(self.user, 'เก่า', '100.00', 'income', day=date(2020, 1, 15), category=self.category)
+        make_transaction(self.user, 'ใหม่', '50.00', 'income', day=date(2020, 2, 15), category=self.category)
+        self.client = AsyncClient()
+        self.client.force_login(self.user)
+
+    def tearDown(self):
+        # ตารางเก็บถาวรเป็น managed=False: flush ของ TransactionTestCase ไม่ล้างให้
+        ArchivedTransaction.objects.all().delete()
+
+    async def _get_reports(self):
+        # cache ว่าง: archive.boundary() ต้อง query ฐานข้อมูล (ต้องไม่เกิดใน event loop)
+        await cache.aclear()
+        return await self.client.get('/app/reports/', {'date_from': '2020-01-01', 'date_to': '2020-02-28'})
+
+    async def test_reports_with_cold_cache(self):
+        response = await self._get_reports()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['range_transactions']), 2)
+
+    async def test_dashboard_with_cold_cache(self):
+        await cache.aclear()
+        response = await self.client.get('/app/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        again = await self.client.get('/app/', headers={'If-None-Match': response['ETag']})
+        self.assertEqual(again.status_code, 304)
+
+    async def test_reports_span_archived_period(self):
+        await sync_to_async(archive.close_period)(date(2020, 1, 1), date(2020, 2, 1))
+        response = await self._get_reports()
+        self.assertEqual(response.status_code, 200)
+        titles = [row.title for row in response.context['range_transactions']]
+        self.assertEqual(titles, ['เก่า', 'ใหม่'])
+        self.assertEqual(response.context['range_income'], Decimal('150.00'))
@@ -0,0 +1,98 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from .. import caching
+from ..models import Category, Transaction
+from .utils import RollupAssertions, make_transaction
+
+URL = '/app/transactions/batch/'
+
+
+class BatchEntryTests(RollupAssertions, TestCase):
+    """หน้าบันทึกหลายรายการ: ข้ามแถวว่าง บันทึกแถวที่ถูกต้อง แถวที่ผิดแสดงกลับมา และ DailySummary ตรงเสมอ"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('batch', password='pw')
+        self.food = Category.objects.create(name='อาหาร', transaction_type='expense')
+        self.salary = Category.objects.create(name='เงินเดือน', transaction_type='income')
+        self.client.force_login(self.user)
+
+    def _post(self, rows, total=None):
+        """rows: dict ของแต่ละแถว (ค่าที่ไม่ระบุเป็นค่าเริ่มต้นของแถวว่าง)"""
+        data = {'form-TOTAL_FORMS': str(total or len(rows)), 'form-INITIAL_FORMS': '0'}
+        blank = {'transaction_type': 'expense', 'category': '', 'title': '', 'amount': '', 'description': '',
+                 'date': timezone.localdate().isoformat()}
+        for index, row in enumerate(rows):
+            for name, value in {**blank, **row}.items():
+                data[f'form-{index}-{name}'] = value
+        return self.client.post(URL, data)
+
+    def _row(self, title, amount, category, day, transaction_type='expense'):
+        return {'title': title, 'amount': amount, 'category': str(category.pk), 'date': day.isoformat(),
+                'transaction_type': transaction_type}
+
+    def test_get(self):
+        response = self.client.get(URL)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['formset'].forms), 10)
+
+    def test_saves_filled_rows_and_skips_blank_rows(self):
+        make_transaction(self.user, 'มีอยู่แล้ว', '5.00', category=self.food, day=date(2020, 1, 2))
+        version = caching.get_data_version(self.user).version
+        response = self._post([
+            self._row('ข้าวเช้า', '45.00', self.food, date(2020, 1, 2)),
+            {},
+            self._row('เงินเดือน', '1000.00', self.salary, date(2020, 1, 31), 'income'),
+            {},
+            self._row('ข้าวเย็น', '60.50', self.food, date(2020, 1, 2)),
+        ])
+        self.assertRedirects(response, '/app/transactions/', fetch_redirect_response=False)
+        self.assertEqual(
+            sorted(Transaction.objects.filter(user=self.user).values_list('title', flat=True)),
+            ['ข้าวเช้า', 'ข้าวเย็น', 'มีอยู่แล้ว', 'เงินเดือน'],
+        )
+        # bulk_create ไม่ส่ง signal: DailySummary ต้องถูกคำนวณใหม่ (รวมแถวเดิมของวันเดียวกัน)
+        self.assertRollupsMatch(self.user)
+        self.assertEqual(caching.get_data_version(self.user).version, version + 1)
+
+    def test_invalid_rows_are_returned_for_correction(self):
+        response = self._post([
+            self._row('ข้าว', '45.00', self.food, date(2020, 1, 2)),
+            self._row('ประเภทไม่ตรง', '10.00', self.salary, date(2020, 1, 2)),
+            {},
+            self._row('ไม่มีจำนวนเงิน', '', self.food, date(2020, 1, 3)),
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(Transaction.objects.filter(user=self.user).values_list('title', flat=True)), ['ข้าว'])
+        self.assertRollupsMatch(self.user)
+        formset = response.context['formset']
+        self.assertEqual([form['title'].value() for form in formset.forms], ['ประเภทไม่ตรง', 'ไม่มีจำนวนเงิน'])
+        self.assertIn('category', formset.forms[0].errors)
+        self.assertIn('amount', formset.forms[1].errors)
+
+    @override_settings(CATALOG_VERSION_TIMEOUT=300)
+    def test_query_count_does_not_grow_with_rows(self):
+        def queries(count):
+            rows = [self._row(f'รายการ {n}', '1.00', self.food, date(2020, 2, 1 + n % 28)) for n in range(count)]
+            with CaptureQueriesContext(connection) as captured:
+                self._post(rows)
+            return len(captured)
+
+        queries(1)  # โหลด catalog เข้า cache ก่อนนับ
+        self.assertEqual(queries(40), queries(2))
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 43)
+        self.assertRollupsMatch(self.user)
+
+    def test_broken_management_form_saves_nothing(self):
+        response = self.client.post(URL, {'form-0-title': 'ข้าว', 'form-0-amount': '1.00'})
+        self.assertEqual(response.status_code, 200)
+        response = self._post([self._row('ข้าว', '1.00', self.food, date(2020, 1, 1))], total=101)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
@@ -0,0 +1,36 @@
+import io
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from .. import benchmarks
+from ..models import Transaction
+
+
+class BenchmarkTests(TestCase):
+    """ชุดวัดผลสร้างข้อมูลในฐานข้อมูล: รันได้เฉพาะเมื่อเปิดไว้ และผู้ใช้ที่สร้างไม่ใช่ superuser"""
+
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(BENCHMARKS_ENABLED=False)
+    def test_refuses_without_setting(self):
+        with self.assertRaises(CommandError):
+            call_command('run_benchmarks', sizes='20', repeat=1, output='/dev/null', stdout=io.StringIO())
+        with self.assertRaises(benchmarks.BenchmarksDisabled):
+            benchmarks.run([20], repeat=1)
+        self.assertFalse(Transaction.objects.exists())
+
+    @override_settings(BENCHMARKS_ENABLED=True)
+    def test_runs_with_ordinary_user(self):
+        report = benchmarks.run([20], repeat=1, scenarios={'dashboard', 'admin_transactions'}, years=0.1)
+        self.assertEqual([(row['scenario'], row['status']) for row in report['results']], [
+            ('dashboard', 200), ('admin_transactions', 200),
+        ])
+        user, created = benchmarks.bench_user(20)
+        self.assertEqual(created, 0)
+        self.assertFalse(user.is_superuser)
+        self.assertFalse(user.has_usable_password())
+        self.assertTrue(user.has_perm('ICANDEP.view_transaction'))
+        self.assertFalse(user.has_perm('ICANDEP.change_transaction'))
@@ -0,0 +1,129 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from .. import bulkactions, caching
+from ..models import Category, DailySummary, Transaction
+from .utils import RollupAssertions, make_transaction
+
+
+class BulkDeleteTests(TestCase):
+    """ลบหลายรายการด้วย DELETE เดียว: ลบเฉพาะแถวใน queryset และยอดรวมรายวันถูกคำนวณใหม่"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('bulk', password='pw')
+        self.other = User.objects.create_user('other', password='pw')
+        for user, title in ((self.user, 'ลบ'), (self.user, 'เก็บ'), (self.other, 'ลบ')):
+            make_transaction(user, title, '20.00', day=date(2020, 4, 1))
+
+    def test_delete_only_selected_rows(self):
+        version = caching.get_data_version(self.user).version
+        selected = Transaction.objects.filter(user=self.user, title='ลบ').order_by('-date')
+        deleted = bulkactions.delete(self.user, selected)
+        self.assertEqual(deleted, 1)
+        self.assertEqual(
+            sorted(Transaction.objects.values_list('user__username', 'title')), [('bulk', 'เก็บ'), ('other', 'ลบ')],
+        )
+        self.assertEqual(DailySummary.objects.get(user=self.user).total, Decimal('20.00'))
+        self.assertEqual(DailySummary.objects.get(user=self.other).total, Decimal('20.00'))
+        self.assertGreater(caching.get_data_version(self.user).version, version)
+
+    def test_delete_all_matching_search(self):
+        make_transaction(self.user, 'กาแฟเย็น', '45.00', day=date(2020, 4, 2))
+        self.client.force_login(self.user)
+        self.client.post('/app/transactions/bulk/?q=กาแฟ', {'action': 'delete', 'select_all': 'on'})
+        titles = Transaction.objects.filter(user=self.user).values_list('title', flat=True)
+        self.assertEqual(sorted(titles), ['ลบ', 'เก็บ'])
+        self.assertFalse(DailySummary.objects.filter(user=self.user, day=date(2020, 4, 2)).exists())
+
+
+class BulkEditTests(RollupAssertions, TestCase):
+    """แก้หลายรายการ: แก้เฉพาะแถวที่ประเภทสอดคล้องกับหมวดหมู่ และ DailySummary ตรงเสมอ"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('bulk-edit', password='pw')
+        self.food = Category.objects.create(name='อาหาร', transaction_type='expense')
+        self.travel = Category.objects.create(name='เดินทาง', transaction_type='expense')
+        self.salary = Category.objects.create(name='เงินเดือน', transaction_type='income')
+
+    def test_bulk_actions(self):
+        rows = [
+            make_transaction(self.user, f'รายการ {n}', '10.00', category=self.food, day=date(2020, 1, n))
+            for n in range(1, 6)
+        ]
+        selected = Transaction.objects.filter(id__in=[row.pk for row in rows[:3]])
+        self.assertEqual(bulkactions.set_category(self.user, selected, self.travel), 3)
+        self.assertRollupsMatch(self.user)
+        # หมวดหมู่รายรับไม่ตรงกับประเภท: ไม่มีแถวไหนถูกแก้
+        self.assertEqual(bulkactions.set_category(self.user, selected, self.salary), 0)
+        self.assertEqual(bulkactions.set_date(self.user, selected, date(2020, 2, 1)), 3)
+        self.assertRollupsMatch(self.user)
+        self.assertEqual(bulkactions.set_type(self.user, selected, 'income', self.salary), 3)
+        self.assertRollupsMatch(self.user)
+        self.assertEqual(bulkactions.delete(self.user, Transaction.objects.filter(pk=rows[4].pk)), 1)
+        self.assertRollupsMatch(self.user)
+
+    def _mixed(self):
+        """รายจ่าย 2 รายการ + รายรับ 1 รายการ คืนค่า (queryset ของทั้งสาม, แถวรายรับ)"""
+        make_transaction(self.user, 'ข้าว', '50.00', category=self.food, day=date(2020, 3, 1))
+        make_transaction(self.user, 'รถ', '30.00', category=self.travel, day=date(2020, 3, 2))
+        income = make_transaction(self.user, 'โบนัส', '900.00', 'income', category=self.salary, day=date(2020, 3, 2))
+        return Transaction.objects.filter(user=self.user), income
+
+    def _categories(self):
+        return dict(Transaction.objects.filter(user=self.user).values_list('title', 'category__name'))
+
+    def test_set_category_skips_other_type(self):
+        rows, income = self._mixed()
+        version = caching.get_data_version(self.user).version
+        self.assertEqual(bulkactions.set_category(self.user, rows, self.travel), 2)
+        self.assertEqual(self._categories(), {'ข้าว': 'เดินทาง', 'รถ': 'เดินทาง', 'โบนัส': 'เงินเดือน'})
+        self.assertRollupsMatch(self.user)
+        self.assertEqual(caching.get_data_version(self.user).version, version + 1)
+        # ไม่มีแถวไหนตรงประเภท: ไม่แก้และไม่เพิ่มเวอร์ชัน
+        self.assertEqual(bulkactions.set_category(self.user, rows.exclude(pk=income.pk), self.salary), 0)
+        self.assertEqual(caching.get_data_version(self.user).version, version + 1)
+
+    def test_set_type_skips_rows_already_of_that_type(self):
+        rows, income = self._mixed()
+        self.assertEqual(bulkactions.set_type(self.user, rows, 'income', self.salary), 2)
+        self.assertEqual(
+            set(Transaction.objects.filter(user=self.user).values_list('transaction_type', flat=True)), {'income'},
+        )
+        self.assertEqual(self._categories(), {'ข้าว': 'เงินเดือน', 'รถ': 'เงินเดือน', 'โบนัส': 'เงินเดือน'})
+        income.refresh_from_db()
+        self.assertEqual(income.amount, Decimal('900.00'))
+        self.assertRollupsMatch(self.user)
+        # ไม่ระบุหมวดหมู่: หมวดหมู่เดิมเป็นของอีกประเภทจึงถูกล้าง
+        self.assertEqual(bulkactions.set_type(self.user, rows.filter(title='รถ'), 'expense'), 1)
+        self.assertEqual(self._categories()['รถ'], None)
+        self.assertRollupsMatch(self.user)
+
+    def test_set_type_rejects_category_of_other_type(self):
+        rows, _ = self._mixed()
+        with self.assertRaises(ValueError):
+            bulkactions.set_type(self.user, rows, 'income', self.food)
+        self.assertEqual(self._categories(), {'ข้าว': 'อาหาร', 'รถ': 'เดินทาง', 'โบนัส': 'เงินเดือน'})
+
+    def test_view_reports_skipped_rows(self):
+        rows, income = self._mixed()
+        self.client.force_login(self.user)
+        response = self.client.post('/app/transactions/bulk/', {
+            'action': 'category', 'category': self.travel.pk, 'ids': list(rows.values_list('pk', flat=True)),
+        }, follow=True)
+        self.assertEqual(
+            [str(message) for message in response.context['messages']],
+            ['เปลี่ยนหมวดหมู่ 2 รายการเป็น "เดินทาง"',
+             'ข้าม 1 รายการ (ประเภทไม่ตรงกับหมวดหมู่/เป็นประเภทนั้นอยู่แล้ว หรือไม่พบรายการ)'],
+        )
+        self.assertEqual(self._categories()['โบนัส'], 'เงินเดือน')
+        # ประเภทกับหมวดหมู่ไม่ตรงกันถูกปฏิเสธที่ฟอร์ม (ไม่มีแถวไหนถูกแก้)
+        self.client.post('/app/transactions/bulk/', {
+            'action': 'type', 'transaction_type': 'income', 'category': self.food.pk, 'ids': [income.pk],
+        })
+        self.assertEqual(self._categories(), {'ข้าว': 'เดินทาง', 'รถ': 'เดินทาง', 'โบนัส': 'เงินเดือน'})
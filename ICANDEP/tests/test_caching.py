@@ -0,0 +1,48 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from .. import caching
+from ..models import Category
+from .utils import make_transaction
+
+
+class DashboardCacheTests(TestCase):
+    """cache ของ dashboard ต้องไม่แสดงชื่อหมวดหมู่เดิมหลังแก้หมวดหมู่"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('dashboard', password='pw')
+        self.category = Category.objects.create(name='ชื่อเดิม', transaction_type='expense')
+        make_transaction(self.user, 'กาแฟ', '60.00', day=date.today(), category=self.category)
+        self.client.force_login(self.user)
+
+    def _category_names(self):
+        response = self.client.get('/app/api/v1/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        return [row['category__name'] for row in response.json()['recent_transactions']]
+
+    def test_category_rename_refreshes_dashboard(self):
+        self.assertEqual(self._category_names(), ['ชื่อเดิม'])
+        self.category.name = 'ชื่อใหม่'
+        self.category.save()
+        self.assertEqual(self._category_names(), ['ชื่อใหม่'])
+        response = self.client.get('/app/')
+        self.assertContains(response, 'ชื่อใหม่')
+        self.assertNotContains(response, 'ชื่อเดิม')
+
+    def test_cache_hit_until_data_changes(self):
+        today = date.today()
+        month_start = today.replace(day=1)
+        caching.reset_cache_stats()
+        first = caching.dashboard_payload(self.user, month_start, today)
+        self.assertEqual(caching.dashboard_payload(self.user, month_start, today), first)
+        self.assertEqual((caching.cache_stats()['hits'], caching.cache_stats()['misses']), (1, 1))
+        # เพิ่มรายการแล้ว DataVersion เปลี่ยน: ต้องคำนวณใหม่ ไม่ใช้ payload เดิม
+        make_transaction(self.user, 'ข้าว', '40.00', day=today, category=self.category)
+        payload = caching.dashboard_payload(self.user, month_start, today)
+        self.assertEqual(payload['monthly_expense'], Decimal('100.00'))
+        self.assertEqual(caching.cache_stats()['misses'], 2)
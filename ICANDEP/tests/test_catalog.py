@@ -0,0 +1,55 @@
+from django.core.cache import cache
+from django.db.models import F
+from django.test import TestCase, override_settings
+
+from .. import catalog
+from ..forms import CategoryForm
+from ..models import CatalogVersion, Category
+
+
+class CatalogTests(TestCase):
+    """catalog หมวดหมู่: เวอร์ชันอยู่ในฐานข้อมูล worker อื่นจึงเห็นการเปลี่ยนแปลงแม้ cache แยกกัน"""
+
+    def setUp(self):
+        cache.clear()
+        self.food = Category.objects.create(name='อาหาร', transaction_type='expense')
+
+    def _other_worker_adds(self, name):
+        # worker อื่นเพิ่มหมวดหมู่: เพิ่มเลขเวอร์ชันในฐานข้อมูล แต่ไม่ได้แตะ cache/catalog ของ process นี้
+        Category.objects.bulk_create([Category(name=name, transaction_type='expense')])
+        CatalogVersion.objects.update(version=F('version') + 1)
+
+    def test_signal_invalidates(self):
+        version = catalog.current_version()
+        self.assertIsNotNone(catalog.get_catalog().find('อาหาร', 'expense'))
+        travel = Category.objects.create(name='เดินทาง', transaction_type='expense')
+        self.assertGreater(catalog.current_version(), version)
+        self.assertEqual(catalog.get_catalog().find('เดินทาง', 'expense').pk, travel.pk)
+        travel.delete()
+        self.assertIsNone(catalog.get_catalog().find('เดินทาง', 'expense'))
+
+    def test_other_worker_change_seen_after_timeout(self):
+        with override_settings(CATALOG_VERSION_TIMEOUT=60):
+            catalog.get_catalog()
+            self._other_worker_adds('ของใช้')
+            # ภายในอายุของเลขเวอร์ชันที่ cache ไว้ ยังใช้ catalog เดิม (ไม่ query)
+            with self.assertNumQueries(0):
+                self.assertIsNone(catalog.get_catalog().find('ของใช้', 'expense'))
+        with override_settings(CATALOG_VERSION_TIMEOUT=0):
+            cache.delete(catalog.VERSION_KEY)
+            self.assertIsNotNone(catalog.get_catalog().find('ของใช้', 'expense'))
+            self._other_worker_adds('ค่าไฟ')
+            self.assertIsNotNone(catalog.get_catalog().find('ค่าไฟ', 'expense'))
+
+    def test_duplicate_name_is_form_error(self):
+        catalog.get_catalog()
+        self._other_worker_adds('ของใช้')
+        form = CategoryForm(data={'name': 'ของใช้', 'transaction_type': 'expense', 'is_active': True})
+        self.assertFalse(form.is_valid())
+        self.assertIn('มีหมวดหมู่ชื่อ', form.non_field_errors()[0])
+        # ชื่อเดิมของหมวดหมู่ที่กำลังแก้ไขไม่นับว่าซ้ำ
+        form = CategoryForm(
+            data={'name': 'อาหาร', 'transaction_type': 'expense', 'description': 'ใหม่', 'is_active': True},
+            instance=self.food,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
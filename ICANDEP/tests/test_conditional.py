@@ -0,0 +1,65 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import Client, TestCase
+
+from ..models import Category
+from .utils import make_transaction
+
+
+class ConditionalPageTests(TestCase):
+    """ETag ของหน้า HTML: 304 เมื่อไม่มีอะไรเปลี่ยน และต้องไม่ถูกใช้ซ้ำข้าม session"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('etag', password='pw')
+
+    def _login(self):
+        self.client.post('/app/login/', {'username': 'etag', 'password': 'pw'})
+        # หน้าแรกหลัง login แสดงข้อความต้อนรับ (ไม่ใส่ ETag)
+        self.client.get('/app/')
+
+    def _etag(self, url='/app/'):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def test_not_modified(self):
+        self._login()
+        etag = self._etag()
+        self.assertEqual(self.client.get('/app/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_etag_changes_when_data_changes(self):
+        self._login()
+        etag = self._etag('/app/transactions/')
+        self.assertEqual(self.client.get('/app/transactions/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        make_transaction(self.user, 'ใหม่', '10.00')
+        self.assertNotEqual(self._etag('/app/transactions/'), etag)
+        self.assertEqual(self.client.get('/app/transactions/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_changes_when_category_changes(self):
+        self._login()
+        etag = self._etag()
+        Category.objects.create(name='ใหม่', transaction_type='income')
+        self.assertEqual(self.client.get('/app/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_depends_on_query_string(self):
+        self._login()
+        etag = self._etag('/app/reports/?preset=this_year')
+        self.assertEqual(self.client.get('/app/reports/?preset=today', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_changes_after_login_again(self):
+        self._login()
+        etag = self._etag()
+        self.client.get('/app/logout/')
+        self._login()
+        # หน้าเดิมมี CSRF token ของ session ก่อน: ต้อง render ใหม่
+        self.assertEqual(self.client.get('/app/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_first_revalidation_without_csrf_cookie(self):
+        # client ใหม่ที่ยังไม่มี CSRF cookie: response แรกต้องให้ ETag ที่ใช้ตรวจซ้ำได้ทันที
+        client = Client()
+        client.force_login(self.user)
+        response = client.get('/app/transactions/')
+        self.assertIn('csrftoken', response.cookies)
+        revalidated = client.get('/app/transactions/', headers={'If-None-Match': response['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
@@ -0,0 +1,68 @@
+import csv
+import io
+import re
+import zipfile
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from .. import exports
+from ..models import Category
+from .utils import make_transaction
+
+
+class ExportTests(TestCase):
+    """ไฟล์ CSV/XLSX ที่ส่งออกจากหน้ารายการ: เนื้อหาตรงกับข้อมูล และข้อความจากผู้ใช้ถูกทำให้ปลอดภัย"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('exports', password='pw')
+        other = User.objects.create_user('other', password='pw')
+        food = Category.objects.create(name='อาหาร', transaction_type='expense')
+        make_transaction(self.user, 'ข้าวมันไก่', '45.50', day=date(2020, 3, 2), category=food)
+        make_transaction(self.user, '=HYPERLINK("http://x")', '10.00', 'income', day=date(2020, 3, 1))
+        make_transaction(self.user, 'มี\x07เสียง\x0bกระดิ่ง', '1.00', day=date(2020, 2, 29))
+        make_transaction(other, 'ของผู้อื่น', '99.00', day=date(2020, 3, 1))
+        self.client.force_login(self.user)
+
+    def _download(self, file_format):
+        response = self.client.get('/app/transactions/export/', {'format': file_format})
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content)
+
+    def test_csv_content(self):
+        response, content = self._download('csv')
+        self.assertEqual(response['Content-Type'], exports.CSV_CONTENT_TYPE)
+        self.assertIn('.csv"', response['Content-Disposition'])
+        rows = list(csv.reader(io.StringIO(content.decode('utf-8-sig'))))
+        self.assertEqual(rows, [
+            exports.EXPORT_HEADER,
+            ['2020-03-02', 'รายจ่าย', 'อาหาร', 'ข้าวมันไก่', '', '45.50'],
+            ['2020-03-01', 'รายรับ', '', '\'=HYPERLINK("http://x")', '', '10.00'],
+            ['2020-02-29', 'รายจ่าย', '', 'มี\x07เสียง\x0bกระดิ่ง', '', '1.00'],
+        ])
+
+    def test_xlsx_content(self):
+        response, content = self._download('xlsx')
+        self.assertEqual(response['Content-Type'], exports.XLSX_CONTENT_TYPE)
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertIn('xl/workbook.xml', archive.namelist())
+            sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertIsNone(re.search('[\x00-\x08\x0b\x0c\x0e-\x1f]', sheet))
+        rows = re.findall(r'<row>(.*?)</row>', sheet)
+        self.assertEqual(len(rows), 4)
+        cells = [re.findall(r'<t xml:space="preserve">(.*?)</t>|<v>(.*?)</v>', row) for row in rows]
+        self.assertEqual([text or number for text, number in cells[1]], [
+            '2020-03-02', 'รายจ่าย', 'อาหาร', 'ข้าวมันไก่', '', '45.50',
+        ])
+        self.assertEqual(cells[2][3][0], '\'=HYPERLINK("http://x")')
+        self.assertEqual(cells[3][3][0], 'มีเสียงกระดิ่ง')
+
+    def test_safe_text(self):
+        for value in ('=1+1', '+1', '-2', '@SUM(A1)', '\tx', '\rx'):
+            self.assertEqual(exports.safe_text(value), "'" + value)
+        for value in ('', 'ปกติ', "'=1", 'a=b'):
+            self.assertEqual(exports.safe_text(value), value)
@@ -0,0 +1,110 @@
+import csv
+import io
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from .. import caching
+from ..importers import TransactionImporter
+from ..models import Category, DailySummary, Transaction
+from .utils import RollupAssertions, make_transaction
+
+
+class ImporterTests(RollupAssertions, TestCase):
+    """นำเข้า CSV: จำนวนที่รายงานตรงกับแถวที่บันทึกจริง และยอดรวมรายวันตรงกับตารางธุรกรรม"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('rollup', password='pw')
+        self.food = Category.objects.create(name='อาหาร', transaction_type='expense')
+        self.salary = Category.objects.create(name='เงินเดือน', transaction_type='income')
+
+    def test_import(self):
+        make_transaction(self.user, 'มีอยู่แล้ว', '5.00', category=self.food, day=date(2020, 1, 1))
+        stream = io.StringIO(
+            'date,amount,type,category,title\n'
+            '2020-01-01,100,expense,อาหาร,มื้อเย็น\n'
+            '2020-01-01,100,expense,อาหาร,มื้อเย็น\n'
+            '02/01/2020,2000,income,เงินเดือน,เงินเดือน\n'
+            '2020-01-03,abc,expense,อาหาร,ผิด\n'
+        )
+        result = TransactionImporter(self.user).run(stream)
+        self.assertEqual((result.inserted, len(result.errors)), (3, 1))
+        self.assertRollupsMatch(self.user)
+        # นำเข้าไฟล์เดิมซ้ำ: ไม่มีรายการใหม่ ยอดรวมไม่เปลี่ยน
+        stream.seek(0)
+        self.assertEqual(TransactionImporter(self.user).run(stream).inserted, 0)
+        self.assertRollupsMatch(self.user)
+
+    def test_counts_match_rows_written(self):
+        header = 'date,amount,type,title\n'
+        first = '2020-01-01,10,expense,a\n2020-01-01,20,expense,b\n'
+        self.assertEqual(TransactionImporter(self.user).run(io.StringIO(header + first)).inserted, 2)
+        # ไฟล์ที่สองมีสองแถวแรกซ้ำ: นับเป็นรายการซ้ำ ไม่ใช่รายการใหม่
+        result = TransactionImporter(self.user, batch_size=2).run(
+            io.StringIO(header + first + '2020-01-02,30,income,c\n')
+        )
+        self.assertEqual((result.processed, result.inserted, result.duplicates), (3, 1, 2))
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 3)
+        self.assertRollupsMatch(self.user)
+
+    def test_invalid_default_type(self):
+        with self.assertRaises(ValueError):
+            TransactionImporter(self.user, default_type='bogus')
+        self.client.force_login(self.user)
+        upload = io.BytesIO(b'date,amount\n2020-01-01,10\n')
+        upload.name = 'rows.csv'
+        response = self.client.post('/app/transactions/import/', {'file': upload, 'default_type': 'bogus'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].has_error('default_type'))
+        self.assertFalse(Transaction.objects.filter(user=self.user).exists())
+
+    def test_view_imports_with_default_type(self):
+        self.client.force_login(self.user)
+        upload = io.BytesIO('date,amount,title\n2020-01-01,10,ค่าส่ง\n'.encode())
+        upload.name = 'rows.csv'
+        response = self.client.post('/app/transactions/import/', {'file': upload, 'default_type': 'expense'})
+        self.assertEqual(response.context['result'].inserted, 1)
+        self.assertEqual(Transaction.objects.get(user=self.user).transaction_type, 'expense')
+
+    def test_missing_file(self):
+        self.client.force_login(self.user)
+        response = self.client.post('/app/transactions/import/', {'default_type': 'income'})
+        self.assertContains(response, 'กรุณาเลือกไฟล์ CSV')
+
+
+class ImportFailureTests(TestCase):
+    """ไฟล์เสียกลางทาง: batch ที่บันทึกไปแล้วต้องถูกนับในยอดรวม และ DataVersion ต้องเปลี่ยน"""
+
+    # แถวที่ 3 ยาวเกิน csv.field_size_limit() จึง raise csv.Error หลังบันทึก 2 แถวแรกแล้ว
+    BROKEN_CSV = (
+        'date,amount,type,title\n'
+        '2020-03-01,100,income,a\n'
+        '2020-03-02,50,expense,b\n'
+        f'2020-03-03,10,expense,"{"x" * (csv.field_size_limit() + 1)}"\n'
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('importer', password='pw')
+
+    def test_rollups_rebuilt_when_file_breaks_midway(self):
+        version = caching.get_data_version(self.user).version
+        importer = TransactionImporter(self.user, batch_size=1)
+        with self.assertRaises(csv.Error):
+            importer.run(io.StringIO(self.BROKEN_CSV))
+        self.assertEqual(importer.result.inserted, 2)
+        totals = {row.transaction_type: row.total for row in DailySummary.objects.filter(user=self.user)}
+        self.assertEqual(totals, {'income': Decimal('100.00'), 'expense': Decimal('50.00')})
+        self.assertGreater(caching.get_data_version(self.user).version, version)
+
+    def test_view_reports_csv_error(self):
+        self.client.force_login(self.user)
+        upload = io.BytesIO(self.BROKEN_CSV.encode())
+        upload.name = 'broken.csv'
+        response = self.client.post('/app/transactions/import/', {'file': upload}, follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'ไม่สามารถนำเข้าไฟล์ได้')
@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase, override_settings
+
+from ..instrumentation import histograms
+
+
+@override_settings(DEBUG=False, PERF_SERVER_TIMING='staff')
+class ServerTimingTests(TestCase):
+    """Server-Timing ส่งเฉพาะ staff เป็นค่าเริ่มต้น แต่ histogram บันทึกทุก request"""
+
+    def setUp(self):
+        cache.clear()
+        histograms.reset()
+        self.user = User.objects.create_user('timing', password='pw')
+        self.staff = User.objects.create_user('timing-staff', password='pw', is_staff=True)
+
+    def _dashboard_count(self):
+        rows = {row['view']: row['count'] for row in histograms.snapshot()['views']}
+        return rows.get('ICANDEP:dashboard', 0)
+
+    def test_hidden_from_ordinary_users(self):
+        self.assertNotIn('Server-Timing', self.client.get('/app/login/'))
+        self.client.force_login(self.user)
+        response = self.client.get('/app/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(self._dashboard_count(), 1)
+
+    def test_sent_to_staff(self):
+        self.client.force_login(self.staff)
+        response = self.client.get('/app/')
+        self.assertRegex(response['Server-Timing'], r'^db;desc="\d+ queries";dur=[\d.]+, tpl;')
+        self.assertEqual(self._dashboard_count(), 1)
+
+    def test_debug_sends_to_everyone(self):
+        self.client.force_login(self.user)
+        with self.settings(DEBUG=True):
+            self.assertIn('Server-Timing', self.client.get('/app/'))
+
+    def test_modes(self):
+        self.client.force_login(self.user)
+        with self.settings(PERF_SERVER_TIMING='all'):
+            self.assertIn('Server-Timing', self.client.get('/app/'))
+        self.client.force_login(self.staff)
+        with self.settings(PERF_SERVER_TIMING='off', DEBUG=True):
+            self.assertNotIn('Server-Timing', self.client.get('/app/'))
+        self.assertEqual(self._dashboard_count(), 2)
+
+    async def test_async_request_checks_staff(self):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        self.assertNotIn('Server-Timing', await client.get('/app/'))
+        await client.aforce_login(self.staff)
+        self.assertIn('Server-Timing', await client.get('/app/'))
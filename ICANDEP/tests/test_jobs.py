@@ -0,0 +1,95 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .. import jobs
+from ..models import Job
+from .utils import make_transaction
+
+
+class JobQueueTests(TestCase):
+    """คิวงานในฐานข้อมูล: หยิบงานตามลำดับครั้งละตัว, คืนงานค้างเข้าคิว, ล้มเหลวเมื่อครบจำนวนครั้ง"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('jobs', password='pw')
+        for day in range(1, 4):
+            make_transaction(self.user, f'รายการ {day}', '10.00', day=date(2020, 1, day))
+
+    def _enqueue_export(self, **params):
+        return jobs.enqueue('export_report', user=self.user, format='csv', **params)
+
+    def test_enqueue_reuses_pending_job(self):
+        first = self._enqueue_export(date_from='2020-01-01')
+        self.assertEqual(self._enqueue_export(date_from='2020-01-01').pk, first.pk)
+        self.assertNotEqual(self._enqueue_export(date_from='2020-01-02').pk, first.pk)
+        with self.assertRaises(ValueError):
+            jobs.enqueue('unknown')
+
+    def test_claim_oldest_once(self):
+        first = self._enqueue_export(date_from='2020-01-01')
+        second = self._enqueue_export(date_from='2020-01-02')
+        claimed = jobs.claim('worker-a')
+        self.assertEqual((claimed.pk, claimed.status, claimed.attempts), (first.pk, Job.STATUS_RUNNING, 1))
+        self.assertEqual(jobs.claim('worker-b').pk, second.pk)
+        self.assertIsNone(jobs.claim('worker-c'))
+        self.assertEqual(Job.objects.get(pk=first.pk).worker, 'worker-a')
+
+    def test_run_stores_result(self):
+        self._enqueue_export()
+        job = jobs.claim('worker')
+        self.assertTrue(jobs.run(job))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_DONE)
+        self.assertEqual(job.result_size, len(job.result))
+        self.assertIn('รายการ 3', bytes(job.result).decode('utf-8-sig'))
+        row = jobs.recent_jobs(self.user)[0]
+        self.assertEqual(row['download_url'], f'/app/jobs/{job.pk}/download/')
+        self.assertNotIn('result', row)
+
+    def test_unexpected_error_keeps_traceback(self):
+        self._enqueue_export()
+        job = jobs.claim('worker')
+        with mock.patch.dict(jobs.HANDLERS, {'export_report': mock.Mock(side_effect=RuntimeError('พัง'))}):
+            self.assertFalse(jobs.run(job))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertIn('Traceback', job.error)
+        self.assertEqual(jobs.recent_jobs(self.user)[0]['error'], 'RuntimeError: พัง')
+
+    @override_settings(JOB_RESULT_MAX_BYTES=100)
+    def test_result_too_large_fails_cleanly(self):
+        for day in range(1, 29):
+            make_transaction(self.user, 'รายการยาว ' * 5, '10.00', day=date(2020, 2, day))
+        self._enqueue_export()
+        job = jobs.claim('worker')
+        self.assertFalse(jobs.run(job))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertIsNone(job.result)
+        self.assertNotIn('Traceback', job.error)
+        self.assertIn('ช่วงวันที่ให้สั้นลง', jobs.recent_jobs(self.user)[0]['error'])
+        # ล้มเหลวแล้วไม่ถูกหยิบซ้ำ
+        self.assertIsNone(jobs.claim('worker'))
+
+    @override_settings(JOB_STALE_AFTER=60, JOB_MAX_ATTEMPTS=2)
+    def test_requeue_stale_until_max_attempts(self):
+        self._enqueue_export()
+        for attempt in (1, 2):
+            job = jobs.claim('dead-worker')
+            self.assertEqual(job.attempts, attempt)
+            Job.objects.filter(pk=job.pk).update(started_at=timezone.now() - timedelta(minutes=5))
+            expected = (1, 0) if attempt == 1 else (0, 1)
+            self.assertEqual(jobs.requeue_stale(), expected)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertIsNone(jobs.claim('worker'))
+
+    def test_running_job_not_requeued_before_stale(self):
+        self._enqueue_export()
+        jobs.claim('worker')
+        self.assertEqual(jobs.requeue_stale(), (0, 0))
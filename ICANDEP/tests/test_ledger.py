@@ -0,0 +1,62 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from .. import archive, ledger
+from ..models import Transaction
+from .utils import make_transaction
+
+
+class LedgerTests(TestCase):
+    """ยอดคงเหลือของทุกแถวต้องต่อกันถูกต้องข้ามหน้า (รวมเมื่อมีช่วงที่ปิดบัญชีแล้ว)"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ledger', password='pw')
+        amounts = [('income', '1000.00'), ('expense', '120.50'), ('expense', '80.25'), ('income', '33.33'),
+                   ('expense', '999.99'), ('expense', '0.01'), ('income', '250.00'), ('expense', '15.75')]
+        # สองรายการต่อวัน: ลำดับภายในวันเดียวกันต้องใช้ created_at, id
+        for n, (transaction_type, amount) in enumerate(amounts):
+            make_transaction(self.user, f'รายการ {n}', amount, transaction_type, day=date(2020, 1 + n // 4, 1 + n // 2))
+        make_transaction(User.objects.create_user('other', password='pw'), 'ผู้ใช้อื่น', '5000.00', 'income')
+
+    def _expected_balances(self):
+        balance, expected = Decimal('0'), {}
+        for row in Transaction.objects.filter(user=self.user).order_by('date', 'created_at', 'id'):
+            balance += row.amount if row.transaction_type == 'income' else -row.amount
+            expected[row.pk] = balance
+        return expected
+
+    def _walk(self):
+        balances, previous_opening, after = {}, None, None
+        while True:
+            page = ledger.paginate(self.user, after=after, per_page=3)
+            for row in page.object_list:
+                balances[row.pk] = row.balance
+            if previous_opening is not None:
+                # ยอดยกมาของหน้าก่อน = ยอดคงเหลือของแถวใหม่สุดในหน้านี้
+                self.assertEqual(page.closing_balance, previous_opening)
+            previous_opening = page.opening_balance
+            if not page.has_next:
+                return balances
+            after = page.next_cursor
+
+    def test_balances_across_pages(self):
+        expected = self._expected_balances()
+        self.assertEqual(self._walk(), expected)
+
+    def test_balances_after_closing_period(self):
+        expected = self._expected_balances()
+        with self.captureOnCommitCallbacks(execute=True):
+            archive.close_period(date(2020, 1, 1), date(2020, 2, 1))
+        hot = set(Transaction.objects.filter(user=self.user).values_list('pk', flat=True))
+        self.assertEqual(self._walk(), {pk: balance for pk, balance in expected.items() if pk in hot})
+
+    def test_ledger_page(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/app/transactions/ledger/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page'].closing_balance, Decimal('66.83'))
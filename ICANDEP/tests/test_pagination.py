@@ -0,0 +1,67 @@
+from datetime import date, datetime, timezone
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from ..models import Transaction
+from ..pagination import decode_cursor, encode_cursor, paginate_keyset
+from .utils import make_transaction
+
+
+class KeysetPaginationTests(TestCase):
+    """หน้าแบบ cursor: เดินหน้า/ย้อนกลับแล้วได้ทุกแถวครบ ไม่ซ้ำ ตามลำดับ (-date, -created_at, -id)"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('pages', password='pw')
+        for n in range(8):
+            make_transaction(self.user, f'รายการ {n}', '10.00', day=date(2020, 1, 1 + n // 3))
+        # created_at ซ้ำกันทั้งวัน: ลำดับภายในวันต้องตัดสินด้วย id
+        Transaction.objects.filter(date=date(2020, 1, 1)).update(created_at=datetime(2020, 1, 1, tzinfo=timezone.utc))
+        self.queryset = Transaction.objects.filter(user=self.user)
+        self.expected = list(self.queryset.order_by('-date', '-created_at', '-id').values_list('pk', flat=True))
+
+    def _forward(self, queryset):
+        pages, after = [], None
+        while True:
+            page = paginate_keyset(queryset, after=after, per_page=3)
+            pages.append(page)
+            if not page.has_next:
+                return pages
+            after = page.next_cursor
+
+    def test_forward_covers_every_row_once(self):
+        pages = self._forward(self.queryset)
+        self.assertEqual([row.pk for page in pages for row in page], self.expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 2])
+        self.assertFalse(pages[0].has_previous)
+        self.assertTrue(pages[-1].has_previous)
+
+    def test_backward_returns_previous_page(self):
+        pages = self._forward(self.queryset)
+        for newer, older in zip(pages, pages[1:]):
+            back = paginate_keyset(self.queryset, before=older.previous_cursor, per_page=3)
+            self.assertEqual([row.pk for row in back], [row.pk for row in newer])
+        first = paginate_keyset(self.queryset, before=pages[1].previous_cursor, per_page=3)
+        self.assertFalse(first.has_previous)
+
+    def test_values_queryset(self):
+        pages = self._forward(self.queryset.values('id', 'date', 'created_at'))
+        self.assertEqual([row['id'] for page in pages for row in page], self.expected)
+
+    def test_cursor_round_trip_and_invalid_cursor(self):
+        row = self.queryset.first()
+        self.assertEqual(decode_cursor(encode_cursor(row)), (row.date, row.created_at, row.pk))
+        for cursor in ('', 'not-base64!', encode_cursor(row)[:-4]):
+            self.assertIsNone(decode_cursor(cursor))
+        # cursor เสียเริ่มจากหน้าแรก
+        page = paginate_keyset(self.queryset, after='garbage', per_page=3)
+        self.assertEqual([row.pk for row in page], self.expected[:3])
+
+    def test_list_view_follows_cursor(self):
+        self.client.force_login(self.user)
+        cursor = encode_cursor(Transaction.objects.get(pk=self.expected[2]))
+        page = self.client.get('/app/transactions/', {'after': cursor}).context['page']
+        self.assertEqual([row.pk for row in page], self.expected[3:])
+        self.assertTrue(page.has_previous)
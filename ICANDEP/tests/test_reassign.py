@@ -0,0 +1,124 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from .. import archive, caching, reassign, reporting
+from ..models import ArchivedTransaction, Category, DailySummary, PeriodSummary
+from .utils import RollupAssertions, make_transaction
+
+
+class MergeCategoryPermissionTests(TestCase):
+    """หมวดหมู่ใช้ร่วมกันทุกผู้ใช้: รวมหมวดหมู่ได้เฉพาะ staff"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('member', password='pw')
+        self.source = Category.objects.create(name='ต้นทาง', transaction_type='expense')
+        self.target = Category.objects.create(name='ปลายทาง', transaction_type='expense')
+        self.row = make_transaction(self.user, 'ค่าข้าว', '40.00', day=date(2020, 3, 1), category=self.source)
+
+    def _post(self):
+        return self.client.post(
+            f'/app/categories/{self.source.pk}/merge/', {'target': self.target.pk, 'then': 'delete'},
+        )
+
+    def test_non_staff_post_is_rejected(self):
+        self.client.force_login(self.user)
+        response = self._post()
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('/admin/login/', response['Location'])
+        self.assertTrue(Category.objects.filter(pk=self.source.pk).exists())
+        self.row.refresh_from_db()
+        self.assertEqual(self.row.category_id, self.source.pk)
+
+    def test_staff_can_merge(self):
+        self.client.force_login(User.objects.create_user('staff', password='pw', is_staff=True))
+        self.assertRedirects(self._post(), '/app/categories/', fetch_redirect_response=False)
+        self.assertFalse(Category.objects.filter(pk=self.source.pk).exists())
+        self.row.refresh_from_db()
+        self.assertEqual(self.row.category_id, self.target.pk)
+
+
+class MergeTests(RollupAssertions, TestCase):
+    """รวมหมวดหมู่: ยอดรวมรายวันและของช่วงที่ปิดแล้วที่ key ซ้ำกันต้องถูกบวกรวมเป็นแถวเดียว"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('merge', password='pw')
+        self.food = Category.objects.create(name='อาหาร', transaction_type='expense')
+        self.travel = Category.objects.create(name='เดินทาง', transaction_type='expense')
+        self.salary = Category.objects.create(name='เงินเดือน', transaction_type='income')
+
+    def test_merge(self):
+        make_transaction(self.user, 'ข้าว', '50.00', category=self.food, day=date(2020, 1, 1))
+        make_transaction(self.user, 'รถ', '30.00', category=self.travel, day=date(2020, 1, 1))
+        make_transaction(self.user, 'เรือ', '20.00', category=self.travel, day=date(2020, 1, 2))
+        result = reassign.merge(self.travel, self.food)
+        self.assertEqual((result.moved, result.deleted), (2, True))
+        self.assertRollupsMatch(self.user)
+        self.assertEqual(DailySummary.objects.get(user=self.user, day=date(2020, 1, 1)).total, Decimal('80.00'))
+
+    def test_merge_folds_rollups_with_same_key(self):
+        other = User.objects.create_user('merge-other', password='pw')
+        # มกราคม (จะปิดบัญชี): ทั้งสองหมวดหมู่มีวันเดียวกัน + วันที่มีแค่หมวดหมู่ต้นทาง
+        make_transaction(self.user, 'ข้าว', '50.00', category=self.food, day=date(2020, 1, 5))
+        make_transaction(self.user, 'รถ', '30.00', category=self.travel, day=date(2020, 1, 5))
+        make_transaction(self.user, 'เรือ', '20.00', category=self.travel, day=date(2020, 1, 6))
+        make_transaction(other, 'รถของคนอื่น', '7.00', category=self.travel, day=date(2020, 1, 5))
+        # กุมภาพันธ์ (ยังไม่ปิด)
+        make_transaction(self.user, 'ขนม', '5.00', category=self.food, day=date(2020, 2, 1))
+        make_transaction(self.user, 'แท็กซี่', '15.00', category=self.travel, day=date(2020, 2, 1))
+        with self.captureOnCommitCallbacks(execute=True):
+            period = archive.close_period(date(2020, 1, 1), date(2020, 2, 1))
+        before = reporting.summarize(self.user)
+
+        result = reassign.merge(self.travel, self.food)
+        self.assertEqual((result.moved, result.archived, result.deleted), (1, 3, True))
+        self.assertFalse(ArchivedTransaction.objects.filter(category_id=self.travel.pk).exists())
+
+        self.assertEqual(
+            sorted(DailySummary.objects.filter(user=self.user).values_list('day', 'category_id', 'total', 'count')),
+            [(date(2020, 1, 5), self.food.pk, Decimal('80.00'), 2),
+             (date(2020, 1, 6), self.food.pk, Decimal('20.00'), 1),
+             (date(2020, 2, 1), self.food.pk, Decimal('20.00'), 2)],
+        )
+        self.assertEqual(
+            list(PeriodSummary.objects.filter(period=period, user=self.user)
+                 .values_list('transaction_type', 'category_id', 'total', 'count')),
+            [('expense', self.food.pk, Decimal('100.00'), 3)],
+        )
+        self.assertEqual(
+            list(PeriodSummary.objects.filter(period=period, user=other).values_list('category_id', 'total', 'count')),
+            [(self.food.pk, Decimal('7.00'), 1)],
+        )
+        after = reporting.summarize(self.user)
+        self.assertEqual((after.income, after.expense), (before.income, before.expense))
+        self.assertEqual(
+            [(row['category__name'], row['total'], row['count']) for row in after.categories],
+            [('อาหาร', Decimal('120.00'), 5)],
+        )
+
+    def test_merge_bumps_data_version_of_affected_users(self):
+        other = User.objects.create_user('merge-other', password='pw')
+        bystander = User.objects.create_user('merge-bystander', password='pw')
+        make_transaction(self.user, 'รถ', '30.00', category=self.travel)
+        make_transaction(other, 'รถ', '30.00', category=self.travel)
+        make_transaction(bystander, 'ข้าว', '30.00', category=self.food)
+        versions = {user: caching.get_data_version(user).version for user in (self.user, other, bystander)}
+        result = reassign.merge(self.travel, self.food, delete_source=False)
+        self.assertFalse(result.deleted)
+        self.travel.refresh_from_db()
+        self.assertFalse(self.travel.is_active)
+        self.assertEqual(
+            {user: caching.get_data_version(user).version - version for user, version in versions.items()},
+            {self.user: 1, other: 1, bystander: 0},
+        )
+
+    def test_merge_rejects_same_or_other_type(self):
+        for target in (self.travel, self.salary):
+            with self.assertRaises(ValueError):
+                reassign.merge(self.travel, target)
+        self.assertTrue(Category.objects.filter(pk=self.travel.pk).exists())
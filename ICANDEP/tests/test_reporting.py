@@ -0,0 +1,86 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Q, Sum
+from django.test import TestCase
+
+from .. import reporting
+from ..models import Category, Transaction
+from .utils import make_transaction
+
+
+class ReportingTests(TestCase):
+    """ยอดจาก reporting (อ่าน DailySummary) ต้องเท่ากับผลรวมจากตารางธุรกรรมโดยตรง"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('reporting', password='pw')
+        other = User.objects.create_user('other', password='pw')
+        self.food = Category.objects.create(name='อาหาร', transaction_type='expense')
+        self.rent = Category.objects.create(name='ค่าเช่า', transaction_type='expense')
+        self.salary = Category.objects.create(name='เงินเดือน', transaction_type='income')
+        day = date(2019, 11, 3)
+        for n in range(60):
+            # ทุก 4 วัน สลับรายรับ/รายจ่าย/หมวดหมู่ และบางรายการไม่มีหมวดหมู่
+            kind, category = [
+                ('income', self.salary), ('expense', self.food), ('expense', self.rent), ('expense', None),
+            ][n % 4]
+            make_transaction(self.user, f'รายการ {n}', f'{10 + n * 7}.25', kind, day=day, category=category)
+            day += timedelta(days=4)
+        make_transaction(other, 'ผู้ใช้อื่น', '5000.00', 'income', day=date(2020, 1, 1))
+
+    def _raw(self, date_from=None, date_to=None):
+        rows = Transaction.objects.filter(user=self.user)
+        if date_from:
+            rows = rows.filter(date__gte=date_from)
+        if date_to:
+            rows = rows.filter(date__lte=date_to)
+        totals = rows.aggregate(
+            income=Sum('amount', filter=Q(transaction_type='income')),
+            expense=Sum('amount', filter=Q(transaction_type='expense')),
+        )
+        return totals['income'] or Decimal('0'), totals['expense'] or Decimal('0')
+
+    def test_summarize_matches_raw_sums(self):
+        for date_from, date_to in [
+            (None, None), (date(2020, 1, 1), date(2020, 1, 31)), (date(2019, 12, 15), date(2020, 3, 2)),
+            (None, date(2019, 12, 31)), (date(2020, 2, 1), None), (date(2030, 1, 1), None),
+        ]:
+            summary = reporting.summarize(self.user, date_from, date_to)
+            self.assertEqual((summary.income, summary.expense), self._raw(date_from, date_to), (date_from, date_to))
+            self.assertEqual(summary.balance, summary.income - summary.expense)
+
+    def test_summarize_categories(self):
+        summary = reporting.summarize(self.user)
+        totals = [row['total'] for row in summary.categories]
+        self.assertEqual(totals, sorted(totals, reverse=True))
+        by_name = {row['category__name']: (row['total'], row['count']) for row in summary.categories}
+        for category in (self.food, self.rent, self.salary):
+            raw = Transaction.objects.filter(user=self.user, category=category)
+            self.assertEqual(by_name[category.name], (raw.aggregate(total=Sum('amount'))['total'], raw.count()))
+        # รายการที่ไม่มีหมวดหมู่นับในยอดรวม แต่ไม่อยู่ในรายการหมวดหมู่
+        self.assertEqual(len(summary.categories), 3)
+        self.assertEqual([row['category__name'] for row in summary.categories_of('income')], ['เงินเดือน'])
+
+    def test_period_series_matches_raw_sums(self):
+        for granularity in ('day', 'week', 'month', 'quarter', 'year'):
+            series = reporting.period_series(self.user, granularity, periods=5, end=date(2020, 6, 10))
+            self.assertEqual(len(series), 5)
+            for period in series:
+                end = reporting.shift_period(period.start, granularity, 1) - timedelta(days=1)
+                self.assertEqual((period.income, period.expense), self._raw(period.start, end), (granularity, period))
+
+    def test_period_series_fills_empty_periods(self):
+        series = reporting.period_series(self.user, 'month', periods=3, end=date(2031, 2, 1))
+        self.assertEqual([period.start for period in series], [date(2030, 12, 1), date(2031, 1, 1), date(2031, 2, 1)])
+        self.assertEqual({(period.income, period.expense) for period in series}, {(Decimal('0'), Decimal('0'))})
+
+    def test_period_helpers_follow_calendar(self):
+        self.assertEqual(reporting.period_start(date(2020, 5, 20), 'quarter'), date(2020, 4, 1))
+        self.assertEqual(reporting.period_start(date(2020, 5, 20), 'week'), date(2020, 5, 18))
+        self.assertEqual(reporting.shift_period(date(2020, 1, 1), 'month', -1), date(2019, 12, 1))
+        self.assertEqual(reporting.shift_period(date(2020, 11, 1), 'quarter', 1), date(2021, 2, 1))
+        with self.assertRaises(ValueError):
+            reporting.period_start(date(2020, 1, 1), 'decade')
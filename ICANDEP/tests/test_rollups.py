@@ -0,0 +1,61 @@
+import io
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from .. import reporting, rollups
+from ..models import Category, DailySummary
+from .utils import RollupAssertions, make_transaction
+
+
+class RollupTests(RollupAssertions, TestCase):
+    """DailySummary ต้องเท่ากับผลรวมจากตารางธุรกรรมเสมอ ไม่ว่าข้อมูลจะเปลี่ยนทางไหน"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('rollup', password='pw')
+        self.food = Category.objects.create(name='อาหาร', transaction_type='expense')
+        self.travel = Category.objects.create(name='เดินทาง', transaction_type='expense')
+        self.salary = Category.objects.create(name='เงินเดือน', transaction_type='income')
+
+    def test_create_edit_delete(self):
+        row = make_transaction(self.user, 'ข้าว', '50.00', category=self.food, day=date(2020, 1, 1))
+        make_transaction(self.user, 'เงินเดือน', '1000.00', 'income', category=self.salary, day=date(2020, 1, 1))
+        self.assertRollupsMatch(self.user)
+
+        row.amount = Decimal('75.00')
+        row.category = self.travel
+        row.date = date(2020, 1, 2)
+        row.save()
+        self.assertRollupsMatch(self.user)
+
+        row.delete()
+        self.assertRollupsMatch(self.user)
+        self.assertEqual(reporting.summarize(self.user).expense, Decimal('0'))
+
+    def test_edit_through_view(self):
+        row = make_transaction(self.user, 'ข้าว', '50.00', category=self.food, day=date(2020, 1, 1))
+        self.client.force_login(self.user)
+        self.client.post(f'/app/transactions/{row.pk}/edit/', {
+            'title': 'ข้าว', 'amount': '80.00', 'transaction_type': 'expense',
+            'category': self.travel.pk, 'date': '2020-01-03', 'description': '',
+        })
+        row.refresh_from_db()
+        self.assertEqual(row.amount, Decimal('80.00'))
+        self.assertRollupsMatch(self.user)
+
+    def test_rebuild_repairs_only_the_given_range(self):
+        make_transaction(self.user, 'ข้าว', '50.00', category=self.food, day=date(2020, 1, 1))
+        make_transaction(self.user, 'รถ', '30.00', category=self.travel, day=date(2020, 1, 5))
+        DailySummary.objects.filter(user=self.user).update(total=Decimal('999.00'))
+
+        rollups.rebuild(user=self.user, date_from=date(2020, 1, 1), date_to=date(2020, 1, 1))
+        totals = dict(DailySummary.objects.filter(user=self.user).values_list('day', 'total'))
+        self.assertEqual(totals, {date(2020, 1, 1): Decimal('50.00'), date(2020, 1, 5): Decimal('999.00')})
+
+        call_command('rebuild_rollups', user='rollup', stdout=io.StringIO())
+        self.assertRollupsMatch(self.user)
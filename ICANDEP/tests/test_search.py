@@ -0,0 +1,99 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from .. import search
+from ..models import Transaction
+from .utils import make_transaction
+
+
+class SearchTests(TestCase):
+    """ค้นหาบน SQLite: FTS5 (trigram) สำหรับคำตั้งแต่ 3 ตัวอักษร และ LIKE สำหรับคำที่สั้นกว่า"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('search', password='pw')
+        other = User.objects.create_user('search-other', password='pw')
+        self.rows = {
+            title: make_transaction(self.user, title, '10.00', day=date(2020, 1, 1 + n))
+            for n, title in enumerate(['ค่าอาหารกลางวัน', 'ค่าน้ำมันรถ', 'อาหารแมว', 'ค่า Wi-Fi', 'ค่าไฟ'])
+        }
+        Transaction.objects.filter(pk=self.rows['ค่าไฟ'].pk).update(description='บิล กฟภ. เดือนมกราคม')
+        make_transaction(other, 'อาหารของคนอื่น', '10.00', day=date(2020, 1, 1))
+        self.queryset = Transaction.objects.filter(user=self.user)
+
+    def _titles(self, text):
+        return sorted(row.title for row in search.matching(self.queryset, text))
+
+    def test_thai_substring_without_spaces(self):
+        self.assertEqual(self._titles('อาหาร'), ['ค่าอาหารกลางวัน', 'อาหารแมว'])
+        self.assertEqual(self._titles('มกราคม'), ['ค่าไฟ'])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self._titles('อาหาร แมว'), ['อาหารแมว'])
+        self.assertEqual(self._titles('ค่า wi-fi'), ['ค่า Wi-Fi'])
+        self.assertEqual(self._titles('อาหาร ไม่มีคำนี้'), [])
+
+    def test_short_terms_use_like(self):
+        self.assertEqual(self._titles('ไฟ'), ['ค่าไฟ'])
+        self.assertEqual(self._titles('wi'), ['ค่า Wi-Fi'])
+        # คำสั้นรวมกับคำที่ใช้ index ได้
+        self.assertEqual(self._titles('ค่า รถ'), ['ค่าน้ำมันรถ'])
+
+    def test_index_follows_updates_and_deletes(self):
+        row = self.rows['อาหารแมว']
+        Transaction.objects.filter(pk=row.pk).update(title='ทรายแมว')
+        self.assertEqual(self._titles('อาหาร'), ['ค่าอาหารกลางวัน'])
+        self.assertEqual(self._titles('ทรายแมว'), ['ทรายแมว'])
+        Transaction.objects.filter(pk=row.pk).delete()
+        self.assertEqual(self._titles('ทรายแมว'), [])
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, title='อาหารนำเข้า', amount='1.00', transaction_type='expense',
+                        date=date(2020, 2, 1)),
+        ])
+        self.assertEqual(self._titles('นำเข้า'), ['อาหารนำเข้า'])
+
+    def test_operators_are_literal(self):
+        for text in ('"', 'OR', 'NEAR(ค่า', 'ค่า*', "') OR 1=1 --"):
+            self.assertEqual(self._titles(text), [], text)
+
+    def test_ranked_rows_best_match_first(self):
+        make_transaction(self.user, 'อาหาร', '10.00', day=date(2019, 1, 1))
+        rows = search.ranked_rows(self.queryset, 'อาหาร', 0, 10)
+        self.assertEqual(rows[0].title, 'อาหาร')
+        self.assertEqual(sorted(row.title for row in rows), ['ค่าอาหารกลางวัน', 'อาหาร', 'อาหารแมว'])
+
+    def test_paginate_ranked(self):
+        for n in range(5):
+            make_transaction(self.user, f'อาหารเช้า {n}', '10.00', day=date(2020, 3, 1 + n))
+        first = search.paginate_ranked(self.queryset, 'อาหาร', 1, per_page=3)
+        second = search.paginate_ranked(self.queryset, 'อาหาร', '2', per_page=3)
+        third = search.paginate_ranked(self.queryset, 'อาหาร', 3, per_page=3)
+        pages = [first, second, third]
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual([page.has_next for page in pages], [True, True, False])
+        self.assertEqual([page.has_previous for page in pages], [False, True, True])
+        pks = [row.pk for page in pages for row in page]
+        self.assertEqual(len(set(pks)), 7)
+        self.assertEqual(search.paginate_ranked(self.queryset, 'อาหาร', 'x', per_page=3).number, 1)
+        # หน้าที่เกิน MAX_RESULTS ว่าง
+        self.assertEqual(list(search.paginate_ranked(self.queryset, 'อาหาร', search.MAX_RESULTS + 1)), [])
+
+    def test_short_only_query_pages_by_date(self):
+        # ไม่มีคำที่ใช้ FTS ได้ (ไม่มี bm25) เรียงตามวันที่ใหม่สุดก่อน
+        make_transaction(self.user, 'ไฟฉาย', '10.00', day=date(2019, 6, 1))
+        make_transaction(self.user, 'หลอดไฟ', '10.00', day=date(2021, 6, 1))
+        page = search.paginate_ranked(self.queryset, 'ไฟ', 1, per_page=2)
+        self.assertEqual([row.title for row in page], ['หลอดไฟ', 'ค่าไฟ'])
+        self.assertTrue(page.has_next)
+        page = search.paginate_ranked(self.queryset, 'ไฟ', 2, per_page=2)
+        self.assertEqual([row.title for row in page], ['ไฟฉาย'])
+
+    def test_list_view_search(self):
+        self.client.force_login(self.user)
+        response = self.client.get('/app/transactions/', {'q': 'อาหาร'})
+        self.assertEqual(sorted(row.title for row in response.context['page']), ['ค่าอาหารกลางวัน', 'อาหารแมว'])
+        response = self.client.get('/app/transactions/', {'q': 'ไฟ'})
+        self.assertEqual([row.title for row in response.context['page']], ['ค่าไฟ'])
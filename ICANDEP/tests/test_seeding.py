@@ -0,0 +1,53 @@
+import io
+
+from django.apps import apps
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from .. import catalog, seeding, signals
+from ..models import Category
+
+DEFAULT_COUNT = len(list(seeding.default_categories()))
+
+
+class SeedingTests(TestCase):
+    """หมวดหมู่เริ่มต้น: สร้างเมื่อตารางยังว่างเท่านั้น และเรียกซ้ำกี่ครั้งก็ได้ผลเหมือนเดิม"""
+
+    def setUp(self):
+        cache.clear()
+        Category.objects.all().delete()
+        self.app_config = apps.get_app_config('ICANDEP')
+
+    def _post_migrate(self, sender=None, plan=None):
+        signals.seed_default_categories(sender or self.app_config, using='default', plan=plan)
+
+    def test_seed_categories_is_idempotent(self):
+        seeding.seed_categories(Category)
+        seeding.seed_categories(Category)
+        self.assertEqual(Category.objects.count(), DEFAULT_COUNT)
+        self.assertIsNotNone(catalog.get_catalog().find('ขายอาหาร', 'income'))
+
+    def test_post_migrate_seeds_empty_table_once(self):
+        self._post_migrate(plan=[('migration', False)])
+        self.assertEqual(Category.objects.count(), DEFAULT_COUNT)
+        # หมวดหมู่ที่ลบไปแล้วไม่ถูกสร้างกลับมาตอน migrate ครั้งถัดไป
+        Category.objects.get(name='ภาษี').delete()
+        with self.assertNumQueries(1):
+            self._post_migrate(plan=[('migration', False)])
+        self.assertEqual(Category.objects.count(), DEFAULT_COUNT - 1)
+
+    def test_post_migrate_skips_other_apps_and_empty_plan(self):
+        with self.assertNumQueries(0):
+            self._post_migrate(sender=apps.get_app_config('auth'), plan=[('migration', False)])
+            self._post_migrate(plan=[])
+        self.assertFalse(Category.objects.exists())
+
+    def test_create_categories_command_adds_missing_only(self):
+        Category.objects.create(name='ขายอาหาร', transaction_type='income', icon='bi-star')
+        out = io.StringIO()
+        call_command('create_categories', stdout=out)
+        self.assertIn(str(DEFAULT_COUNT - 1), out.getvalue())
+        self.assertEqual(Category.objects.get(name='ขายอาหาร').icon, 'bi-star')
+        call_command('create_categories', stdout=io.StringIO())
+        self.assertEqual(Category.objects.count(), DEFAULT_COUNT)
@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from .. import slowqueries
+
+
+@override_settings(SLOW_QUERY_MS=0.000001, SLOW_QUERY_EXPLAIN_RATE=0, SLOW_QUERY_LOG='')
+class SlowQueryLogTests(TestCase):
+    """เกณฑ์ต่ำมากจนทุก query นับเป็น query ช้า: ตรวจว่าบันทึก view, แผนการ query และไฟล์ log ถูกต้อง"""
+
+    def setUp(self):
+        cache.clear()
+        slowqueries._buffer = None
+        slowqueries._explained.clear()
+        self.user = User.objects.create_user('slow', password='pw')
+        self.staff = User.objects.create_user('slow-staff', password='pw', is_staff=True)
+
+    def tearDown(self):
+        slowqueries._buffer = None
+        slowqueries._explained.clear()
+
+    def test_fingerprint_collapses_literals(self):
+        self.assertEqual(
+            slowqueries.fingerprint("SELECT * FROM t WHERE a = 'x''y' AND b IN (%s, %s, %s) LIMIT 21"),
+            'SELECT * FROM t WHERE a = ? AND b IN (...) LIMIT ?',
+        )
+        self.assertEqual(
+            slowqueries.fingerprint('SELECT 1 WHERE id IN (%s, %s)'),
+            slowqueries.fingerprint('SELECT 2 WHERE id IN (%s, %s, %s, %s)'),
+        )
+
+    def test_records_view_and_explains_each_shape_once(self):
+        self.client.force_login(self.user)
+        self.client.get('/app/')
+        self.client.get('/app/')
+        entries = list(slowqueries.buffer())
+        self.assertTrue(entries)
+        self.assertEqual({entry['view'] for entry in entries}, {'ICANDEP:dashboard'})
+        selects = [entry for entry in entries if entry['sql'].lstrip().upper().startswith('SELECT')]
+        plans = {}
+        for entry in selects:
+            if entry['plan'] is not None:
+                self.assertNotIn(entry['fingerprint'], plans)
+                plans[entry['fingerprint']] = entry['plan']
+        # ทุกรูปแบบ SELECT ถูก explain ครั้งแรกที่เห็น (EXPLAIN QUERY PLAN ของ SQLite)
+        self.assertEqual(set(plans), {entry['fingerprint'] for entry in selects})
+        self.assertTrue(any('SCAN' in plan or 'SEARCH' in plan for plan in plans.values()))
+        # EXPLAIN ไม่ผ่าน execute wrapper จึงไม่ถูกบันทึกซ้ำ
+        self.assertFalse(any('EXPLAIN' in entry['sql'] for entry in entries))
+
+    def test_outside_watched_views_not_recorded(self):
+        # query นอก request (ไม่มี RequestMetrics) และจาก view ที่ไม่ได้เฝ้าดูไม่ถูกบันทึก
+        User.objects.count()
+        with self.settings(SLOW_QUERY_VIEWS=('admin:',)):
+            self.client.force_login(self.user)
+            self.client.get('/app/')
+        self.assertEqual(list(slowqueries.buffer()), [])
+
+    def test_stats_endpoint_is_staff_only(self):
+        self.client.force_login(self.user)
+        self.assertNotEqual(self.client.get('/app/stats/slow-queries/').status_code, 200)
+        self.client.get('/app/')
+        self.client.force_login(self.staff)
+        data = self.client.get('/app/stats/slow-queries/', {'view': 'ICANDEP:dashboard', 'limit': 3}).json()
+        self.assertEqual(len(data['top']), 3)
+        self.assertEqual({view for group in data['top'] for view in group['views']}, {'ICANDEP:dashboard'})
+        totals = [group['total_ms'] for group in data['top']]
+        self.assertEqual(totals, sorted(totals, reverse=True))
+
+    def test_log_file_and_command(self):
+        handle, path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        self.client.force_login(self.user)
+        with self.settings(SLOW_QUERY_LOG=path):
+            self.client.get('/app/')
+        with open(path, 'a', encoding='utf-8') as stream:
+            stream.write('{ไม่ใช่ json\n')
+        entries = slowqueries.read_log(path)
+        self.assertEqual(len(entries), len(slowqueries.buffer()))
+        self.assertEqual(entries[0], json.loads(json.dumps(slowqueries.buffer()[0], default=str)))
+
+        out = StringIO()
+        call_command('slow_queries', file=path, limit=2, plans=True, stdout=out)
+        self.assertIn(f'{len(entries):,} รายการจาก {path}', out.getvalue())
+        self.assertIn('ICANDEP:dashboard', out.getvalue())
+        self.assertIn('    | ', out.getvalue())
+
+    def test_command_requires_log(self):
+        with self.assertRaises(CommandError):
+            call_command('slow_queries', stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('slow_queries', file='/nonexistent/slow.jsonl', stdout=StringIO())
@@ -0,0 +1,31 @@
+"""ตัวช่วยที่ใช้ร่วมกันในชุดทดสอบของ ICANDEP"""
+from datetime import date
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+
+from ..models import DailySummary, Transaction
+
+
+def make_transaction(user, title, amount, transaction_type='expense', day=date(2020, 1, 1), category=None):
+    """สร้างธุรกรรมผ่าน ORM (ส่ง signal ปรับ DailySummary เหมือนการบันทึกจากหน้าเว็บ)"""
+    return Transaction.objects.create(
+        user=user, title=title, amount=Decimal(amount), transaction_type=transaction_type,
+        category=category, date=day,
+    )
+
+
+class RollupAssertions:
+    """mixin ของ TestCase: DailySummary ต้องเท่ากับผลรวมจากตารางธุรกรรมเสมอ"""
+
+    def assertRollupsMatch(self, user):
+        expected = {
+            (row['date'], row['transaction_type'], row['category_id']): (row['total'], row['count'])
+            for row in Transaction.objects.filter(user=user).order_by()
+            .values('date', 'transaction_type', 'category_id').annotate(total=Sum('amount'), count=Count('id'))
+        }
+        actual = {
+            (row.day, row.transaction_type, row.category_id): (row.total, row.count)
+            for row in DailySummary.objects.filter(user=user).exclude(count=0)
+        }
+        self.assertEqual(actual, expected)
@@ -1,18 +1,40 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import api, views
 
 app_name = 'ICANDEP'
 
+if settings.ASYNC_VIEWS:
+    from . import async_views as page_views
+else:
+    page_views = views
+
 urlpatterns = [
-    path('', views.dashboard, name='dashboard'),
+    path('', page_views.dashboard, name='dashboard'),
     path('login/', views.login_view, name='login'),
     path('register/', views.register_view, name='register'),
     path('logout/', views.logout_view, name='logout'),
     path('transactions/', views.transaction_list, name='transaction_list'),
+    path('transactions/ledger/', views.transaction_ledger, name='transaction_ledger'),
+    path('transactions/export/', views.export_transactions, name='export_transactions'),
+    path('transactions/import/', views.import_transactions, name='import_transactions'),
     path('transactions/add/', views.add_transaction, name='add_transaction'),
+    path('transactions/bulk/', views.bulk_transactions, name='bulk_transactions'),
+    path('transactions/batch/', views.batch_add_transactions, name='batch_add_transactions'),
     path('transactions/<int:pk>/edit/', views.edit_transaction, name='edit_transaction'),
     path('transactions/<int:pk>/delete/', views.delete_transaction, name='delete_transaction'),
-    path('reports/', views.reports, name='reports'),
+    path('reports/', page_views.reports, name='reports'),
+    path('reports/export/', views.export_report, name='export_report'),
+    path('reports/export/background/', views.enqueue_report_export, name='enqueue_report_export'),
+    path('jobs/', views.job_list, name='job_list'),
+    path('jobs/<int:pk>/download/', views.job_download, name='job_download'),
     path('categories/', views.manage_categories, name='manage_categories'),
     path('categories/<int:pk>/delete/', views.delete_category, name='delete_category'),
+    path('categories/<int:pk>/merge/', views.merge_category, name='merge_category'),
+    path('stats/cache/', views.cache_stats, name='cache_stats'),
+    path('stats/performance/', views.performance_stats, name='performance_stats'),
+    path('stats/slow-queries/', views.slow_query_stats, name='slow_query_stats'),
+    path('api/v1/transactions/', api.transactions, name='api_transactions'),
+    path('api/v1/dashboard/', api.dashboard, name='api_dashboard'),
+    path('api/v1/reports/', api.reports, name='api_reports'),
 ]
\ No newline at end of file
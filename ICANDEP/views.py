@@ -1,13 +1,27 @@
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponse, JsonResponse
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
-from django.db.models import Sum, Count
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.urls import reverse
+from django.utils.http import http_date, quote_etag, urlencode
+from django.middleware.csrf import get_token
+from django.views.decorators.http import require_POST
 from datetime import datetime, timedelta
-from .models import Transaction, Category
-from .forms import TransactionForm, CategoryForm
+from itertools import chain
+from .models import ArchivedTransaction, Job, Transaction
+from .forms import (
+    BulkActionForm, CategoryMergeForm, TransactionBatchFormSet, TransactionForm, CategoryForm, TransactionImportForm,
+)
+from .pagination import paginate_keyset
+from . import archive, bulkactions, caching, catalog, instrumentation, jobs, ledger, reassign, reporting, search, slowqueries
 
 def login_view(request):
     """หน้าเข้าสู่ระบบ"""
@@ -56,77 +70,106 @@ def logout_view(request):
     messages.success(request, 'ออกจากระบบสำเร็จ')
     return redirect('ICANDEP:login')
 
+def _page_etag(request):
+    data_version = caching.request_data_version(request).version
+    # หน้า HTML มีฟอร์มที่ฝัง CSRF token: secret เปลี่ยนเมื่อ login ใหม่ หน้าเดิมจากก่อน logout
+    # จึงต้องไม่ได้ 304 (ไม่เช่นนั้นเบราว์เซอร์ใช้ token เก่าแล้ว POST ถัดไปได้ 403)
+    # get_token() สร้าง secret ตั้งแต่ตอนนี้ถ้ายังไม่มี cookie ETag ของ response แรกจึงตรงกับ secret
+    # ใน cookie ที่ส่งกลับไป (ไม่เช่นนั้นการตรวจซ้ำครั้งแรกได้ 200 เสมอ)
+    get_token(request)
+    return caching.request_etag(request, data_version, 'html', request.META['CSRF_COOKIE'])
+
+
+def _conditional_precheck(request):
+    """
+    คำนวณ ETag/Last-Modified แล้วคืน (response 304/412 หรือ None, etag, last_modified)
+    ข้าม (คืน None ทั้งหมด) เมื่อไม่ใช่ GET/HEAD หรือมีข้อความ flash รอแสดง
+    """
+    if request.method not in ('GET', 'HEAD') or len(messages.get_messages(request)):
+        return None, None, None
+    etag = quote_etag(_page_etag(request))
+    last_modified = int(caching.request_last_modified(request).timestamp())
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    return response, etag, last_modified
+
+
+def _conditional_finish(request, response, etag, last_modified):
+    if etag and not getattr(messages.get_messages(request), 'used', False):
+        # view ที่แสดงข้อความระหว่าง render (เช่น error) ห้ามถูกใช้ซ้ำ จึงไม่ใส่ validator
+        response.headers.setdefault('ETag', etag)
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ['Cookie'])
+    return response
+
+
+def conditional_page(view_func):
+    """
+    Conditional GET (ETag + Last-Modified) ของหน้าที่แสดงข้อมูลของผู้ใช้
+    เบราว์เซอร์ที่มีหน้าเดิมอยู่แล้วได้ 304 หลังอ่าน DataVersion โดยไม่ต้องรัน query หรือ render
+    ข้ามเมื่อมีข้อความ flash รอแสดง (หน้าที่มีข้อความไม่ควรถูกนำกลับมาใช้ซ้ำ)
+    ใช้ได้ทั้ง view แบบ sync และ async
+    """
+    if iscoroutinefunction(view_func):
+        @wraps(view_func)
+        async def async_wrapper(request, *args, **kwargs):
+            # การอ่าน session/DataVersion เป็น ORM แบบ sync
+            response, etag, last_modified = await sync_to_async(_conditional_precheck)(request)
+            if response is None:
+                response = await view_func(request, *args, **kwargs)
+            return _conditional_finish(request, response, etag, last_modified)
+        return async_wrapper
+
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        response, etag, last_modified = _conditional_precheck(request)
+        if response is None:
+            response = view_func(request, *args, **kwargs)
+        return _conditional_finish(request, response, etag, last_modified)
+    return wrapper
+
 @login_required
+@conditional_page
 def dashboard(request):
     """หน้าแดชบอร์ดหลัก"""
+    today = timezone.now().date()
+    this_month, month_end = _month_range(today)
     try:
-        # ข้อมูลสรุป
-        today = timezone.now().date()
-        this_month = today.replace(day=1)
-        next_month = (this_month + timedelta(days=32)).replace(day=1)
-        
-        # รายรับรายจ่ายเดือนนี้ (เฉพาะผู้ใช้ปัจจุบัน)
-        monthly_income = Transaction.objects.filter(
-            user=request.user,
-            transaction_type='income',
-            date__gte=this_month,
-            date__lt=next_month
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        monthly_expense = Transaction.objects.filter(
-            user=request.user,
-            transaction_type='expense',
-            date__gte=this_month,
-            date__lt=next_month
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        monthly_balance = monthly_income - monthly_expense
-        
-        # รายการล่าสุด (เฉพาะผู้ใช้ปัจจุบัน)
-        recent_transactions = Transaction.objects.filter(user=request.user).select_related('category')[:10]
-        
-        # สถิติตามหมวดหมู่ (เฉพาะผู้ใช้ปัจจุบัน) - รองรับกรณีที่ยังไม่มี Category
-        try:
-            category_stats = Transaction.objects.filter(
-                user=request.user,
-                date__gte=this_month,
-                date__lt=next_month,
-                category__isnull=False
-            ).select_related('category').values('category__name').annotate(
-                total=Sum('amount')
-            ).order_by('-total')[:5]
-        except Exception:
-            # หากเกิด error (เช่น ตาราง Category ยังไม่มี) ให้ใช้ list ว่าง
-            category_stats = []
-        
-        context = {
-            'monthly_income': monthly_income,
-            'monthly_expense': monthly_expense,
-            'monthly_balance': monthly_balance,
-            'recent_transactions': recent_transactions,
-            'category_stats': category_stats,
-            'current_month': this_month.strftime('%B %Y'),
-        }
-        
-        return render(request, 'ICANDEP/dashboard.html', context)
+        # รายรับรายจ่าย รายการล่าสุด และสถิติตามหมวดหมู่ของเดือนนี้ (cache ต่อผู้ใช้ต่อเดือน)
+        context = caching.dashboard_payload(
+            request.user, this_month, month_end,
+            version=caching.request_data_version(request).version,
+        )
     except Exception as e:
-        # แสดง error message ที่เป็นมิตรกับผู้ใช้
-        messages.error(request, f'เกิดข้อผิดพลาด: {str(e)}. กรุณาตรวจสอบว่าได้รัน migrations แล้วหรือยัง')
-        return render(request, 'ICANDEP/dashboard.html', {
-            'monthly_income': 0,
-            'monthly_expense': 0,
-            'monthly_balance': 0,
-            'recent_transactions': [],
-            'category_stats': [],
-            'current_month': today.strftime('%B %Y'),
-        })
+        context = _dashboard_error_context(request, e)
+    context['current_month'] = this_month.strftime('%B %Y')
+    return render(request, 'ICANDEP/dashboard.html', context)
 
-@login_required
-def transaction_list(request):
-    """หน้ารายการธุรกรรม"""
-    from .models import Category
-    
-    transactions = Transaction.objects.filter(user=request.user).select_related('category')
+def _month_range(today):
+    """วันแรกและวันสุดท้ายของเดือนที่ today อยู่"""
+    this_month = today.replace(day=1)
+    next_month = (this_month + timedelta(days=32)).replace(day=1)
+    return this_month, next_month - timedelta(days=1)
+
+def _dashboard_error_context(request, error):
+    # แสดง error message ที่เป็นมิตรกับผู้ใช้
+    messages.error(request, f'เกิดข้อผิดพลาด: {str(error)}. กรุณาตรวจสอบว่าได้รัน migrations แล้วหรือยัง')
+    return {
+        'monthly_income': 0,
+        'monthly_expense': 0,
+        'monthly_balance': 0,
+        'recent_transactions': [],
+        'category_stats': [],
+    }
+
+def _filtered_transactions(request, with_search=True):
+    """
+    ธุรกรรมของผู้ใช้ตามตัวกรองใน query string (ประเภท / หมวดหมู่ / ช่วงวันที่ / คำค้น q)
+    archive=1 อ่านจากรายการที่เก็บถาวรแล้ว (ช่วงที่ปิดบัญชี ICANDEP/archive.py) แทนตารางธุรกรรมปัจจุบัน
+    with_search=False ไม่กรองคำค้น (หน้ารายการจัดอันดับผลค้นหาเองด้วย search.paginate_ranked)
+    """
+    model = ArchivedTransaction if request.GET.get('archive') == '1' else Transaction
+    transactions = model.objects.filter(user=request.user).select_related('category')
     
     # ตัวกรอง
     transaction_type = request.GET.get('type')
@@ -143,35 +186,111 @@ def transaction_list(request):
     if date_to:
         transactions = transactions.filter(date__lte=date_to)
     
+    if with_search:
+        transactions = search.matching(transactions, request.GET.get('q'))
+    
+    return transactions
+
+@login_required
+@conditional_page
+def transaction_list(request):
+    """หน้ารายการธุรกรรม"""
+    query = request.GET.get('q', '').strip()
+    transactions = _filtered_transactions(request, with_search=False)
+    
+    if query:
+        # ผลค้นหาเรียงตามความเกี่ยวข้อง แบ่งหน้าด้วยเลขหน้า (ICANDEP/search.py)
+        page = search.paginate_ranked(transactions, query, request.GET.get('page'))
+    else:
+        # แบ่งหน้าแบบ keyset ตามลำดับ (-date, -created_at, -id) ตัวกรองเดิมยังคงอยู่ใน query string
+        page = paginate_keyset(
+            transactions,
+            after=request.GET.get('after'),
+            before=request.GET.get('before'),
+        )
+    
     context = {
-        'transactions': transactions,
+        'transactions': page.object_list,
+        'page': page,
+        'query': query,
+        'archived': request.GET.get('archive') == '1',
+        'archive_boundary': archive.boundary(),
         'transaction_types': Transaction.TRANSACTION_TYPES,
-        'categories': Category.objects.filter(is_active=True).order_by('transaction_type', 'name'),
+        'categories': catalog.get_catalog().active(),
+        'bulk_actions': BulkActionForm.ACTIONS,
     }
     
     return render(request, 'ICANDEP/transaction_list.html', context)
 
+@login_required
+@conditional_page
+def transaction_ledger(request):
+    """สมุดบัญชี: ทุกรายการพร้อมยอดคงเหลือหลังรายการ (ICANDEP/ledger.py)"""
+    page = ledger.paginate(
+        request.user,
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+    )
+    context = {
+        'transactions': page.object_list,
+        'page': page,
+        'archive_boundary': archive.boundary(),
+    }
+    return render(request, 'ICANDEP/transaction_ledger.html', context)
+
+@login_required
+@require_POST
+def bulk_transactions(request):
+    """
+    ลบ/เปลี่ยนหมวดหมู่/วันที่/ประเภทของหลายรายการในครั้งเดียว (ICANDEP/bulkactions.py)
+    ตัวกรองของหน้ารายการมากับ query string ใช้ทั้งตอนเลือก "ทุกรายการที่ตรงกับตัวกรอง" และตอนกลับไปหน้าเดิม
+    """
+    back = reverse('ICANDEP:transaction_list') + (f'?{request.GET.urlencode()}' if request.GET else '')
+    if request.GET.get('archive') == '1':
+        messages.error(request, 'รายการที่เก็บถาวรแก้ไขไม่ได้')
+        return redirect(back)
+    
+    form = BulkActionForm(request.POST)
+    if not form.is_valid():
+        for errors in form.errors.values():
+            for error in errors:
+                messages.error(request, error)
+        return redirect(back)
+    
+    data = form.cleaned_data
+    rows = Transaction.objects.filter(user=request.user)
+    if data['select_all']:
+        rows = rows.filter(id__in=_filtered_transactions(request).values('id'))
+    else:
+        rows = rows.filter(id__in=data['ids'])
+    
+    action = data['action']
+    if action == 'delete':
+        count = bulkactions.delete(request.user, rows)
+        messages.success(request, f'ลบ {count} รายการสำเร็จ!')
+    elif action == 'category':
+        count = bulkactions.set_category(request.user, rows, data['category'])
+        messages.success(request, f'เปลี่ยนหมวดหมู่ {count} รายการเป็น "{data["category"].name}"')
+    elif action == 'date':
+        count = bulkactions.set_date(request.user, rows, data['date'])
+        messages.success(request, f'เปลี่ยนวันที่ {count} รายการเป็น {data["date"]:%d/%m/%Y}')
+    else:
+        count = bulkactions.set_type(request.user, rows, data['transaction_type'], data['category'])
+        messages.success(request, f'เปลี่ยนประเภท {count} รายการ')
+    
+    skipped = len(data['ids']) - count if not data['select_all'] else 0
+    if skipped > 0:
+        messages.warning(request, f'ข้าม {skipped} รายการ (ประเภทไม่ตรงกับหมวดหมู่/เป็นประเภทนั้นอยู่แล้ว หรือไม่พบรายการ)')
+    return redirect(back)
+
 @login_required
 def add_transaction(request):
     """หน้าเพิ่มรายการธุรกรรม"""
-    from .models import Category
-    
     # รับ transaction_type จาก query string
     initial_type = request.GET.get('type', '')
     
-    # ดึงหมวดหมู่ทั้งหมดก่อน (เพื่อให้แน่ใจว่ามีข้อมูล)
-    try:
-        categories = Category.objects.filter(is_active=True).order_by('transaction_type', 'name')
-        if not categories.exists():
-            # ถ้ายังไม่มีหมวดหมู่ ให้สร้างหมวดหมู่เริ่มต้น
-            messages.warning(request, 'ยังไม่มีหมวดหมู่ในระบบ กำลังสร้างหมวดหมู่เริ่มต้น...')
-            from django.core.management import call_command
-            call_command('create_categories')
-            categories = Category.objects.filter(is_active=True).order_by('transaction_type', 'name')
-    except Exception as e:
-        # ถ้าเกิด error (เช่น ตาราง Category ยังไม่มี) ให้ใช้ list ว่าง
-        categories = []
-        messages.error(request, f'เกิดข้อผิดพลาดในการโหลดหมวดหมู่: {str(e)}. กรุณาตรวจสอบว่าได้รัน migrations แล้วหรือยัง')
+    # หมวดหมู่ถูกสร้างตอน migrate แล้ว (post_migrate) อ่านจาก catalog ได้เลย
+    categories = catalog.get_catalog().active()
     
     if request.method == 'POST':
         form = TransactionForm(request.POST)
@@ -192,23 +311,37 @@ def add_transaction(request):
     
     return render(request, 'ICANDEP/transaction_form.html', context)
 
+@login_required
+def batch_add_transactions(request):
+    """บันทึกหลายรายการในครั้งเดียว: แถวที่ถูกต้องบันทึกทันที แถวที่ผิดแสดงกลับมาให้แก้"""
+    form_kwargs = {'initial': {'date': timezone.localdate(), 'transaction_type': 'expense'}}
+    
+    if request.method == 'POST':
+        formset = TransactionBatchFormSet(request.POST, form_kwargs=form_kwargs)
+        valid, failed = formset.split()
+        saved = formset.save(request.user, valid)
+        if saved:
+            messages.success(request, f'บันทึก {saved} รายการสำเร็จ!')
+        if not failed and not formset.non_form_errors():
+            return redirect('ICANDEP:transaction_list')
+        if failed:
+            messages.error(request, f'มี {len(failed)} รายการที่ยังไม่ได้บันทึก กรุณาแก้ไขแล้วบันทึกอีกครั้ง')
+            formset = formset.subset(failed)
+    else:
+        formset = TransactionBatchFormSet(form_kwargs=form_kwargs)
+    
+    context = {
+        'formset': formset,
+        'categories': formset.form_kwargs['category_catalog'].active(),
+    }
+    return render(request, 'ICANDEP/transaction_batch.html', context)
+
 @login_required
 def edit_transaction(request, pk):
     """หน้าแก้ไขรายการธุรกรรม"""
-    from .models import Category
-    
     transaction = get_object_or_404(Transaction, pk=pk, user=request.user)
     
-    # ดึงหมวดหมู่ทั้งหมดก่อน
-    try:
-        categories = Category.objects.filter(is_active=True).order_by('transaction_type', 'name')
-        if not categories.exists():
-            from django.core.management import call_command
-            call_command('create_categories')
-            categories = Category.objects.filter(is_active=True).order_by('transaction_type', 'name')
-    except Exception as e:
-        categories = []
-        messages.error(request, f'เกิดข้อผิดพลาดในการโหลดหมวดหมู่: {str(e)}')
+    categories = catalog.get_catalog().active()
     
     if request.method == 'POST':
         form = TransactionForm(request.POST, instance=transaction)
@@ -252,7 +385,7 @@ def manage_categories(request):
     - แสดงรายการหมวดหมู่ทั้งหมดของระบบ
     - เพิ่มหมวดหมู่ใหม่ได้จากฟอร์มด้านขวา
     """
-    categories = Category.objects.all().order_by('transaction_type', 'name')
+    categories = catalog.get_catalog().all
 
     if request.method == 'POST':
         form = CategoryForm(request.POST)
@@ -272,15 +405,17 @@ def manage_categories(request):
 @login_required
 def delete_category(request, pk):
     """ลบหมวดหมู่"""
-    category = get_object_or_404(Category, pk=pk)
+    category = catalog.get_catalog().get(pk)
+    if category is None:
+        raise Http404('ไม่พบหมวดหมู่')
     
-    # ตรวจสอบว่ามี transaction ใช้หมวดหมู่นี้อยู่หรือไม่
-    transactions_count = Transaction.objects.filter(category=category).count()
+    # ตรวจสอบว่ามี transaction ใช้หมวดหมู่นี้อยู่หรือไม่ (นับจาก index ไม่เกิน reassign.USAGE_LIMIT)
+    transactions_count = reassign.usage(category)
     
     if request.method == 'POST':
         if transactions_count > 0:
-            messages.error(request, f'ไม่สามารถลบหมวดหมู่ "{category.name}" ได้ เพราะมีรายการธุรกรรมที่ใช้หมวดหมู่นี้อยู่ {transactions_count} รายการ\n\nกรุณาลบหรือแก้ไขรายการธุรกรรมเหล่านั้นก่อน')
-            return redirect('ICANDEP:manage_categories')
+            messages.error(request, f'ไม่สามารถลบหมวดหมู่ "{category.name}" ได้ เพราะมีรายการธุรกรรมที่ใช้หมวดหมู่นี้อยู่\n\nใช้ "รวมหมวดหมู่" เพื่อย้ายรายการเหล่านั้นไปหมวดหมู่อื่นก่อน')
+            return redirect('ICANDEP:merge_category', pk=category.pk)
         
         category.delete()
         messages.success(request, f'ลบหมวดหมู่ "{category.name}" สำเร็จ!')
@@ -293,47 +428,44 @@ def delete_category(request, pk):
     
     return render(request, 'ICANDEP/delete_category.html', context)
 
-@login_required
-def reports(request):
+@staff_member_required
+def merge_category(request, pk):
     """
-    หน้ารายงานภาพรวม และสรุปกำไร/ขาดทุน
-    - กราฟภาพรวม 6 เดือนล่าสุด (เหมือนเดิม)
-    - เลือกช่วงวันที่เองได้ (รายวัน / รายเดือน / รายปี / ช่วงเวลาเอง)
-    - แสดงยอดรวมรายรับ, รายจ่าย, กำไร/ขาดทุน สำหรับช่วงที่เลือก
-    - แสดงตารางรายละเอียดธุรกรรม เพื่อนำไปปริ้น
+    รวมหมวดหมู่: ย้ายธุรกรรมทั้งหมดไปหมวดหมู่อื่นของประเภทเดียวกัน แล้วลบหรือปิดใช้งานหมวดหมู่เดิม
+    หมวดหมู่ใช้ร่วมกันทุกผู้ใช้ และการรวมย้ายธุรกรรมของทุกคน จึงทำได้เฉพาะ staff
     """
-    today = timezone.now().date()
-
-    # ====== กราฟภาพรวม 6 เดือนล่าสุด (เหมือนเดิม) ======
-    months = []
-    income_data = []
-    expense_data = []
+    category = catalog.get_catalog().get(pk)
+    if category is None:
+        raise Http404('ไม่พบหมวดหมู่')
     
-    for i in range(6):
-        date = today - timedelta(days=30 * i)
-        month_start = date.replace(day=1)
-        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
-        
-        income = Transaction.objects.filter(
-            user=request.user,
-            transaction_type='income',
-            date__gte=month_start,
-            date__lte=month_end
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        expense = Transaction.objects.filter(
-            user=request.user,
-            transaction_type='expense',
-            date__gte=month_start,
-            date__lte=month_end
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        months.append(month_start.strftime('%b %Y'))
-        income_data.append(float(income))
-        expense_data.append(float(expense))
+    if request.method == 'POST':
+        form = CategoryMergeForm(category, request.POST)
+        if form.is_valid():
+            target = form.cleaned_data['target']
+            result = reassign.merge(category, target, delete_source=form.cleaned_data['then'] == 'delete')
+            action = 'ลบ' if result.deleted else 'ปิดใช้งาน'
+            messages.success(
+                request,
+                f'ย้าย {result.moved + result.archived} รายการจาก "{category.name}" ไป "{target.name}" '
+                f'แล้ว{action}หมวดหมู่ "{category.name}" สำเร็จ!',
+            )
+            return redirect('ICANDEP:manage_categories')
+    else:
+        form = CategoryMergeForm(category)
+    
+    context = {
+        'category': category,
+        'form': form,
+        'transactions_count': reassign.usage(category),
+        'usage_limit': reassign.USAGE_LIMIT,
+    }
+    return render(request, 'ICANDEP/merge_category.html', context)
 
-    # ====== ตัวกรองช่วงเวลา ======
-    # presets: today, this_month, this_year หรือช่วงเวลา custom
+def _report_period(request, today):
+    """
+    ช่วงเวลาของรายงานจาก query string
+    presets: today, this_month, this_year หรือช่วงเวลา custom (date_from / date_to)
+    """
     preset = request.GET.get('preset', 'this_month')
     date_from_str = request.GET.get('date_from')
     date_to_str = request.GET.get('date_to')
@@ -361,49 +493,23 @@ def reports(request):
         except ValueError:
             pass
 
-    # ให้ period_end รวมทั้งวัน
-    period_qs_end = period_end
-
-    # queryset หลักสำหรับช่วงเวลาที่เลือก
-    base_qs = Transaction.objects.filter(
-        user=request.user,
-        date__gte=period_start,
-        date__lte=period_qs_end
-    ).select_related('category').order_by('date', 'created_at')
-
-    # ====== สรุปยอดสำหรับช่วงเวลาที่เลือก ======
-    range_income = base_qs.filter(transaction_type='income').aggregate(total=Sum('amount'))['total'] or 0
-    range_expense = base_qs.filter(transaction_type='expense').aggregate(total=Sum('amount'))['total'] or 0
-    range_balance = range_income - range_expense
-
-    # ====== สถิติหมวดหมู่เฉพาะในช่วงที่เลือก (รายจ่าย) ======
-    category_expenses = base_qs.filter(
-        transaction_type='expense',
-        category__isnull=False
-    ).values('category__id', 'category__name').annotate(
-        total=Sum('amount'),
-        count=Count('id')
-    ).order_by('-total')
-
-    # ====== สรุปข้อมูลทั้งหมดตั้งแต่เริ่มใช้ระบบ (เดิม) ======
-    total_income = Transaction.objects.filter(
-        user=request.user,
-        transaction_type='income'
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
-    total_expense = Transaction.objects.filter(
-        user=request.user,
-        transaction_type='expense'
-    ).aggregate(total=Sum('amount'))['total'] or 0
-    
-    balance = total_income - total_expense
-    ratio = (total_expense / total_income * 100) if total_income > 0 else 0
+    return preset, period_start, period_end
 
-    context = {
+def _range_transactions(user, period_start, period_end):
+    """
+    ธุรกรรมของช่วงเวลาที่เลือก (รวมวันสุดท้าย) เรียงตามวันที่
+    ส่วนที่อยู่ในช่วงที่ปิดบัญชีแล้วอ่านจากตารางเก็บถาวร (ดู archive.range_querysets)
+    """
+    parts = [part.select_related('category') for part in archive.range_querysets(user, period_start, period_end)]
+    return parts[0] if len(parts) == 1 else list(chain(*parts))
+
+def _reports_context(preset, period_start, period_end, monthly_series, range_summary, all_time, range_transactions):
+    """context ของหน้ารายงาน (ใช้ร่วมกันทั้ง view แบบ sync และ async)"""
+    return {
         # กราฟภาพรวม
-        'months': months[::-1],
-        'income_data': income_data[::-1],
-        'expense_data': expense_data[::-1],
+        'months': [period.label for period in monthly_series],
+        'income_data': [float(period.income) for period in monthly_series],
+        'expense_data': [float(period.expense) for period in monthly_series],
 
         # ฟิลเตอร์ช่วงเวลา
         'preset': preset,
@@ -411,19 +517,169 @@ def reports(request):
         'period_end': period_end,
 
         # ตารางและสรุปสำหรับช่วงเวลาที่เลือก
-        'range_transactions': base_qs,
-        'range_income': range_income,
-        'range_expense': range_expense,
-        'range_balance': range_balance,
+        'range_transactions': range_transactions,
+        'range_income': range_summary.income,
+        'range_expense': range_summary.expense,
+        'range_balance': range_summary.balance,
 
         # สถิติรายจ่ายตามหมวดหมู่ (ช่วงเวลาที่เลือก)
-        'category_expenses': category_expenses,
+        'category_expenses': range_summary.categories_of('expense'),
 
-        # สรุปภาพรวมทั้งระบบ (เดิม)
-        'total_income': total_income,
-        'total_expense': total_expense,
-        'balance': balance,
-        'ratio': ratio,
+        # สรุปภาพรวมทั้งระบบ
+        'total_income': all_time.income,
+        'total_expense': all_time.expense,
+        'balance': all_time.balance,
+        'ratio': all_time.ratio,
     }
+
+@login_required
+@conditional_page
+def reports(request):
+    """
+    หน้ารายงานภาพรวม และสรุปกำไร/ขาดทุน
+    - กราฟภาพรวม 6 เดือนล่าสุด (นับตามเดือนปฏิทินจริง)
+    - เลือกช่วงวันที่เองได้ (รายวัน / รายเดือน / รายปี / ช่วงเวลาเอง)
+    - แสดงยอดรวมรายรับ, รายจ่าย, กำไร/ขาดทุน สำหรับช่วงที่เลือก
+    - แสดงตารางรายละเอียดธุรกรรม เพื่อนำไปปริ้น
+    """
+    today = timezone.now().date()
+
+    # ====== ตัวกรองช่วงเวลา ======
+    preset, period_start, period_end = _report_period(request, today)
+
+    context = _reports_context(
+        preset, period_start, period_end,
+        # กราฟภาพรวม 6 เดือนล่าสุด (query เดียว)
+        monthly_series=reporting.period_series(request.user, granularity='month', periods=6, end=today),
+        # สรุปยอดและสถิติรายจ่ายตามหมวดหมู่สำหรับช่วงเวลาที่เลือก
+        range_summary=reporting.summarize(request.user, period_start, period_end),
+        # สรุปข้อมูลทั้งหมดตั้งแต่เริ่มใช้ระบบ
+        all_time=reporting.summarize(request.user),
+        range_transactions=_range_transactions(request.user, period_start, period_end),
+    )
+    
+    return render(request, 'ICANDEP/reports.html', context)
+
+@login_required
+def export_transactions(request):
+    """ส่งออกรายการธุรกรรมตามตัวกรองของหน้ารายการ (?format=csv|xlsx)"""
+    from .exports import export_response
+    
+    transactions = _filtered_transactions(request).order_by('-date', '-created_at', '-id')
+    filename = f'transactions-{timezone.now():%Y%m%d}'
+    return export_response(transactions, filename, request.GET.get('format', 'csv'))
+
+@login_required
+def export_report(request):
+    """ส่งออกธุรกรรมของช่วงเวลาในหน้ารายงาน (?format=csv|xlsx)"""
+    from .exports import export_response
+    
+    _, period_start, period_end = _report_period(request, timezone.now().date())
+    # รวมรายการของช่วงที่ปิดบัญชีแล้ว (ตารางเก็บถาวร) ก่อนรายการปัจจุบัน
+    transactions = archive.range_querysets(request.user, period_start, period_end)
+    filename = f'report-{period_start:%Y%m%d}-{period_end:%Y%m%d}'
+    return export_response(transactions, filename, request.GET.get('format', 'csv'))
+
+@login_required
+@require_POST
+def enqueue_report_export(request):
+    """
+    เพิ่มงานส่งออกธุรกรรมของช่วงเวลาในหน้ารายงานเข้าคิวงานเบื้องหลัง
+    (ช่วงเวลายาวที่ส่งออกตรงๆ ไม่ทัน timeout ของ request) แล้วกลับไปหน้ารายงานช่วงเดิม
+    """
+    _, period_start, period_end = _report_period(request, timezone.now().date())
+    file_format = 'xlsx' if request.POST.get('format') == 'xlsx' else 'csv'
+    jobs.enqueue(
+        'export_report', request.user,
+        date_from=period_start.isoformat(), date_to=period_end.isoformat(), format=file_format,
+    )
+    messages.success(request, 'เพิ่มงานส่งออกเข้าคิวแล้ว ดาวน์โหลดไฟล์ได้จาก "งานเบื้องหลัง" เมื่อเสร็จ')
+    query = urlencode({'date_from': period_start.isoformat(), 'date_to': period_end.isoformat()})
+    return redirect(f"{reverse('ICANDEP:reports')}?{query}")
+
+@login_required
+def job_list(request):
+    """สถานะงานเบื้องหลังล่าสุดของผู้ใช้ (JSON, ?kind=) หน้ารายงาน poll ระหว่างที่มีงานค้าง"""
+    return JsonResponse({'jobs': jobs.recent_jobs(request.user, kind=request.GET.get('kind'))})
+
+@login_required
+def job_download(request, pk):
+    """ดาวน์โหลดไฟล์ผลลัพธ์ของงานเบื้องหลังที่เสร็จแล้ว"""
+    job = get_object_or_404(Job, pk=pk, user=request.user, status=Job.STATUS_DONE)
+    if job.result is None:
+        raise Http404('งานนี้ไม่มีไฟล์ผลลัพธ์')
+    response = HttpResponse(bytes(job.result), content_type=job.result_content_type)
+    response['Content-Disposition'] = f'attachment; filename="{job.result_name}"'
+    return response
+
+@login_required
+def import_transactions(request):
+    """นำเข้าธุรกรรมจากไฟล์ CSV (POS / statement ธนาคาร)"""
+    import csv
+    import io
+    from .importers import TransactionImporter
     
-    return render(request, 'ICANDEP/reports.html', context)
\ No newline at end of file
+    result = None
+    errors_csv = ''
+    form = TransactionImportForm(request.POST or None, request.FILES or None)
+    if request.method == 'POST':
+        if form.is_valid():
+            importer = TransactionImporter(request.user, default_type=form.cleaned_data['default_type'])
+            upload = form.cleaned_data['file']
+            try:
+                result = importer.run(io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline=''))
+            except (ValueError, csv.Error) as e:
+                message = f'ไม่สามารถนำเข้าไฟล์ได้: {e}'
+                if importer.result.inserted:
+                    # batch ก่อนจุดที่ผิดพลาดถูกบันทึกแล้ว นำเข้าไฟล์ที่แก้แล้วซ้ำได้ (แถวเดิมจะถูกข้าม)
+                    message += f' (นำเข้าไปแล้ว {importer.result.inserted} รายการก่อนเกิดข้อผิดพลาด)'
+                messages.error(request, message)
+            else:
+                messages.success(request, f'นำเข้า {result.inserted} รายการ (ข้ามรายการที่เคยนำเข้าแล้ว {result.duplicates} รายการ)')
+                if result.errors:
+                    buffer = io.StringIO()
+                    # ไฟล์ใหญ่ที่ผิดพลาดจำนวนมากให้ใช้คำสั่ง import_transactions แทน
+                    result.write_errors(buffer, importer.fieldnames, limit=1000)
+                    errors_csv = buffer.getvalue()
+    
+    context = {
+        'form': form,
+        'result': result,
+        'errors': result.errors[:100] if result else [],
+        'errors_csv': errors_csv,
+    }
+    return render(request, 'ICANDEP/import_transactions.html', context)
+
+@staff_member_required
+def cache_stats(request):
+    """สถิติ hit/miss ของ cache หน้า dashboard (เฉพาะ staff)"""
+    return JsonResponse(caching.cache_stats())
+
+@staff_member_required
+def performance_stats(request):
+    """
+    เวลาต่อ view ของ process นี้ (p50/p95/p99, เวลา db/template เฉลี่ย, histogram) เฉพาะ staff
+    ?view=<ชื่อ view> ดูเฉพาะ view ที่สนใจ เช่น ?view=ICANDEP:reports
+    """
+    stats = instrumentation.histograms.snapshot()
+    view = request.GET.get('view')
+    if view:
+        stats['views'] = [row for row in stats['views'] if row['view'] == view]
+    return JsonResponse(stats)
+
+@staff_member_required
+def slow_query_stats(request):
+    """
+    query ช้าล่าสุดของ process นี้ จัดกลุ่มตามรูปแบบ query เรียงตามเวลารวม พร้อมแผนการ query (เฉพาะ staff)
+    ?view=<ชื่อ view> ดูเฉพาะ view ที่สนใจ, ?limit= จำนวนกลุ่ม (ค่าเริ่มต้น 20)
+    """
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 20)), 100))
+    except ValueError:
+        limit = 20
+    entries = list(slowqueries.buffer())
+    return JsonResponse({
+        'threshold_ms': settings.SLOW_QUERY_MS,
+        'entries': len(entries),
+        'top': slowqueries.summarize(entries, limit=limit, view=request.GET.get('view')),
+    })
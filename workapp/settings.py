@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 
+import dj_database_url
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -44,6 +46,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # สำหรับ serve static files บน Vercel
+    'ICANDEP.instrumentation.PerformanceMiddleware',  # Server-Timing + histogram ต่อ view (ไม่นับ static)
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -56,31 +59,144 @@ ROOT_URLCONF = 'workapp.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates ที่จับเวลา render ให้ PerformanceMiddleware (ICANDEP/instrumentation.py)
+        'BACKEND': 'ICANDEP.instrumentation.TimedDjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # ใช้ cached loader เสมอ ไม่ขึ้นกับ DEBUG: template ถูก compile ครั้งเดียวต่อ process
+            # (runserver ล้าง cache ให้เองเมื่อไฟล์ template เปลี่ยน)
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'workapp.wsgi.application'
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'postgres',
-        'USER': 'postgres',
-        'PASSWORD': 'az0954852404',
-        'HOST': 'db.ixeaevilyqvsbopxakpo.supabase.co',
-        'POST': '5432',
+ASGI_APPLICATION = 'workapp.asgi.application'
+
+# ใช้ view แบบ async ของหน้า dashboard และรายงาน (ICANDEP/async_views.py) ซึ่งรัน query รวมยอด
+# หลายชุดพร้อมกัน เปิดเมื่อรันด้วย ASGI server (uvicorn) เท่านั้น ภายใต้ WSGI จะช้ากว่าเดิม
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
+
+# เตรียม URL resolver, คำแปล และ template ที่ใช้บ่อยตั้งแต่ตอน import wsgi (ดู workapp/warmup.py)
+# request แรกหลัง cold start จึงไม่ต้องจ่ายค่าเหล่านี้ ปิดได้ด้วย COLD_START_WARMUP=False
+COLD_START_WARMUP = os.environ.get('COLD_START_WARMUP', 'True') == 'True'
+
+# Database จาก DATABASE_URL (หรือ POSTGRES_URL ของ Vercel Storage)
+# ถ้าไม่ได้ตั้งค่า ใช้ SQLite ในโฟลเดอร์โปรเจค สำหรับรันบนเครื่อง
+# - CONN_MAX_AGE: เก็บ connection ไว้ใช้ซ้ำข้าม request (วินาที, 0 = เปิดใหม่ทุก request)
+# - DB_POOL=True: ใช้ connection pool ของ psycopg 3 (ต้องติดตั้ง psycopg[pool]) แทน CONN_MAX_AGE
+# - DB_DISABLE_SERVER_SIDE_CURSORS=True: ต้องเปิดเมื่อต่อผ่าน pgbouncer แบบ transaction pooling
+#   (เช่น Supabase pooler port 6543)
+DATABASE_URL = os.environ.get('DATABASE_URL') or os.environ.get('POSTGRES_URL')
+
+if DATABASE_URL:
+    DATABASES = {
+        'default': dj_database_url.parse(
+            DATABASE_URL,
+            conn_max_age=int(os.environ.get('CONN_MAX_AGE', '600')),
+            conn_health_checks=True,
+        ),
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    if os.environ.get('DB_POOL', 'False') == 'True':
+        # pool กับ persistent connection ใช้ร่วมกันไม่ได้: connection ถูกคืนเข้า pool เมื่อจบ request
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', '1')),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', '4')),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        }
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = (
+        os.environ.get('DB_DISABLE_SERVER_SIDE_CURSORS', 'False') == 'True'
+    )
+
+
+# Cache (ไม่ต้องใช้ Redis) เลือก backend ด้วย CACHE_BACKEND=locmem|file|db
+# - file: ใช้ได้หลาย process บนเครื่องเดียว (ค่าเริ่มต้นเก็บที่ /tmp ซึ่งเขียนได้บน Vercel)
+# - db: ใช้ร่วมกันทุก instance ต้องรัน `python manage.py createcachetable` ก่อน
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+
+if CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', '/tmp/icandep-cache'),
+        }
+    }
+elif CACHE_BACKEND == 'db':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', 'icandep_cache'),
+        }
     }
-}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'icandep',
+        }
+    }
+
+# อายุของ cache หน้า dashboard (วินาที) - ข้อมูลเปลี่ยนเมื่อไหร่ cache จะถูกเปลี่ยน key ทันทีอยู่แล้ว
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get('DASHBOARD_CACHE_TIMEOUT', 60 * 60))
+
+# อายุ (วินาที) ของเลขเวอร์ชันหมวดหมู่ที่ cache ไว้ (ICANDEP/catalog.py) ค่าจริงอยู่ในฐานข้อมูล (CatalogVersion)
+# ถ้า cache ไม่ได้ใช้ร่วมกันระหว่าง worker (locmem) worker อื่นจะเห็นหมวดหมู่ที่แก้แล้วภายในเวลานี้
+CATALOG_VERSION_TIMEOUT = int(os.environ.get('CATALOG_VERSION_TIMEOUT', 5))
+
+# คิวงานเบื้องหลัง (ICANDEP/jobs.py, คำสั่ง run_jobs)
+# - JOB_STALE_AFTER: งานที่ running นานเกินนี้ (วินาที) ถือว่า worker ตาย และคืนเข้าคิว
+# - JOB_MAX_ATTEMPTS: จำนวนครั้งสูงสุดที่รันงานเดิมก่อนถือว่าล้มเหลว
+# - JOB_RESULT_DAYS: เก็บงานที่เสร็จแล้วและไฟล์ผลลัพธ์ไว้กี่วัน
+# - JOB_RESULT_MAX_BYTES: ขนาดไฟล์ผลลัพธ์สูงสุดที่เก็บในฐานข้อมูล ใหญ่กว่านี้งานล้มเหลว (ค่าเริ่มต้น 20 MB)
+JOB_STALE_AFTER = int(os.environ.get('JOB_STALE_AFTER', 30 * 60))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+JOB_RESULT_DAYS = int(os.environ.get('JOB_RESULT_DAYS', 7))
+JOB_RESULT_MAX_BYTES = int(os.environ.get('JOB_RESULT_MAX_BYTES', 20 * 1024 * 1024))
+
+# วัดเวลาต่อ request (ICANDEP/instrumentation.py)
+# - PERF_SERVER_TIMING: ใส่ header Server-Timing (เวลา db / template / รวม) ให้ใคร
+#   'staff' = เฉพาะผู้ใช้ staff (ทุก client เมื่อ DEBUG), 'all' = ทุก client, 'off' = ไม่ใส่
+# - histogram เวลาต่อ view เก็บในหน่วยความจำ ช่วงละ PERF_HISTOGRAM_WINDOW วินาที
+#   ย้อนหลัง PERF_HISTOGRAM_WINDOWS ช่วง (ค่าเริ่มต้น 12 x 5 นาที = 1 ชั่วโมง) ดูได้ที่ /app/stats/performance/
+PERF_SERVER_TIMING = os.environ.get('PERF_SERVER_TIMING', 'staff')
+PERF_HISTOGRAM_WINDOW = int(os.environ.get('PERF_HISTOGRAM_WINDOW', 5 * 60))
+PERF_HISTOGRAM_WINDOWS = int(os.environ.get('PERF_HISTOGRAM_WINDOWS', 12))
+
+# คำสั่ง run_benchmarks สร้างผู้ใช้และธุรกรรมจำนวนมาก: ตั้งเป็น True เฉพาะฐานข้อมูลสำหรับวัดผล ห้ามตั้งบน production
+BENCHMARKS_ENABLED = os.environ.get('BENCHMARKS_ENABLED', 'False') == 'True'
+
+# บันทึก query ช้า (ICANDEP/slowqueries.py, คำสั่ง slow_queries)
+# - SLOW_QUERY_MS: query ที่ใช้เวลาตั้งแต่เท่านี้ (ms) ขึ้นไปถูกบันทึก (0 = ปิด)
+# - SLOW_QUERY_VIEWS: บันทึกเฉพาะ query จาก view ที่ชื่อขึ้นต้นด้วยค่าเหล่านี้
+# - SLOW_QUERY_EXPLAIN_RATE: สัดส่วนที่สุ่ม EXPLAIN ซ้ำ สำหรับรูปแบบ query ที่เคย explain แล้ว
+# - SLOW_QUERY_BUFFER: จำนวนรายการล่าสุดที่เก็บในหน่วยความจำ ดูได้ที่ /app/stats/slow-queries/
+# - SLOW_QUERY_LOG: ไฟล์ JSON lines ที่เขียนต่อท้าย (ว่าง = ไม่เขียนไฟล์) บน Vercel ใช้ได้เฉพาะใต้ /tmp
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+SLOW_QUERY_VIEWS = ('ICANDEP:', 'admin:')
+SLOW_QUERY_EXPLAIN_RATE = float(os.environ.get('SLOW_QUERY_EXPLAIN_RATE', 0.1))
+SLOW_QUERY_BUFFER = int(os.environ.get('SLOW_QUERY_BUFFER', 200))
+SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG', '')
 
 
 # Password validation
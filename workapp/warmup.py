@@ -0,0 +1,51 @@
+"""
+เตรียมงานที่ request แรกหลัง cold start ต้องทำ ให้เสร็จตั้งแต่ตอน import wsgi
+
+- โหลด URLconf ทั้งหมด (import views/forms) และสร้างตาราง reverse() ของทุก namespace
+- โหลดไฟล์คำแปลของภาษาหลัก
+- compile template ที่ใช้บ่อยเก็บไว้ใน cached loader
+
+ไม่แตะฐานข้อมูล เพื่อไม่ให้การ import ช้าลงเพราะรอ connection
+"""
+import time
+
+from django.conf import settings
+from django.template import TemplateDoesNotExist
+from django.template.loader import get_template
+from django.urls import get_resolver, reverse
+from django.utils import translation
+
+WARM_TEMPLATES = [
+    'ICANDEP/base.html',
+    'ICANDEP/login.html',
+    'ICANDEP/dashboard.html',
+    'ICANDEP/transaction_list.html',
+    'ICANDEP/transaction_form.html',
+    'ICANDEP/reports.html',
+]
+
+
+def warm_up():
+    """เตรียม URL, คำแปล และ template คืนค่าเวลาที่ใช้ของแต่ละขั้น (ms)"""
+    timings = {}
+
+    start = time.perf_counter()
+    resolver = get_resolver()
+    resolver.url_patterns
+    reverse('ICANDEP:login')
+    timings['urls'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    translation.activate(settings.LANGUAGE_CODE)
+    translation.gettext('Login')
+    translation.deactivate()
+    timings['translations'] = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for name in WARM_TEMPLATES:
+        try:
+            get_template(name)
+        except TemplateDoesNotExist:
+            continue
+    timings['templates'] = (time.perf_counter() - start) * 1000
+    return timings
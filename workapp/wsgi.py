@@ -15,4 +15,11 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'workapp.settings')
 
 application = get_wsgi_application()
 
+from django.conf import settings  # noqa: E402
+
+if settings.COLD_START_WARMUP:
+    from workapp.warmup import warm_up
+
+    warm_up()
+
 app = application